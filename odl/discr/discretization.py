@@ -217,10 +217,14 @@ class DiscretizedSet(NtuplesBase):
 
     def __hash__(self):
         """Return ``hash(self)``."""
-
-        return hash((NtuplesBase.__hash__(self),
-                     self.uspace, self.dspace, self.__sampling,
-                     self.__interpolation))
+        # Cached since hashing the partition and operators is expensive
+        try:
+            return self.__hash
+        except AttributeError:
+            self.__hash = hash((NtuplesBase.__hash__(self),
+                                self.uspace, self.dspace, self.__sampling,
+                                self.__interpolation))
+            return self.__hash
 
     @property
     def impl(self):
@@ -275,7 +279,7 @@ class DiscretizedSetElement(NtuplesBaseVector):
         """Create an identical (deep) copy of this element."""
         return self.space.element(self.ntuple.copy())
 
-    def asarray(self, out=None):
+    def asarray(self, out=None, copy=False):
         """Extract the data of this array as a numpy array.
 
         Parameters
@@ -283,8 +287,16 @@ class DiscretizedSetElement(NtuplesBaseVector):
         out : `numpy.ndarray`, optional
             Array in which the result should be written in-place.
             Has to be contiguous and of the correct dtype.
+        copy : bool, optional
+            If ``True``, always return a new array. Otherwise, the
+            returned array is a view into the data of this element
+            whenever the storage allows it, i.e., changes to it also
+            change this element.
         """
-        return self.ntuple.asarray(out=out)
+        if copy:
+            return self.ntuple.asarray(out=out, copy=True)
+        else:
+            return self.ntuple.asarray(out=out)
 
     def __eq__(self, other):
         """Return ``self == other``.
@@ -16,6 +16,7 @@ from builtins import super, str
 
 import numpy as np
 from numbers import Integral
+import weakref
 
 from odl.discr.discretization import (
     DiscretizedSpace, DiscretizedSpaceElement, dspace_type)
@@ -40,6 +41,9 @@ __all__ = ('DiscreteLp', 'DiscreteLpElement',
 
 _SUPPORTED_INTERP = ('nearest', 'linear')
 
+# Canonical instances of uniformly discretized spaces, see `_interned`
+_INTERNED_SPACES = weakref.WeakValueDictionary()
+
 
 class DiscreteLp(DiscretizedSpace):
 
@@ -531,7 +535,7 @@ class DiscreteLpElement(DiscretizedSpaceElement):
 
     """Representation of a `DiscreteLp` element."""
 
-    def asarray(self, out=None):
+    def asarray(self, out=None, copy=False):
         """Extract the data of this array as a numpy array.
 
         Parameters
@@ -540,12 +544,27 @@ class DiscreteLpElement(DiscretizedSpaceElement):
             Array in which the result should be written in-place.
             Has to be contiguous and of the correct dtype and
             shape.
+        copy : bool, optional
+            If ``True``, always return a new array. Otherwise, the
+            returned array is a view into the data of this element
+            whenever the storage allows it, i.e., changes to it also
+            change this element.
+
+        Examples
+        --------
+        >>> space = odl.uniform_discr(0, 1, 3)
+        >>> x = space.element([1, 2, 3])
+        >>> arr = x.asarray()
+        >>> arr[0] = 0
+        >>> x
+        uniform_discr(0.0, 1.0, 3).element([0.0, 2.0, 3.0])
         """
         if out is None:
+            # Reshaping the flat data in storage order never copies
             if self.space.ndim == 0:
-                out = DiscretizedSpaceElement.asarray(self)
+                out = DiscretizedSpaceElement.asarray(self, copy=copy)
             else:
-                out = DiscretizedSpaceElement.asarray(self).reshape(
+                out = DiscretizedSpaceElement.asarray(self, copy=copy).reshape(
                     self.shape, order=self.space.order)
             return out
 
@@ -970,7 +989,8 @@ def uniform_discr_frompartition(partition, exponent=2.0, interp='nearest',
     Returns
     -------
     discr : `DiscreteLp`
-        The uniformly discretized function space
+        The uniformly discretized function space. For equal parameters,
+        the same (canonical) instance is returned as long as it exists.
 
     Examples
     --------
@@ -978,6 +998,12 @@ def uniform_discr_frompartition(partition, exponent=2.0, interp='nearest',
     >>> uniform_discr_frompartition(part)
     uniform_discr(0.0, 1.0, 10)
 
+    Spaces created with equal parameters are identical, which makes
+    membership checks cheap:
+
+    >>> uniform_discr_frompartition(part) is uniform_discr_frompartition(part)
+    True
+
     See Also
     --------
     uniform_discr : implicit uniform Lp discretization
@@ -1022,8 +1048,30 @@ def uniform_discr_frompartition(partition, exponent=2.0, interp='nearest',
         dspace = ds_type(partition.size, impl=impl, weighting=weighting,
                          exponent=exponent)
 
-    return DiscreteLp(fspace, partition, dspace, exponent, interp, order=order,
-                      **kwargs)
+    discr = DiscreteLp(fspace, partition, dspace, exponent, interp,
+                       order=order, **kwargs)
+    return _interned(discr)
+
+
+def _interned(discr):
+    """Return the canonical instance of a space equal to ``discr``.
+
+    Spaces are considered the same if they are equal and have the same
+    representation (which covers properties like axis labels that are
+    not part of the equality check). If no such space exists yet,
+    ``discr`` itself becomes the canonical instance.
+    """
+    key = repr(discr)
+    try:
+        canonical = _INTERNED_SPACES[key]
+    except KeyError:
+        pass
+    else:
+        if type(canonical) is type(discr) and canonical == discr:
+            return canonical
+
+    _INTERNED_SPACES[key] = discr
+    return discr
 
 
 def uniform_discr_fromspace(fspace, shape, exponent=2.0, interp='nearest',
@@ -1440,7 +1488,7 @@ def uniform_discr_fromdiscr(discr, min_pt=None, max_pt=None,
     each axis individually):
 
     **0 arguments:**
-        Return a copy of ``discr``
+        Return a space equal to ``discr``
 
     **1 argument:**
         [min,max]_pt -> keep sampling but translate domain so it
@@ -1473,13 +1521,14 @@ def uniform_discr_fromdiscr(discr, min_pt=None, max_pt=None,
     >>> discr.cell_sides
     array([ 0.1,  0.4])
 
-    If no additional argument is given, a copy of ``discr`` is
-    returned:
+    If no additional argument is given, a space equal to ``discr`` is
+    returned. For uniformly discretized spaces, this is the canonical
+    instance, i.e., ``discr`` itself:
 
     >>> odl.uniform_discr_fromdiscr(discr) == discr
     True
     >>> odl.uniform_discr_fromdiscr(discr) is discr
-    False
+    True
 
     Giving ``min_pt`` or ``max_pt`` results in a
     translation, while for the other two options, the domain
@@ -29,3 +29,13 @@ __all__ += tensor_ops.__all__
 
 from .oputils import *
 __all__ += oputils.__all__
+
+from .compiled import *
+__all__ += compiled.__all__
+
+from .cached import *
+__all__ += cached.__all__
+
+# Not in `__all__` since it would shadow the builtin `compile` in
+# `from odl import *`
+from .compiled import compile
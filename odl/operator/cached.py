@@ -0,0 +1,281 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Memoization of operator evaluations."""
+
+# Imports for common Python 2/3 codebase
+from __future__ import print_function, division, absolute_import
+from builtins import super
+from collections import OrderedDict, namedtuple
+import hashlib
+import threading
+import numpy as np
+
+from odl.operator.operator import Operator
+from odl.set import LinearSpaceElement
+from odl.util.utility import (
+    element_arrays, element_nbytes, signature_string)
+
+
+__all__ = ('CachedOperator',)
+
+
+CacheInfo = namedtuple('CacheInfo',
+                       ['hits', 'misses', 'maxsize', 'currsize', 'nbytes'])
+
+
+class CachedOperator(Operator):
+
+    """Operator remembering its most recent evaluations.
+
+    Evaluating the wrapped operator at a point that has been seen before
+    returns the stored result instead of evaluating the operator again.
+    This is useful for expensive nonlinear operators that are evaluated
+    repeatedly at the same point, e.g., in line searches.
+
+    The cache is bounded both in the number of entries and in the total
+    number of bytes of the stored results; the least recently used entries
+    are dropped first.
+    """
+
+    def __init__(self, operator, maxsize=8, max_bytes=None, key='hash',
+                 copy=True):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        operator : `Operator`
+            The operator whose evaluations should be cached.
+        maxsize : positive int or None, optional
+            Maximum number of cached results. ``None`` means no limit.
+        max_bytes : nonnegative int or None, optional
+            Maximum total number of bytes of the cached results. Results
+            larger than this are not cached. ``None`` means no limit.
+        key : {'hash', 'identity'}, optional
+            How cached inputs are recognized.
+
+            ``'hash'`` : Use a hash of the content of the input. This
+            detects equal inputs regardless of where they are stored.
+
+            ``'identity'`` : Use the identity of the input object. This
+            avoids hashing, but in-place modifications of an input after
+            it has been used are not detected.
+
+        copy : bool, optional
+            If ``True``, out-of-place evaluations return a new element.
+            Otherwise the cached result itself is returned, with its data
+            marked as read-only where possible.
+
+        Examples
+        --------
+        >>> space = odl.rn(3)
+        >>> op = CachedOperator(odl.PowerOperator(space, 2))
+        >>> x = space.element([1, 2, 3])
+        >>> op(x)
+        rn(3).element([1.0, 4.0, 9.0])
+        >>> op(space.element([1, 2, 3]))
+        rn(3).element([1.0, 4.0, 9.0])
+        >>> op.cache_info()
+        CacheInfo(hits=1, misses=1, maxsize=8, currsize=1, nbytes=24)
+        """
+        if not isinstance(operator, Operator):
+            raise TypeError('`operator` {!r} is not an `Operator` instance'
+                            ''.format(operator))
+        if maxsize is not None:
+            maxsize = int(maxsize)
+            if maxsize < 1:
+                raise ValueError('`maxsize` must be positive, got {}'
+                                 ''.format(maxsize))
+        if max_bytes is not None:
+            max_bytes = int(max_bytes)
+            if max_bytes < 0:
+                raise ValueError('`max_bytes` must be nonnegative, got {}'
+                                 ''.format(max_bytes))
+        key, key_in = str(key).lower(), key
+        if key not in ('hash', 'identity'):
+            raise ValueError("`key` '{}' not understood".format(key_in))
+
+        super().__init__(operator.domain, operator.range,
+                         linear=operator.is_linear)
+        self.__operator = operator
+        self.__maxsize = maxsize
+        self.__max_bytes = max_bytes
+        self.__key = key
+        self.__copy = bool(copy)
+
+        self.__cache = OrderedDict()
+        self.__nbytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.RLock()
+
+    @property
+    def operator(self):
+        """The wrapped operator."""
+        return self.__operator
+
+    @property
+    def maxsize(self):
+        """Maximum number of cached results."""
+        return self.__maxsize
+
+    @property
+    def max_bytes(self):
+        """Maximum total number of bytes of the cached results."""
+        return self.__max_bytes
+
+    @property
+    def key(self):
+        """How cached inputs are recognized, ``'hash'`` or ``'identity'``."""
+        return self.__key
+
+    @property
+    def copy(self):
+        """Whether out-of-place evaluations return new elements."""
+        return self.__copy
+
+    @property
+    def hits(self):
+        """Number of evaluations answered from the cache."""
+        return self.__hits
+
+    @property
+    def misses(self):
+        """Number of evaluations of the wrapped operator."""
+        return self.__misses
+
+    def cache_info(self):
+        """Return hits, misses and size of the cache."""
+        with self.__lock:
+            return CacheInfo(self.__hits, self.__misses, self.maxsize,
+                             len(self.__cache), self.__nbytes)
+
+    def cache_clear(self):
+        """Drop all cached results and reset the statistics."""
+        with self.__lock:
+            self.__cache.clear()
+            self.__nbytes = 0
+            self.__hits = 0
+            self.__misses = 0
+
+    def _cache_key(self, x):
+        """Return the cache key for input ``x``."""
+        if self.key == 'identity':
+            return id(x)
+
+        hasher = hashlib.sha1()
+        for arr in element_arrays(x):
+            hasher.update(str((arr.dtype.str, arr.shape)).encode('ascii'))
+            arr = np.ascontiguousarray(arr).reshape(-1)
+            hasher.update(arr.view(np.uint8))
+        return hasher.digest()
+
+    def _lookup(self, key, x):
+        """Return the cached result for ``x``, or ``None``."""
+        with self.__lock:
+            entry = self.__cache.pop(key, None)
+            if (entry is None or
+                    (self.key == 'identity' and entry[0] is not x)):
+                self.__misses += 1
+                if entry is not None:
+                    self.__nbytes -= entry[2]
+                return None
+
+            # Re-insert as most recently used
+            self.__cache[key] = entry
+            self.__hits += 1
+            return entry[1]
+
+    def _store(self, key, x, result):
+        """Add ``result`` as the result for ``x`` to the cache."""
+        nbytes = element_nbytes(result)
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return
+
+        # The input is only kept to guard against reuse of its id
+        entry = (x if self.key == 'identity' else None, result, nbytes)
+        with self.__lock:
+            old = self.__cache.pop(key, None)
+            if old is not None:
+                self.__nbytes -= old[2]
+            self.__cache[key] = entry
+            self.__nbytes += nbytes
+
+            while ((self.maxsize is not None and
+                    len(self.__cache) > self.maxsize) or
+                   (self.max_bytes is not None and
+                    self.__nbytes > self.max_bytes)):
+                _, old = self.__cache.popitem(last=False)
+                self.__nbytes -= old[2]
+
+    def _call(self, x, out=None):
+        """Return ``self(x[, out])``."""
+        key = self._cache_key(x)
+        cached = self._lookup(key, x)
+        if cached is not None:
+            if out is not None:
+                out.assign(cached)
+                return out
+            elif self.copy and isinstance(cached, LinearSpaceElement):
+                return cached.copy()
+            else:
+                return cached
+
+        if out is None:
+            result = self.operator(x)
+        else:
+            result = self.operator(x, out=out)
+
+        # Pooled temporaries and `out` are modified later on, hence the
+        # cache needs its own copy
+        if not isinstance(result, LinearSpaceElement):
+            stored = result
+        else:
+            if out is None and not self.copy:
+                stored = result
+            else:
+                stored = result.copy()
+            for arr in element_arrays(stored, views_only=True):
+                arr.flags.writeable = False
+
+        self._store(key, x, stored)
+        return result
+
+    def derivative(self, point):
+        """Return the derivative of the wrapped operator at ``point``."""
+        return self.operator.derivative(point)
+
+    @property
+    def adjoint(self):
+        """Adjoint of the wrapped operator."""
+        return self.operator.adjoint
+
+    @property
+    def inverse(self):
+        """Inverse of the wrapped operator."""
+        return self.operator.inverse
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        posargs = [self.operator]
+        optargs = [('maxsize', self.maxsize, 8),
+                   ('max_bytes', self.max_bytes, None),
+                   ('key', self.key, 'hash'),
+                   ('copy', self.copy, True)]
+        return '{}({})'.format(self.__class__.__name__,
+                               signature_string(posargs, optargs))
+
+    def __str__(self):
+        """Return ``str(self)``."""
+        return repr(self)
+
+
+if __name__ == '__main__':
+    # pylint: disable=wrong-import-position
+    from odl.util.testutils import run_doctests
+    run_doctests()
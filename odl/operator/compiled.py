@@ -0,0 +1,456 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Compilation of operator expression trees into execution plans."""
+
+# Imports for common Python 2/3 codebase
+from __future__ import print_function, division, absolute_import
+from builtins import object, super
+import threading
+
+from odl.operator.operator import (
+    Operator, OperatorSum, OperatorComp, OperatorVectorSum,
+    OperatorLeftScalarMult, OperatorRightScalarMult, OpTypeError)
+from odl.operator.default_ops import ScalingOperator, ZeroOperator
+from odl.set import LinearSpace
+
+
+__all__ = ('CompiledOperator',)
+
+
+def compile(operator):
+    """Compile an operator expression into a linear execution plan.
+
+    Expressions like ``2 * A * B + C`` are represented by nested
+    `OperatorSum`, `OperatorComp`, `OperatorLeftScalarMult` etc. objects,
+    each of which creates its own temporaries on evaluation. This function
+    flattens such a tree into a sequence of elementary operator calls and
+    linear combinations. Scalar multiplications are folded into the
+    coefficients of the linear combinations, and the temporaries are
+    assigned to a minimal number of scratch buffers that are reused
+    between calls.
+
+    Parameters
+    ----------
+    operator : `Operator`
+        The operator to compile. Its `Operator.range` must be a
+        `LinearSpace`.
+
+    Returns
+    -------
+    compiled : `CompiledOperator`
+        Operator equivalent to ``operator``.
+
+    Examples
+    --------
+    >>> space = odl.rn(3)
+    >>> A = odl.MultiplyOperator(space.element([1, 2, 3]))
+    >>> B = odl.MultiplyOperator(space.element([1, 0, 1]))
+    >>> op = 2 * A * B + odl.IdentityOperator(space)
+    >>> compiled = odl.operator.compile(op)
+    >>> for step in compiled.plan:
+    ...     print(step)
+    buf0 = MultiplyOperator(x)
+    out = MultiplyOperator(buf0)
+    out = 2 * out + 1.0 * x
+    >>> compiled([1, 1, 1])
+    rn(3).element([3.0, 1.0, 7.0])
+
+    Adjoints are compiled as well:
+
+    >>> compiled.adjoint([1, 1, 1])
+    rn(3).element([3.0, 1.0, 7.0])
+    """
+    if isinstance(operator, CompiledOperator):
+        return operator
+    return CompiledOperator(operator)
+
+
+class CompiledOperator(Operator):
+
+    """Operator that evaluates a compiled execution plan, see `compile`.
+
+    The scratch buffers of the plan are allocated on the first evaluation
+    in each thread and reused afterwards, hence in-place evaluation does
+    not allocate any temporaries in the flattened expression after this
+    warm-up. Operators that are not expression types are called as
+    they are and may still allocate internally.
+    """
+
+    def __init__(self, operator):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        operator : `Operator`
+            The operator to compile. Its `Operator.range` must be a
+            `LinearSpace`.
+        """
+        if not isinstance(operator, Operator):
+            raise TypeError('`operator` {!r} not an `Operator` instance'
+                            ''.format(operator))
+        if not isinstance(operator.range, LinearSpace):
+            raise OpTypeError('`operator.range` {!r} not a `LinearSpace` '
+                              'instance'.format(operator.range))
+
+        super().__init__(operator.domain, operator.range,
+                         linear=operator.is_linear)
+        self.__operator = operator
+
+        builder = _PlanBuilder(operator.domain, operator.range)
+        builder.emit(_expression(operator), _OUT, _X)
+        (self.__instructions, self.__buffer_spaces,
+         self.__constants) = builder.finalize()
+        self.__plan = tuple(builder.describe(instr)
+                            for instr in self.__instructions)
+        self.__local = threading.local()
+
+    @property
+    def operator(self):
+        """The compiled operator."""
+        return self.__operator
+
+    @property
+    def plan(self):
+        """Human-readable description of the execution plan steps."""
+        return self.__plan
+
+    @property
+    def num_buffers(self):
+        """Number of scratch buffers used by the plan."""
+        return len(self.__buffer_spaces)
+
+    def _registers(self, x, out):
+        """Return the list of registers for one evaluation."""
+        try:
+            buffers = self.__local.buffers
+        except AttributeError:
+            buffers = self.__local.buffers = [
+                space.element() for space in self.__buffer_spaces]
+        return [x, out] + buffers + self.__constants
+
+    def _call(self, x, out):
+        """Implement ``self(x, out)``."""
+        regs = self._registers(x, out)
+        for instr in self.__instructions:
+            kind = instr[0]
+            if kind == 'call':
+                _, op, src, dst = instr
+                op(regs[src], out=regs[dst], check=False)
+            elif kind == 'lincomb':
+                _, a, src1, b, src2, dst = instr
+                if src2 is None:
+                    regs[dst].lincomb(a, regs[src1])
+                else:
+                    regs[dst].lincomb(a, regs[src1], b, regs[src2])
+            else:  # kind == 'zero'
+                regs[instr[1]].set_zero()
+
+    @property
+    def adjoint(self):
+        """Compiled adjoint of the operator."""
+        try:
+            return self.__adjoint
+        except AttributeError:
+            self.__adjoint = compile(self.operator.adjoint)
+            return self.__adjoint
+
+    def derivative(self, point):
+        """Return the compiled derivative of the operator at ``point``."""
+        if self.is_linear:
+            return self
+        else:
+            return compile(self.operator.derivative(point))
+
+    @property
+    def inverse(self):
+        """Inverse of the operator."""
+        return self.operator.inverse
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        return '{}({!r})'.format(self.__class__.__name__, self.operator)
+
+    def __str__(self):
+        """Return ``str(self)``."""
+        return 'compile({})'.format(self.operator)
+
+
+# --- Expression representation --- #
+
+
+# Placeholder for the operator input in an expression
+_INPUT = object()
+
+
+class _Sum(object):
+
+    """Linear combination of terms and constant vectors."""
+
+    def __init__(self, terms=(), consts=()):
+        # terms: list of (coeff, _INPUT or _Apply)
+        # consts: list of (coeff, vector)
+        self.terms = list(terms)
+        self.consts = list(consts)
+
+    def scaled(self, c):
+        if c == 1:
+            return self
+        return _Sum([(c * a, item) for a, item in self.terms],
+                    [(c * a, vec) for a, vec in self.consts])
+
+    def plus(self, other):
+        return _Sum(self.terms + other.terms, self.consts + other.consts)
+
+    def is_input(self):
+        return (not self.consts and len(self.terms) == 1 and
+                self.terms[0][0] == 1 and self.terms[0][1] is _INPUT)
+
+
+class _Apply(object):
+
+    """Application of an operator to an input expression."""
+
+    def __init__(self, operator, inner):
+        self.operator = operator
+        self.inner = inner
+
+
+def _apply(operator, inner):
+    """Return ``operator(inner)`` as a `_Sum`, pulling out scalars."""
+    if operator.is_linear and not inner.consts:
+        if not inner.terms:
+            return _Sum()
+        elif len(inner.terms) == 1:
+            c, item = inner.terms[0]
+            return _Sum([(c, _Apply(operator, _Sum([(1, item)])))])
+    return _Sum([(1, _Apply(operator, inner))])
+
+
+def _substitute(expr, inner):
+    """Return ``expr`` with the input replaced by ``inner``."""
+    result = _Sum(consts=expr.consts)
+    for c, item in expr.terms:
+        if item is _INPUT:
+            result = result.plus(inner.scaled(c))
+        else:
+            new = _apply(item.operator, _substitute(item.inner, inner))
+            result = result.plus(new.scaled(c))
+    return result
+
+
+def _expression(op):
+    """Return the flattened expression of ``op`` as a `_Sum`."""
+    if not (isinstance(op.domain, LinearSpace) and
+            isinstance(op.range, LinearSpace)):
+        return _apply(op, _Sum([(1, _INPUT)]))
+
+    if isinstance(op, OperatorSum):
+        return _expression(op.left).plus(_expression(op.right))
+    elif isinstance(op, OperatorVectorSum):
+        return _expression(op.operator).plus(_Sum(consts=[(1, op.vector)]))
+    elif isinstance(op, OperatorLeftScalarMult):
+        return _expression(op.operator).scaled(op.scalar)
+    elif isinstance(op, OperatorRightScalarMult):
+        return _substitute(_expression(op.operator),
+                           _Sum([(op.scalar, _INPUT)]))
+    elif isinstance(op, OperatorComp):
+        return _substitute(_expression(op.left), _expression(op.right))
+    elif isinstance(op, ScalingOperator):
+        return _Sum([(op.scalar, _INPUT)])
+    elif isinstance(op, ZeroOperator):
+        return _Sum()
+    else:
+        return _apply(op, _Sum([(1, _INPUT)]))
+
+
+# --- Plan generation --- #
+
+
+# Fixed register indices of input and output
+_X = 0
+_OUT = 1
+
+
+class _PlanBuilder(object):
+
+    """Generator of plan instructions with virtual registers.
+
+    Registers ``0`` and ``1`` are input and output. Temporaries get
+    virtual registers ``('tmp', i)`` and constants ``('const', i)``,
+    which are mapped to physical registers in `finalize`.
+    """
+
+    def __init__(self, domain, range):
+        self.instructions = []
+        self.temp_spaces = []
+        self.constants = []
+        self.reg_spaces = {_X: domain, _OUT: range}
+
+    def new_temp(self, space):
+        reg = ('tmp', len(self.temp_spaces))
+        self.temp_spaces.append(space)
+        self.reg_spaces[reg] = space
+        return reg
+
+    def constant(self, vector):
+        for i, const in enumerate(self.constants):
+            if const is vector:
+                return ('const', i)
+        self.constants.append(vector)
+        return ('const', len(self.constants) - 1)
+
+    def emit(self, expr, dst, src):
+        """Emit instructions evaluating ``expr(src)`` into ``dst``."""
+        # Operator applications first, so that the first one can write
+        # directly into `dst`
+        terms = ([t for t in expr.terms if t[1] is not _INPUT] +
+                 [t for t in expr.terms if t[1] is _INPUT])
+        acc, acc_coeff = None, None
+
+        for c, item in terms:
+            if item is _INPUT:
+                val = src
+            else:
+                if item.inner.is_input():
+                    arg = src
+                else:
+                    arg = self.new_temp(item.operator.domain)
+                    self.emit(item.inner, arg, src)
+                val = dst if acc is None else self.new_temp(
+                    item.operator.range)
+                self.instructions.append(('call', item.operator, arg, val))
+
+            if acc is None:
+                acc, acc_coeff = val, c
+            else:
+                self.instructions.append(
+                    ('lincomb', acc_coeff, acc, c, val, dst))
+                acc, acc_coeff = dst, 1
+
+        for c, vector in expr.consts:
+            val = self.constant(vector)
+            if acc is None:
+                acc, acc_coeff = val, c
+            else:
+                self.instructions.append(
+                    ('lincomb', acc_coeff, acc, c, val, dst))
+                acc, acc_coeff = dst, 1
+
+        if acc is None:
+            self.instructions.append(('zero', dst))
+        elif acc != dst or acc_coeff != 1:
+            self.instructions.append(
+                ('lincomb', acc_coeff, acc, None, None, dst))
+
+    def finalize(self):
+        """Assign physical buffers to the temporaries by liveness analysis.
+
+        Returns
+        -------
+        instructions : list
+            Instructions with physical register indices.
+        buffer_spaces : list
+            Spaces of the scratch buffers.
+        constants : list
+            Constant vectors, in the order of their registers.
+        """
+        def regs_of(instr):
+            if instr[0] == 'call':
+                return [instr[2], instr[3]]
+            elif instr[0] == 'lincomb':
+                return [instr[2], instr[4], instr[5]]
+            else:
+                return [instr[1]]
+
+        last_use = {}
+        for i, instr in enumerate(self.instructions):
+            for reg in regs_of(instr):
+                if isinstance(reg, tuple) and reg[0] == 'tmp':
+                    last_use[reg] = i
+
+        buffer_spaces = []
+        free = []
+        assignment = {}
+        for i, instr in enumerate(self.instructions):
+            # Assign buffers to temporaries defined here
+            for reg in regs_of(instr):
+                if (isinstance(reg, tuple) and reg[0] == 'tmp' and
+                        reg not in assignment):
+                    space = self.reg_spaces[reg]
+                    for buf in free:
+                        if buffer_spaces[buf] == space:
+                            free.remove(buf)
+                            break
+                    else:
+                        buf = len(buffer_spaces)
+                        buffer_spaces.append(space)
+                    assignment[reg] = buf
+
+            # Release buffers whose temporaries are dead after this step
+            for reg in set(regs_of(instr)):
+                if last_use.get(reg) == i:
+                    free.append(assignment[reg])
+
+        num_fixed = 2 + len(buffer_spaces)
+
+        def physical(reg):
+            if reg is None or not isinstance(reg, tuple):
+                return reg
+            elif reg[0] == 'tmp':
+                return 2 + assignment[reg]
+            else:
+                return num_fixed + reg[1]
+
+        instructions = []
+        for instr in self.instructions:
+            if instr[0] == 'call':
+                instructions.append(('call', instr[1], physical(instr[2]),
+                                     physical(instr[3])))
+            elif instr[0] == 'lincomb':
+                instructions.append(('lincomb', instr[1], physical(instr[2]),
+                                     instr[3], physical(instr[4]),
+                                     physical(instr[5])))
+            else:
+                instructions.append(('zero', physical(instr[1])))
+
+        self.num_buffers = len(buffer_spaces)
+        return instructions, buffer_spaces, list(self.constants)
+
+    def describe(self, instr):
+        """Return a human-readable string for a physical instruction."""
+        def name(reg):
+            if reg == _X:
+                return 'x'
+            elif reg == _OUT:
+                return 'out'
+            elif reg < 2 + self.num_buffers:
+                return 'buf{}'.format(reg - 2)
+            else:
+                return 'const{}'.format(reg - 2 - self.num_buffers)
+
+        if instr[0] == 'call':
+            return '{} = {}({})'.format(name(instr[3]),
+                                        instr[1].__class__.__name__,
+                                        name(instr[2]))
+        elif instr[0] == 'lincomb':
+            if instr[4] is None:
+                return '{} = {} * {}'.format(name(instr[5]), instr[1],
+                                             name(instr[2]))
+            else:
+                return '{} = {} * {} + {} * {}'.format(
+                    name(instr[5]), instr[1], name(instr[2]),
+                    instr[3], name(instr[4]))
+        else:
+            return '{} = 0'.format(name(instr[1]))
+
+
+if __name__ == '__main__':
+    # pylint: disable=wrong-import-position
+    from odl.util.testutils import run_doctests
+    run_doctests()
@@ -16,10 +16,12 @@ from builtins import super
 import numpy as np
 
 from odl.operator.operator import Operator
+from odl.operator.tensor_ops import _numpy_data
 from odl.space import fn
 from odl.set import LinearSpace, Field
 from odl.discr import DiscreteLp
 from odl.space.base_ntuples import FnBase
+from odl.util import signature_string, SCRATCH_POOL
 
 __all__ = ('SamplingOperator', 'WeightedSumSamplingOperator',
            'FlatteningOperator', 'FlatteningOperatorAdjoint')
@@ -35,6 +37,9 @@ class SamplingOperator(Operator):
     with dirac deltas, see option 'point_eval'. By choosing c = cell_volume
     it approximates the integration of f over the cell by multiplying its
     function valume with the cell volume, see option 'integrate'.
+
+    The flat indices of the sampling points are computed once at
+    construction, and sampling is a single gather operation.
     """
 
     def __init__(self, domain, sampling_points, variant='point_eval'):
@@ -73,18 +78,18 @@ class SamplingOperator(Operator):
             raise TypeError('`domain` {!r} not a `FnBase` or `DiscreteLp` '
                             'instance'.format(domain))
 
+        variant, variant_in = str(variant).lower(), variant
+        if variant == 'point_eval':
+            self.__weight = 1.0
+        elif variant == 'integrate':
+            self.__weight = getattr(domain, 'cell_volume', 1.0)
+        else:
+            raise ValueError("`variant` '{}' not understood"
+                             ''.format(variant_in))
+
         self.__sampling_points = np.asarray(sampling_points, dtype=int)
         self.__variant = variant
-
-        # Converts a single sequence to an array of integers
-        # and a sequence of arrays to a vertically stacked array
-        if self.sampling_points.ndim > 1:
-            # Strides = increment in linear indices per axis
-            strides = np.concatenate((np.cumprod(domain.shape[1:])[::-1], [1]))
-            self.__indices_flat = np.sum(
-                self.sampling_points * strides[:, None], axis=0)
-        else:
-            self.__indices_flat = self.sampling_points
+        self.__indices_flat = _flat_indices(self.sampling_points, domain)
 
         range = fn(self.indices_flat.size, dtype=domain.dtype)
         super().__init__(domain, range, linear=True)
@@ -106,21 +111,22 @@ class SamplingOperator(Operator):
 
     def _call(self, x, out=None):
         """Collect indices weighted with the cell volume."""
-        if out is None:
-            out = x[self.indices_flat]
-        else:
-            out[:] = x[self.indices_flat]
+        x_arr = _numpy_data(x)
+        if x_arr is None:
+            x_arr = _flat_array(x)
 
-        if self.variant == 'point_eval':
-            weights = 1.0
-        elif self.variant == 'integrate':
-            weights = getattr(self.domain, 'cell_volume', 1.0)
+        if out is None:
+            out = self.range.element()
+        out_arr = _numpy_data(out)
+        if out_arr is not None and out_arr.dtype == x_arr.dtype:
+            # Indices are checked at construction, hence the gather can
+            # use the unbuffered 'wrap' mode
+            np.take(x_arr, self.indices_flat, out=out_arr, mode='wrap')
         else:
-            raise RuntimeError('The variant "{!r}" is not yet supported'
-                               ''.format(self.variant))
+            out[:] = np.take(x_arr, self.indices_flat, mode='wrap')
 
-        if weights != 1.0:
-            out *= weights
+        if self.__weight != 1.0:
+            out *= self.__weight
 
         return out
 
@@ -141,16 +147,19 @@ class SamplingOperator(Operator):
         >>> A.adjoint(A(x)).inner(x) - A(x).inner(A(x)) < 1e-10
         True
         """
+        try:
+            return self.__adjoint
+        except AttributeError:
+            pass
+
         if self.variant == 'point_eval':
             variant = 'dirac'
-        elif self.variant == 'integrate':
-            variant = 'char_fun'
         else:
-            raise RuntimeError('The variant "{!r}" is not yet supported'
-                               ''.format(self.variant))
+            variant = 'char_fun'
 
-        return WeightedSumSamplingOperator(self.domain, self.sampling_points,
-                                           variant)
+        self.__adjoint = WeightedSumSamplingOperator(
+            self.domain, self.sampling_points, variant)
+        return self.__adjoint
 
     def __repr__(self):
         """Return ``repr(self)``."""
@@ -170,6 +179,12 @@ class WeightedSumSamplingOperator(Operator):
 
     .. math::
         W(g)(x) == \sum_{i in sampling_points} d_i(x) g_i
+
+    The sorted distinct sampling points and the order of the sampling
+    points along them are computed once at construction. Values at
+    repeated points are summed with `numpy.ufunc.reduceat` in temporaries
+    from `odl.util.scratch.SCRATCH_POOL`, hence repeated evaluations do
+    not allocate new arrays.
     """
 
     def __init__(self, range, sampling_points, variant='dirac'):
@@ -203,19 +218,30 @@ class WeightedSumSamplingOperator(Operator):
         uniform_discr([0.0, 0.0], [1.0, 1.0], (2, 2)).element([[0.0, 1.0],
         [0.0, 1.0]])
         """
+        variant, variant_in = str(variant).lower(), variant
+        if variant == 'dirac':
+            self.__weight = getattr(range, 'cell_volume', 1.0)
+        elif variant == 'char_fun':
+            self.__weight = 1.0
+        else:
+            raise ValueError("`variant` '{}' not understood"
+                             ''.format(variant_in))
 
         self.__sampling_points = np.asarray(sampling_points, dtype=int)
         self.__variant = variant
-
-        # Converts a single sequence to an array of integers
-        # and a sequence of arrays to a vertically stacked array
-        if self.sampling_points.ndim > 1:
-            # Strides = increment in linear indices per axis
-            strides = np.concatenate((np.cumprod(range.shape[1:])[::-1], [1]))
-            self.__indices_flat = np.sum(
-                self.sampling_points * strides[:, None], axis=0)
-        else:
-            self.__indices_flat = self.sampling_points
+        self.__indices_flat = _flat_indices(self.sampling_points, range)
+
+        # Distinct indices in increasing order, the sampling points sorted
+        # along them and the start of each run of equal points
+        self.__unique_indices, unique_inverse, counts = np.unique(
+            self.indices_flat % range.size, return_inverse=True,
+            return_counts=True)
+        self.__has_duplicates = (self.__unique_indices.size <
+                                 self.indices_flat.size)
+        self.__sort_order = np.argsort(unique_inverse, kind='mergesort')
+        self.__run_starts = np.cumsum(counts) - counts
+        self.__unique_space = fn(self.__unique_indices.size,
+                                 dtype=range.dtype)
 
         domain = fn(self.indices_flat.size, dtype=range.dtype)
         super().__init__(domain, range, linear=True)
@@ -238,25 +264,33 @@ class WeightedSumSamplingOperator(Operator):
 
     def _call(self, x, out=None):
         """Sum all values if indices are given multiple times."""
-        y = np.bincount(self.indices_flat, weights=x,
-                        minlength=self.range.size)
+        x_arr = _numpy_data(x)
+        if x_arr is None:
+            x_arr = x.asarray()
 
         if out is None:
-            out = y
+            out = self.range.zero()
         else:
-            out[:] = y
-
-        if self.variant == 'dirac':
-            weights = getattr(self.range, 'cell_volume', 1.0)
-        elif self.variant == 'char_fun':
-            weights = 1.0
+            out.set_zero()
+
+        if self.__has_duplicates:
+            with SCRATCH_POOL.borrow(self.domain) as tmp, \
+                    SCRATCH_POOL.borrow(self.__unique_space) as sums:
+                # Sum the runs of the values sorted along the indices
+                tmp_arr = tmp.data
+                values = sums.data
+                np.take(x_arr, self.__sort_order, out=tmp_arr)
+                np.add.reduceat(tmp_arr, self.__run_starts, out=values)
+                if self.__weight != 1.0:
+                    values /= self.__weight
+                _scatter(out, self.__unique_indices, values)
+        elif self.__weight != 1.0:
+            with SCRATCH_POOL.borrow(self.domain) as tmp:
+                values = tmp.data
+                np.divide(x_arr, self.__weight, out=values)
+                _scatter(out, self.indices_flat, values)
         else:
-            raise RuntimeError('The variant "{!r}" is not yet supported'
-                               ''.format(self.variant))
-
-        if weights != 1.0:
-            out /= weights
-
+            _scatter(out, self.indices_flat, x_arr)
         return out
 
     @property
@@ -276,15 +310,19 @@ class WeightedSumSamplingOperator(Operator):
         >>> A.adjoint(A(x)).inner(x) - A(x).inner(A(x)) < 1e-10
         True
         """
+        try:
+            return self.__adjoint
+        except AttributeError:
+            pass
+
         if self.variant == 'dirac':
             variant = 'point_eval'
-        elif self.variant == 'char_fun':
-            variant = 'integrate'
         else:
-            raise RuntimeError('The variant "{!r}" is not yet supported'
-                               ''.format(self.variant))
+            variant = 'integrate'
 
-        return SamplingOperator(self.range, self.sampling_points, variant)
+        self.__adjoint = SamplingOperator(self.range, self.sampling_points,
+                                          variant)
+        return self.__adjoint
 
     def __repr__(self):
         """Return ``repr(self)``."""
@@ -301,9 +339,13 @@ class FlatteningOperator(Operator):
     """Operator that reshapes the object as a column vector.
 
         ``FlatteningOperator(f) == np.ravel(f)``
+
+    Out-of-place evaluation returns a new element. With ``copy=False``, it
+    returns a view into the data of the input instead whenever the
+    flattening order matches the storage order of the input.
     """
 
-    def __init__(self, domain, order='C'):
+    def __init__(self, domain, order='C', copy=True):
         """Initialize a new instance.
 
         Parameters
@@ -314,6 +356,11 @@ class FlatteningOperator(Operator):
             The flattening is performed in this order. 'C' means that
             that the last index is changing fastest or in terms of a matrix
             that the read out is row-by-row. Likewise 'F' is column-by-column.
+        copy : bool, optional
+            If ``False``, the result of out-of-place evaluation is a view
+            of the input whenever the storage allows it. This avoids a
+            copy for callers that only read the result. By default, the
+            result never shares memory with the input.
 
         Examples
         --------
@@ -324,21 +371,39 @@ class FlatteningOperator(Operator):
         >>> A = odl.FlatteningOperator(X)
         >>> A(x)
         rn(6).element([0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+
+        With ``copy=False``, the result shares memory with ``x``:
+
+        >>> A = odl.FlatteningOperator(X, copy=False)
+        >>> A(x)[0] = 10
+        >>> x[0]
+        10.0
         """
         if not isinstance(domain, (LinearSpace, Field)):
             raise TypeError('`domain` {!r} not a `LinearSpace` or `Field` '
                             'instance'.format(domain))
 
+        order, order_in = str(order).upper(), order
+        if order not in ('C', 'F'):
+            raise ValueError("`order` '{}' not understood".format(order_in))
+
         self.__order = order
+        self.__copy = bool(copy)
         range = fn(domain.size, dtype=domain.dtype)
         super().__init__(domain, range, linear=True)
 
     def _call(self, x, out=None):
         """Collect indices"""
+        arr = _numpy_data(x)
+        if arr is None or not _storage_order_matches(self.domain, self.order):
+            arr = np.ravel(x, order=self.order)
+        elif out is None and self.copy:
+            arr = arr.copy()
+
         if out is None:
-            out = np.ravel(x, order=self.order)
+            out = self.range.element(arr)
         else:
-            out[:] = np.ravel(x, order=self.order)
+            out[:] = arr
         return out
 
     @property
@@ -346,6 +411,11 @@ class FlatteningOperator(Operator):
         """order of the flattening"""
         return self.__order
 
+    @property
+    def copy(self):
+        """Whether out-of-place evaluation always copies the data."""
+        return self.__copy
+
     @property
     def adjoint(self):
         """Adjoint of the vectorising is creating an element with these
@@ -362,7 +432,12 @@ class FlatteningOperator(Operator):
         """
         # TODO: This only works for a subset of function spaces
         c = getattr(self.domain, 'cell_volume', 1.0)
-        return 1. / c * FlatteningOperatorAdjoint(self.domain)
+        adjoint = FlatteningOperatorAdjoint(self.domain, order=self.order,
+                                            copy=self.copy)
+        if c == 1.0:
+            return adjoint
+        else:
+            return 1. / c * adjoint
 
     @property
     def inverse(self):
@@ -376,11 +451,14 @@ class FlatteningOperator(Operator):
         >>> (A.inverse(A(x)) - x).norm() < 1e-10
         True
         """
-        return FlatteningOperatorAdjoint(self.domain)
+        return FlatteningOperatorAdjoint(self.domain, order=self.order,
+                                         copy=self.copy)
 
     def __repr__(self):
         """Return ``repr(self)``."""
-        return '{}({!r})'.format(self.__class__.__name__, self.domain)
+        optargs = [('order', self.order, 'C'), ('copy', self.copy, True)]
+        return '{}({})'.format(self.__class__.__name__,
+                               signature_string([self.domain], optargs))
 
     def __str__(self):
         """Return ``str(self)``."""
@@ -392,16 +470,26 @@ class FlatteningOperatorAdjoint(Operator):
     """Operator that creates an element of a vector space given its coefficients:
 
         ``FlatteningOperatorAdjoint(f) == range.element(f)``
+
+    Out-of-place evaluation returns a new element. With ``copy=False``, it
+    returns a view into the data of the input instead whenever the order
+    of the coefficients matches the storage order of the range.
     """
 
     # TODO: give the domain as an optional argument
-    def __init__(self, range):
+    def __init__(self, range, order='C', copy=True):
         """Initialize a new instance.
 
         Parameters
         ----------
         range : `LinearSpace` or `Field`
             Space that the operator should map to.
+        order : {'C', 'F'} (optional)
+            Order in which the coefficients are arranged, see
+            `FlatteningOperator`.
+        copy : bool, optional
+            If ``False``, the result of out-of-place evaluation is a view
+            of the input whenever the storage allows it.
 
         Examples
         --------
@@ -417,16 +505,47 @@ class FlatteningOperatorAdjoint(Operator):
             raise TypeError('`range` {!r} not a `LinearSpace` or `Field` '
                             'instance'.format(range))
 
+        order, order_in = str(order).upper(), order
+        if order not in ('C', 'F'):
+            raise ValueError("`order` '{}' not understood".format(order_in))
+
+        self.__order = order
+        self.__copy = bool(copy)
         domain = fn(range.size, dtype=range.dtype)
         super().__init__(domain, range, linear=True)
 
+    @property
+    def order(self):
+        """Order of the coefficients."""
+        return self.__order
+
+    @property
+    def copy(self):
+        """Whether out-of-place evaluation always copies the data."""
+        return self.__copy
+
     def _call(self, x, out=None):
         """Create a new element with the known coefficients."""
-        if out is None:
-            out = x
+        arr = _numpy_data(x)
+        if arr is None:
+            arr = x.asarray()
+
+        if _storage_order_matches(self.range, self.order):
+            # The coefficients are in storage order of the range
+            if out is None and self.copy:
+                arr = arr.copy()
+            dspace = getattr(self.range, 'dspace', None)
+            if dspace is None:
+                data = arr
+            else:
+                data = dspace.element(arr)
         else:
-            out[:] = x
+            data = arr.reshape(self.range.shape, order=self.order)
 
+        if out is None:
+            out = self.range.element(data)
+        else:
+            out.assign(self.range.element(data))
         return out
 
     @property
@@ -444,7 +563,12 @@ class FlatteningOperatorAdjoint(Operator):
         """
         # TODO: This only works for a subset of function spaces
         c = getattr(self.range, 'cell_volume', 1.0)
-        return c * FlatteningOperator(self.range)
+        adjoint = FlatteningOperator(self.range, order=self.order,
+                                     copy=self.copy)
+        if c == 1.0:
+            return adjoint
+        else:
+            return c * adjoint
 
     @property
     def inverse(self):
@@ -459,16 +583,66 @@ class FlatteningOperatorAdjoint(Operator):
         >>> (A.inverse(A(x)) - x).norm() < 1e-10
         True
         """
-        return FlatteningOperator(self.range)
+        return FlatteningOperator(self.range, order=self.order,
+                                  copy=self.copy)
 
     def __repr__(self):
         """Return ``repr(self)``."""
-        return '{}({!r})'.format(self.__class__.__name__, self.domain)
+        optargs = [('order', self.order, 'C'), ('copy', self.copy, True)]
+        return '{}({})'.format(self.__class__.__name__,
+                               signature_string([self.range], optargs))
 
     def __str__(self):
         """Return ``str(self)``."""
         return repr(self)
 
+
+def _flat_array(x):
+    """Return the values of ``x`` as flat array in storage order.
+
+    This is the same order as the one of `_numpy_data`.
+    """
+    return x.asarray().ravel(order=getattr(x.space, 'order', 'C'))
+
+
+def _storage_order_matches(space, order):
+    """Return ``True`` if ``space`` stores its elements in ``order``."""
+    shape = getattr(space, 'shape', ())
+    if sum(n > 1 for n in shape) <= 1:
+        return True
+    return getattr(space, 'order', 'C') == order
+
+
+def _flat_indices(sampling_points, space):
+    """Return checked flat indices of ``sampling_points`` in ``space``.
+
+    A 1-dimensional array of points is taken as flat indices, which may
+    be negative. Otherwise, each row holds the indices along one axis.
+    Flat indices refer to the storage order of ``space``, like the arrays
+    returned by `_numpy_data` and `_flat_array`.
+    """
+    if sampling_points.ndim > 1:
+        return np.ravel_multi_index(sampling_points, space.shape,
+                                    order=getattr(space, 'order', 'C'))
+
+    if (np.any(sampling_points >= space.size) or
+            np.any(sampling_points < -space.size)):
+        raise IndexError('sampling points out of range for space {!r}'
+                         ''.format(space))
+    return sampling_points
+
+
+def _scatter(out, indices, values):
+    """Assign ``values`` to the flat ``indices`` of the zero ``out``."""
+    out_arr = _numpy_data(out)
+    if out_arr is not None:
+        out_arr[indices] = values
+    else:
+        out_arr = np.zeros(out.space.size, dtype=out.space.dtype)
+        out_arr[indices] = values
+        out[:] = out_arr
+
+
 if __name__ == '__main__':
     # pylint: disable=wrong-import-position
     from odl.util.testutils import run_doctests
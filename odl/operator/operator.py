@@ -20,7 +20,7 @@ from numbers import Number, Integral
 import sys
 
 from odl.set import LinearSpace, LinearSpaceElement, Set, Field
-from odl.util import cache_arguments
+from odl.util import cache_arguments, SCRATCH_POOL
 
 
 __all__ = ('Operator', 'OperatorComp', 'OperatorSum', 'OperatorVectorSum',
@@ -637,6 +637,14 @@ class Operator(object):
             An object in the operator range to which the result of the
             operator evaluation is written. The result is independent
             of the initial state of this object.
+        check : bool, optional
+            If ``False``, skip the checks whether ``x`` is an element of
+            `domain` and ``out`` an element of `range`. This saves some
+            overhead in tight loops, but the caller is then responsible
+            for passing proper elements, otherwise the result is
+            undefined. Results of out-of-place evaluation that are not
+            space elements are still wrapped into `range` elements.
+            Default: ``True``
         kwargs :
             Passed on to the underlying implementation in `_call`.
 
@@ -665,11 +673,18 @@ class Operator(object):
         >>> y
         rn(3).element([2.0, 4.0, 6.0])
 
+        Evaluation without checking the arguments, for trusted code:
+
+        >>> op(x, out=y, check=False)
+        rn(3).element([2.0, 4.0, 6.0])
+
         See Also
         --------
         _call : Implementation of the method
         """
-        if x not in self.domain:
+        check = kwargs.pop('check', True)
+
+        if check and x not in self.domain:
             try:
                 x = self.domain.element(x)
             except (TypeError, ValueError) as err:
@@ -678,7 +693,7 @@ class Operator(object):
                     'the domain {!r}'.format(x, self.domain)), err)
 
         if out is not None:  # In-place evaluation
-            if out not in self.range:
+            if check and out not in self.range:
                 raise OpRangeError('`out` {!r} not an element of the range '
                                    '{!r} of {!r}'
                                    ''.format(out, self.range, self))
@@ -697,7 +712,10 @@ class Operator(object):
         else:  # Out-of-place evaluation
             out = self._call_out_of_place(x, **kwargs)
 
-            if out not in self.range:
+            # Results that are no space elements, e.g., arrays, are always
+            # wrapped, ``check=False`` only skips the membership test
+            if ((check or not isinstance(out, LinearSpaceElement)) and
+                    out not in self.range):
                 try:
                     out = self.range.element(out)
                 except (TypeError, ValueError) as err:
@@ -1099,11 +1117,10 @@ class OperatorSum(Operator):
             Second summand. Must have the same `Operator.domain` and
             `Operator.range` as ``left``.
         tmp_ran : `Operator.range` element, optional
-            Used to avoid the creation of a temporary when applying the
-            operator.
+            Used as temporary when applying the operator. By default,
+            a temporary from `odl.util.scratch.SCRATCH_POOL` is used.
         tmp_dom : `Operator.domain` element, optional
-            Used to avoid the creation of a temporary when applying the
-            operator adjoint.
+            Used as temporary when applying the operator adjoint.
 
         Examples
         --------
@@ -1158,11 +1175,10 @@ class OperatorSum(Operator):
         if out is None:
             return self.left(x) + self.right(x)
         else:
-            tmp = (self.__tmp_ran if self.__tmp_ran is not None
-                   else self.range.element())
-            self.left(x, out=out)
-            self.right(x, out=tmp)
-            out += tmp
+            with SCRATCH_POOL.borrow(self.range, self.__tmp_ran) as tmp:
+                self.left(x, out=out)
+                self.right(x, out=tmp)
+                out += tmp
 
     def derivative(self, x):
         """Return the operator derivative at ``x``.
@@ -1330,8 +1346,8 @@ class OperatorComp(Operator):
             The right ("inner") operator. Its range must coincide with the
             domain of ``left``.
         tmp : element of the range of ``right``, optional
-            Used to avoid the creation of a temporary when applying the
-            operator.
+            Used as temporary when applying the operator. By default,
+            a temporary from `odl.util.scratch.SCRATCH_POOL` is used.
         """
         if right.range != left.domain:
             raise OpTypeError('`range` {!r} of the right operator {!r} not '
@@ -1366,10 +1382,9 @@ class OperatorComp(Operator):
         if out is None:
             return self.left(self.right(x))
         else:
-            tmp = (self.__tmp if self.__tmp is not None
-                   else self.right.range.element())
-            self.right(x, out=tmp)
-            return self.left(tmp, out=out)
+            with SCRATCH_POOL.borrow(self.right.range, self.__tmp) as tmp:
+                self.right(x, out=tmp)
+                return self.left(tmp, out=out)
 
     @property
     def inverse(self):
@@ -1494,10 +1509,10 @@ class OperatorPointwiseProduct(Operator):
         if out is None:
             return self.left(x) * self.right(x)
         else:
-            tmp = self.right.range.element()
-            self.left(x, out=out)
-            self.right(x, out=tmp)
-            out *= tmp
+            with SCRATCH_POOL.borrow(self.right.range) as tmp:
+                self.left(x, out=out)
+                self.right(x, out=tmp)
+                out *= tmp
 
     def derivative(self, x):
         """Return the derivative at ``x``."""
@@ -1703,8 +1718,8 @@ class OperatorRightScalarMult(Operator):
             A real or complex number, depending on the field of
             the operator domain.
         tmp : `domain` element, optional
-            Used to avoid the creation of a temporary when applying the
-            operator.
+            Used as temporary when applying the operator. By default,
+            a temporary from `odl.util.scratch.SCRATCH_POOL` is used.
 
         Examples
         --------
@@ -1754,12 +1769,9 @@ class OperatorRightScalarMult(Operator):
         if out is None:
             return self.operator(self.scalar * x)
         else:
-            if self.__tmp is not None:
-                tmp = self.__tmp
-            else:
-                tmp = self.domain.element()
-            tmp.lincomb(self.scalar, x)
-            self.operator(tmp, out=out)
+            with SCRATCH_POOL.borrow(self.domain, self.__tmp) as tmp:
+                tmp.lincomb(self.scalar, x)
+                self.operator(tmp, out=out)
 
     def __mul__(self, other):
         """Implement ``self * other``.
@@ -14,100 +14,265 @@ from future import standard_library
 from future.utils import raise_from, native
 standard_library.install_aliases()
 
+import hashlib
+import json
+import os
 import numpy as np
 
 from odl.space.base_ntuples import FnBase
 from odl.space import ProductSpace
-from odl.util import as_flat_array
+from odl.util import as_flat_array, NumpyRandomSeed, IdentityMemo
 
-__all__ = ('matrix_representation', 'power_method_opnorm', 'as_scipy_operator',
-           'as_scipy_functional', 'as_proximal_lang_operator')
+__all__ = ('matrix_representation', 'power_method_opnorm', 'lanczos_opnorm',
+           'as_scipy_operator', 'as_scipy_functional',
+           'as_proximal_lang_operator')
 
 
-def matrix_representation(op):
+def matrix_representation(op, sparse=False, batch_size=64,
+                          sparsity_pattern=None, processes=None):
     """Return a matrix representation of a linear operator.
 
     Parameters
     ----------
     op : `Operator`
         The linear operator of which one wants a matrix representation.
+        Its domain and range must be `FnBase` or `DiscreteLp` spaces, or
+        `ProductSpace`'s with only such components.
+    sparse : bool, optional
+        If ``True``, return a ``scipy.sparse.csr_matrix``. Zeros are
+        dropped batch by batch, so the full matrix is never stored
+        densely.
+    batch_size : positive int, optional
+        Number of probe vectors that are evaluated in one batch before
+        their results are written into the matrix. This is also the
+        amount of work sent to a worker process at once.
+    sparsity_pattern : `array-like` or ``scipy.sparse`` matrix, optional
+        Boolean matrix of the same shape as the result, which is nonzero
+        (at least) where the matrix representation can be nonzero. If
+        given, columns with disjoint row patterns are probed together
+        (structural probing with a greedy graph coloring), which reduces
+        the number of operator evaluations to the number of colors.
+        Entries outside the pattern are ignored.
+    processes : positive int, optional
+        If given, the batches are evaluated in a pool of this many
+        processes. This requires ``op`` to be picklable.
 
     Returns
-    ----------
-    matrix : `numpy.ndarray`
+    -------
+    matrix : `numpy.ndarray` or ``scipy.sparse.csr_matrix``
         The matrix representation of the operator.
 
+    Examples
+    --------
+    >>> space = odl.uniform_discr(0, 1, 4)
+    >>> grad = odl.Gradient(space, pad_mode='order0')
+    >>> matrix_representation(grad, sparse=True).toarray()
+    array([[-4.,  4.,  0.,  0.],
+           [ 0., -4.,  4.,  0.],
+           [ 0.,  0., -4.,  4.],
+           [ 0.,  0.,  0.,  0.]])
+
+    With a known sparsity pattern, only two evaluations of the operator
+    are necessary for this matrix:
+
+    >>> pattern = np.eye(4, dtype=bool) | np.eye(4, k=1, dtype=bool)
+    >>> matrix = matrix_representation(grad, sparse=True,
+    ...                                sparsity_pattern=pattern)
+    >>> np.array_equal(matrix.toarray(),
+    ...                matrix_representation(grad))
+    True
+
     Notes
-    ----------
-    The algorithm works by letting the operator act on all unit vectors, and
-    stacking the output as a matrix.
+    -----
+    The algorithm works by letting the operator act on unit vectors (or
+    sums of unit vectors with disjoint patterns), and stacking the output
+    as a matrix.
     """
-
     if not op.is_linear:
         raise ValueError('the operator is not linear')
 
-    if not (isinstance(op.domain, FnBase) or
+    if not (_is_flat_space(op.domain) or
             (isinstance(op.domain, ProductSpace) and
-             all(isinstance(spc, FnBase) for spc in op.domain))):
+             all(_is_flat_space(spc) for spc in op.domain))):
         raise TypeError('operator domain {!r} is not FnBase, nor ProductSpace '
                         'with only FnBase components'.format(op.domain))
 
-    if not (isinstance(op.range, FnBase) or
+    if not (_is_flat_space(op.range) or
             (isinstance(op.range, ProductSpace) and
-             all(isinstance(spc, FnBase) for spc in op.range))):
+             all(_is_flat_space(spc) for spc in op.range))):
         raise TypeError('operator range {!r} is not FnBase, nor ProductSpace '
                         'with only FnBase components'.format(op.range))
 
-    # Get the size of the range, and handle ProductSpace
-    # Store for reuse in loop
-    op_ran_is_prod_space = isinstance(op.range, ProductSpace)
-    if op_ran_is_prod_space:
-        num_ran = op.range.size
-        n = [ran.size for ran in op.range]
+    batch_size, batch_size_in = int(batch_size), batch_size
+    if batch_size < 1:
+        raise ValueError('`batch_size` must be positive, got {}'
+                         ''.format(batch_size_in))
+
+    num_rows = sum(_part_sizes(op.range))
+    num_cols = sum(_part_sizes(op.domain))
+    dtype = np.promote_types(op.domain.dtype, op.range.dtype)
+
+    # Groups of columns that are probed with a single vector
+    if sparsity_pattern is None:
+        groups = [[j] for j in range(num_cols)]
+        pattern = None
     else:
-        num_ran = 1
-        n = [op.range.size]
-
-    # Get the size of the domain, and handle ProductSpace
-    # Store for reuse in loop
-    op_dom_is_prod_space = isinstance(op.domain, ProductSpace)
-    if op_dom_is_prod_space:
-        num_dom = op.domain.size
-        m = [dom.size for dom in op.domain]
+        import scipy.sparse
+        pattern = scipy.sparse.csc_matrix(sparsity_pattern, dtype=bool)
+        if pattern.shape != (num_rows, num_cols):
+            raise ValueError('`sparsity_pattern` has shape {}, expected {}'
+                             ''.format(pattern.shape, (num_rows, num_cols)))
+        groups = _color_columns(pattern)
+
+    batches = [groups[i:i + batch_size]
+               for i in range(0, len(groups), batch_size)]
+
+    if processes is None:
+        results = (_probe_batch(op, batch) for batch in batches)
     else:
-        num_dom = 1
-        m = [op.domain.size]
+        import multiprocessing
+        pool = multiprocessing.Pool(processes, initializer=_init_worker,
+                                    initargs=(op,))
+        results = pool.imap(_probe_batch_worker, batches)
 
-    # Generate the matrix
-    dtype = np.promote_types(op.domain.dtype, op.range.dtype)
-    matrix = np.zeros([np.sum(n), np.sum(m)], dtype=dtype)
-    tmp_ran = op.range.element()  # Store for reuse in loop
-    tmp_dom = op.domain.zero()  # Store for reuse in loop
-    index = 0
-    last_i = last_j = 0
-
-    for i in range(num_dom):
-        for j in range(m[i]):
-            if op_dom_is_prod_space:
-                tmp_dom[last_i][last_j] = 0.0
-                tmp_dom[i][j] = 1.0
-            else:
-                tmp_dom[last_j] = 0.0
-                tmp_dom[j] = 1.0
-            op(tmp_dom, out=tmp_ran)
-            if op_ran_is_prod_space:
-                tmp_idx = 0
-                for k in range(num_ran):
-                    matrix[tmp_idx: tmp_idx + op.range[k].size, index] = (
-                        as_flat_array(tmp_ran[k]))
-                    tmp_idx += op.range[k].size
+    if sparse:
+        rows, cols, values = [], [], []
+    else:
+        matrix = np.zeros([num_rows, num_cols], dtype=dtype)
+
+    try:
+        for batch, block in zip(batches, results):
+            if pattern is None:
+                batch_cols = np.array([group[0] for group in batch])
+                if sparse:
+                    nz_rows, nz_idx = np.nonzero(block)
+                    rows.append(nz_rows)
+                    cols.append(batch_cols[nz_idx])
+                    values.append(block[nz_rows, nz_idx])
+                else:
+                    matrix[:, batch_cols] = block
             else:
-                matrix[:, index] = as_flat_array(tmp_ran)
-            index += 1
-            last_j = j
-            last_i = i
+                for k, group in enumerate(batch):
+                    for j in group:
+                        col_rows = pattern.indices[
+                            pattern.indptr[j]:pattern.indptr[j + 1]]
+                        col_values = block[col_rows, k]
+                        if sparse:
+                            nonzero = col_values != 0
+                            rows.append(col_rows[nonzero])
+                            cols.append(np.full(np.count_nonzero(nonzero), j,
+                                                dtype=int))
+                            values.append(col_values[nonzero])
+                        else:
+                            matrix[col_rows, j] = col_values
+    finally:
+        if processes is not None:
+            pool.close()
+            pool.join()
+
+    if sparse:
+        import scipy.sparse
+        if rows:
+            rows, cols = np.concatenate(rows), np.concatenate(cols)
+            values = np.concatenate(values).astype(dtype, copy=False)
+        else:
+            rows = cols = np.empty(0, dtype=int)
+            values = np.empty(0, dtype=dtype)
+        return scipy.sparse.csr_matrix((values, (rows, cols)),
+                                       shape=(num_rows, num_cols))
+    else:
+        return matrix
+
+
+def _is_flat_space(space):
+    """Return ``True`` if ``space`` elements have flat data containers."""
+    return (isinstance(space, FnBase) or
+            isinstance(getattr(space, 'dspace', None), FnBase))
+
+
+def _part_sizes(space):
+    """Return the sizes of the (nested) components of ``space``."""
+    if isinstance(space, ProductSpace):
+        return [size for spc in space for size in _part_sizes(spc)]
+    else:
+        return [space.size]
+
+
+def _color_columns(pattern):
+    """Return groups of columns of ``pattern`` with disjoint row patterns.
+
+    Uses the greedy coloring of the column intersection graph in the
+    natural column order.
+    """
+    pattern_csr = pattern.tocsr()
+    num_cols = pattern.shape[1]
+    colors = np.full(num_cols, -1, dtype=int)
+    groups = []
+    for j in range(num_cols):
+        col_rows = pattern.indices[pattern.indptr[j]:pattern.indptr[j + 1]]
+        neighbors = np.concatenate(
+            [pattern_csr.indices[pattern_csr.indptr[i]:
+                                 pattern_csr.indptr[i + 1]]
+             for i in col_rows] + [np.empty(0, dtype=int)])
+        forbidden = set(colors[neighbors].tolist())
+        color = 0
+        while color in forbidden:
+            color += 1
+        colors[j] = color
+        if color == len(groups):
+            groups.append([])
+        groups[color].append(j)
+    return groups
+
+
+def _probe_batch(op, groups):
+    """Return the flat results of ``op`` applied to sums of unit vectors.
+
+    Column ``k`` of the returned array is ``op`` applied to the sum of the
+    unit vectors with the (global, flat) indices in ``groups[k]``.
+    """
+    dom_sizes = _part_sizes(op.domain)
+    dom_offsets = np.cumsum([0] + dom_sizes)
+    ran_offsets = np.cumsum([0] + _part_sizes(op.range))
+    dom_is_prod = isinstance(op.domain, ProductSpace)
+    ran_is_prod = isinstance(op.range, ProductSpace)
+
+    block = np.empty((ran_offsets[-1], len(groups)),
+                     dtype=np.promote_types(op.domain.dtype, op.range.dtype))
+    tmp_dom = op.domain.zero()
+    tmp_ran = op.range.element()
+    dom_parts = list(tmp_dom) if dom_is_prod else [tmp_dom]
+    ran_parts = list(tmp_ran) if ran_is_prod else [tmp_ran]
+
+    for k, group in enumerate(groups):
+        parts = np.searchsorted(dom_offsets, group, side='right') - 1
+        for idx, part in zip(group, parts):
+            dom_parts[part][int(idx - dom_offsets[part])] = 1.0
+
+        op(tmp_dom, out=tmp_ran)
+        for part, ran_part in enumerate(ran_parts):
+            block[ran_offsets[part]:ran_offsets[part + 1], k] = (
+                as_flat_array(ran_part))
+
+        for idx, part in zip(group, parts):
+            dom_parts[part][int(idx - dom_offsets[part])] = 0.0
 
-    return matrix
+    return block
+
+
+# Operator evaluated in a worker process of `matrix_representation`
+_WORKER_OP = None
+
+
+def _init_worker(op):
+    """Initialize a worker process of `matrix_representation`."""
+    global _WORKER_OP
+    _WORKER_OP = op
+
+
+def _probe_batch_worker(groups):
+    """Run `_probe_batch` in a worker process."""
+    return _probe_batch(_WORKER_OP, groups)
 
 
 def power_method_opnorm(op, xstart=None, maxiter=100, rtol=1e-05, atol=1e-08,
@@ -257,6 +422,242 @@ def power_method_opnorm(op, xstart=None, maxiter=100, rtol=1e-05, atol=1e-08,
     return opnorm
 
 
+def lanczos_opnorm(op, xstart=None, maxiter=50, rtol=1e-06,
+                   smallest=False, callback=None, cache_dir=None):
+    """Estimate the operator norm with Lanczos bidiagonalization.
+
+    The Golub-Kahan-Lanczos process builds a bidiagonal matrix whose
+    singular values approximate the extremal singular values of ``op``.
+    The largest one usually converges in far fewer operator evaluations
+    than with `power_method_opnorm`.
+
+    Results are memoized per operator instance, so repeated calls with
+    the same ``op`` and parameters do not evaluate the operator again.
+
+    Parameters
+    ----------
+    op : `Operator`
+        Linear operator whose norm is to be estimated. It must have an
+        `Operator.adjoint`.
+    xstart : ``op.domain`` `element-like`, optional
+        Starting point of the iteration. By default, a pseudo-random
+        element with fixed seed is used. Results are only memoized
+        and cached if this is not given.
+    maxiter : positive int, optional
+        Maximum number of iterations. Each iteration evaluates ``op``
+        and ``op.adjoint`` once.
+    rtol : float, optional
+        Stop when the change of each estimate in one iteration, relative
+        to the estimate itself, is less than this value.
+    smallest : bool, optional
+        If ``True``, also return an estimate of the smallest singular
+        value. It is an upper bound of the true smallest singular value
+        and converges much more slowly than the largest one, typically
+        needing a larger ``maxiter``. If ``maxiter`` is reached, the
+        estimate can be far from the true value.
+    callback : callable, optional
+        Function called with the current estimate of the largest
+        singular value in each iteration.
+    cache_dir : str, optional
+        Directory of an on-disk cache of the results. It is used for
+        operators built from `RayTransform`, `Gradient`, scaling and
+        identity operators with sums, compositions and the product space
+        operators, which are identified by a hash of their spaces,
+        geometries and parameters. For other operators, it is ignored.
+
+    Returns
+    -------
+    est_opnorm : float
+        The estimated operator norm of ``op``, i.e., its largest
+        singular value.
+    est_smallest : float
+        The estimated smallest singular value, only returned if
+        ``smallest=True``.
+
+    Examples
+    --------
+    >>> space = odl.uniform_discr(0, 1, 5)
+    >>> op = odl.ScalingOperator(space, 3)
+    >>> lanczos_opnorm(op)
+    3.0
+    >>> op = odl.MultiplyOperator(space.element([1, 2, 3, 4, 5]))
+    >>> largest, smallest = lanczos_opnorm(op, smallest=True)
+    >>> round(largest, 6), round(smallest, 6)
+    (5.0, 1.0)
+    """
+    maxiter, maxiter_in = int(maxiter), maxiter
+    if maxiter <= 0:
+        raise ValueError('`maxiter` must be positive, got {}'
+                         ''.format(maxiter_in))
+    if not op.is_linear:
+        raise ValueError('`op` must be linear')
+
+    smallest = bool(smallest)
+    params = (maxiter, float(rtol), smallest)
+    use_cache = xstart is None
+
+    if use_cache:
+        try:
+            return _OPNORM_MEMO[op][params]
+        except KeyError:
+            pass
+
+        cache_file = None
+        if cache_dir is not None:
+            op_key = _opnorm_cache_key(op)
+            if op_key is not None:
+                key_str = repr((op_key, params)).encode('utf-8')
+                cache_file = os.path.join(
+                    cache_dir, 'opnorm_{}.json'.format(
+                        hashlib.sha1(key_str).hexdigest()))
+                try:
+                    with open(cache_file) as f:
+                        result = json.load(f)
+                except (IOError, OSError, ValueError):
+                    pass
+                else:
+                    result = tuple(result) if smallest else result
+                    _OPNORM_MEMO.setdefault(op, {})[params] = result
+                    return result
+
+    # Starting point
+    if xstart is None:
+        with NumpyRandomSeed(0):
+            v = _random_element(op.domain)
+    else:
+        v = op.domain.element(xstart).copy()
+    v_norm = v.norm()
+    if v_norm == 0:
+        raise ValueError('`xstart` must be nonzero')
+    v /= v_norm
+
+    adjoint = op.adjoint
+    u = op(v)
+    alphas = [u.norm()]
+    betas = []
+    w = op.domain.element()
+    tmp = op.range.element()
+
+    est, est_old = alphas[0], None
+    est_small, est_small_old = alphas[0], None
+    for _ in range(1, maxiter):
+        if alphas[-1] == 0:
+            break
+        u /= alphas[-1]
+
+        # w = A^* u - alpha * v
+        adjoint(u, out=w)
+        w.lincomb(1, w, -alphas[-1], v)
+        beta = w.norm()
+        if beta == 0:
+            break
+        betas.append(beta)
+        w /= beta
+        v, w = w, v
+
+        # u = A v - beta * u
+        op(v, out=tmp)
+        tmp.lincomb(1, tmp, -beta, u)
+        u, tmp = tmp, u
+        alphas.append(u.norm())
+
+        # Singular values of the upper bidiagonal matrix
+        bidiag = np.diag(alphas) + np.diag(betas, 1)
+        svals = np.linalg.svd(bidiag, compute_uv=False)
+        est, est_old = svals[0], est
+        est_small, est_small_old = svals[-1], est_small
+
+        if callback is not None:
+            callback(est)
+
+        if (abs(est - est_old) <= rtol * est and
+                (not smallest or
+                 abs(est_small - est_small_old) <= rtol * est_small)):
+            break
+
+    if smallest:
+        result = (float(est), float(est_small))
+    else:
+        result = float(est)
+
+    if use_cache:
+        _OPNORM_MEMO.setdefault(op, {})[params] = result
+        if cache_file is not None:
+            try:
+                if not os.path.isdir(cache_dir):
+                    os.makedirs(cache_dir)
+                tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+                with open(tmp_file, 'w') as f:
+                    json.dump(result, f)
+                os.rename(tmp_file, cache_file)
+            except (IOError, OSError):
+                pass
+
+    return result
+
+
+def _random_element(space):
+    """Return an element of ``space`` with standard normal entries."""
+    if isinstance(space, ProductSpace):
+        return space.element([_random_element(spc) for spc in space])
+    return space.element(np.random.standard_normal(space.shape))
+
+
+# Memoized results of `lanczos_opnorm`, `op -> {params: result}`
+_OPNORM_MEMO = IdentityMemo()
+
+
+def _opnorm_cache_key(op):
+    """Return a string identifying ``op`` for the on-disk cache.
+
+    Returns ``None`` if ``op`` (or one of its parts) is not a type whose
+    defining data is known.
+    """
+    # Imported here to avoid circular imports
+    from odl.operator.operator import (
+        OperatorSum, OperatorComp, OperatorLeftScalarMult,
+        OperatorRightScalarMult)
+    from odl.operator.default_ops import ScalingOperator
+    from odl.operator.pspace_ops import (
+        ProductSpaceOperator, BroadcastOperator, ReductionOperator)
+
+    def key(op):
+        name = op.__class__.__name__
+        if op.__class__.__module__.split('.')[0] != 'odl':
+            raise LookupError
+        if isinstance(op, (OperatorSum, OperatorComp)):
+            parts = [key(op.left), key(op.right)]
+        elif isinstance(op, (OperatorLeftScalarMult,
+                             OperatorRightScalarMult)):
+            parts = [repr(op.scalar), key(op.operator)]
+        elif isinstance(op, (BroadcastOperator, ReductionOperator)):
+            parts = [key(sub_op) for sub_op in op.operators]
+        elif isinstance(op, ProductSpaceOperator):
+            parts = ([op.ops.row.tolist(), op.ops.col.tolist()] +
+                     [key(sub_op) for sub_op in op.ops.data])
+        elif isinstance(op, ScalingOperator):
+            parts = [repr(op.domain), repr(op.scalar)]
+        elif name == 'Gradient':
+            parts = [repr(op.domain), repr(op.range), op.method,
+                     op.pad_mode, repr(op.pad_const)]
+        elif name == 'RayTransform':
+            geom = op.geometry
+            grid_hash = hashlib.sha1()
+            for grid in (geom.motion_grid, geom.det_grid):
+                for vec in grid.coord_vectors:
+                    grid_hash.update(np.ascontiguousarray(vec).tobytes())
+            parts = [repr(op.domain), repr(op.range), op.impl, repr(geom),
+                     grid_hash.hexdigest()]
+        else:
+            raise LookupError
+        return [name] + parts
+
+    try:
+        return repr(key(op))
+    except LookupError:
+        return None
+
+
 def as_scipy_operator(op):
     """Wrap ``op`` as a ``scipy.sparse.linalg.LinearOperator``.
 
@@ -270,8 +671,9 @@ def as_scipy_operator(op):
     Returns
     -------
     ``scipy.sparse.linalg.LinearOperator`` : linear_op
-        The wrapped operator, has attributes ``matvec`` which calls ``op``,
-        and ``rmatvec`` which calls ``op.adjoint``.
+        The wrapped operator, has attributes ``matvec`` and ``matmat``,
+        which call ``op``, and ``rmatvec`` and ``rmatmat``, which call
+        ``op.adjoint``. Its ``dtype`` is the data type of ``op.domain``.
 
     Examples
     --------
@@ -284,11 +686,23 @@ def as_scipy_operator(op):
     >>> result
     array([ 0.,  1.,  0.])
 
+    Several vectors can be processed at once, with the vectors as
+    columns of a matrix. Single precision is preserved:
+
+    >>> op = odl.ScalingOperator(odl.rn(2, dtype='float32'), 2)
+    >>> scipy_op = as_scipy_operator(op)
+    >>> scipy_op.matmat(np.array([[1, 2, 3],
+    ...                           [4, 5, 6]], dtype='float32'))
+    array([[  2.,   4.,   6.],
+           [  8.,  10.,  12.]], dtype=float32)
+
     Notes
     -----
     If the data representation of ``op``'s domain and range is of type
-    `NumpyFn` this incurs no significant overhead. If the space type is
-    ``CudaFn`` or some other nonlocal type, the overhead is significant.
+    `NumpyFn` (also as data space of a `DiscreteLp` or as components of a
+    `ProductSpace`), the input and output arrays are wrapped as space
+    elements without copying. For other space types, e.g., ``CudaFn``,
+    the data is copied, and the overhead is significant.
     """
     if not op.is_linear:
         raise ValueError('`op` needs to be linear')
@@ -298,25 +712,92 @@ def as_scipy_operator(op):
         raise ValueError('dtypes of ``op.domain`` and ``op.range`` needs to '
                          'match')
 
-    def as_flat_array(arr):
-        if hasattr(arr, 'order'):
-            return arr.asarray().ravel(arr.order)
-        else:
-            return arr.asarray()
+    shape = (native(sum(_part_sizes(op.range))),
+             native(sum(_part_sizes(op.domain))))
 
-    shape = (native(op.range.size), native(op.domain.size))
+    import scipy.sparse.linalg
 
-    def matvec(v):
-        return as_flat_array(op(v))
+    class OdlLinearOperator(scipy.sparse.linalg.LinearOperator):
 
-    def rmatvec(v):
-        return as_flat_array(op.adjoint(v))
+        """Wrapper of an ODL operator as scipy ``LinearOperator``."""
 
-    import scipy.sparse.linalg
-    return scipy.sparse.linalg.LinearOperator(shape=shape,
-                                              matvec=matvec,
-                                              rmatvec=rmatvec,
-                                              dtype=dtype)
+        def __init__(self):
+            super(OdlLinearOperator, self).__init__(dtype=dtype, shape=shape)
+
+        def _matvec(self, x):
+            return _apply_flat(op, x.reshape(-1, 1), dtype)[:, 0]
+
+        def _rmatvec(self, x):
+            return _apply_flat(op.adjoint, x.reshape(-1, 1), dtype)[:, 0]
+
+        def _matmat(self, x):
+            return _apply_flat(op, x, dtype)
+
+        def _rmatmat(self, x):
+            return _apply_flat(op.adjoint, x, dtype)
+
+    return OdlLinearOperator()
+
+
+def _apply_flat(op, x, dtype):
+    """Apply ``op`` to the columns of the 2d array ``x``.
+
+    Columns are wrapped as elements without copying if possible, and
+    results are written directly into the columns of the returned array.
+    """
+    x = np.asarray(x, dtype=dtype, order='F')
+    out = np.empty((sum(_part_sizes(op.range)), x.shape[1]), dtype=dtype,
+                   order='F')
+    for j in range(x.shape[1]):
+        x_elem, _ = _wrap_flat(op.domain, x[:, j])
+        out_elem, out_is_view = _wrap_flat(op.range, out[:, j])
+        op(x_elem, out=out_elem)
+        if not out_is_view:
+            out[:, j] = _flat_copy(out_elem)
+    return out
+
+
+def _wrap_flat(space, arr):
+    """Return an element of ``space`` that represents the flat ``arr``.
+
+    Returns
+    -------
+    elem : ``space`` element
+        Element with the values of ``arr``.
+    is_view : bool
+        ``True`` if ``elem`` uses ``arr`` as storage.
+    """
+    if isinstance(space, ProductSpace):
+        offsets = np.cumsum([0] + [sum(_part_sizes(spc)) for spc in space])
+        wrapped = [_wrap_flat(spc, arr[offsets[i]:offsets[i + 1]])
+                   for i, spc in enumerate(space)]
+        parts = [part for part, _ in wrapped]
+        is_view = all(part_is_view for _, part_is_view in wrapped)
+        if space.is_contiguous and is_view:
+            data = arr.reshape((len(space), space[0].size))
+            return space.element_type(space, parts, data=data), True
+        else:
+            return space.element(parts), is_view and not space.is_contiguous
+
+    dspace = getattr(space, 'dspace', space)
+    if getattr(dspace, 'impl', None) == 'numpy' and dspace.dtype == arr.dtype:
+        dspace_elem = dspace.element(arr)
+        if dspace is space:
+            return dspace_elem, True
+        else:
+            return space.element(dspace_elem), True
+    else:
+        return space.element(arr.reshape(space.shape,
+                                         order=getattr(space, 'order', 'C'))
+                             ), False
+
+
+def _flat_copy(elem):
+    """Return the data of ``elem`` as a flat array."""
+    if isinstance(elem.space, ProductSpace):
+        return np.concatenate([_flat_copy(part) for part in elem])
+    else:
+        return as_flat_array(elem)
 
 
 def as_scipy_functional(func, return_gradient=False):
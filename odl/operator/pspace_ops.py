@@ -21,6 +21,8 @@ from numbers import Integral
 from odl.operator.operator import Operator
 from odl.operator.default_ops import ZeroOperator
 from odl.space import ProductSpace
+from odl.util import (
+    SCRATCH_POOL, call_in_worker, in_worker_thread, thread_pool)
 
 
 __all__ = ('ProductSpaceOperator',
@@ -94,7 +96,7 @@ class ProductSpaceOperator(Operator):
     DiagonalOperator : Case where the 'matrix' is diagonal.
     """
 
-    def __init__(self, operators, domain=None, range=None):
+    def __init__(self, operators, domain=None, range=None, parallel=False):
         """Initialize a new instance.
 
         Parameters
@@ -109,6 +111,15 @@ class ProductSpaceOperator(Operator):
             Range of the operator. If not provided, it is tried to be
             inferred from the operators. This requires each **row**
             to contain at least one operator.
+        parallel : bool, int or `ThreadPoolExecutor`, optional
+            If ``True``, the component operators are evaluated
+            concurrently on a shared thread pool. An integer gives the
+            number of worker threads, and a thread pool is used as it
+            is, see `thread_pool`. Process pools are not supported. The
+            results in a row are always summed in the same order, hence
+            the result does not depend on this option.
+            Derived operators like the adjoint inherit this setting.
+            Default: ``False``
 
         Examples
         --------
@@ -215,9 +226,19 @@ class ProductSpaceOperator(Operator):
         linear = all(op.is_linear for op in self.ops.data)
 
         super().__init__(domain=domain, range=range, linear=linear)
+        self.__parallel = parallel
+        self.__executor, _ = thread_pool(parallel)
+
+    @property
+    def parallel(self):
+        """Parallelization setting of the block evaluation."""
+        return self.__parallel
 
     def _call(self, x, out=None):
         """Call the operators on the parts of ``x``."""
+        if self.__executor is not None and not in_worker_thread():
+            return self._call_parallel(x, out)
+
         # TODO: add optimization in case an operator appears repeatedly in a
         # row
         if out is None:
@@ -241,6 +262,47 @@ class ProductSpaceOperator(Operator):
 
         return out
 
+    def _call_parallel(self, x, out=None):
+        """Call the operators concurrently on the parts of ``x``.
+
+        The first operator in each row writes to the output directly, the
+        others to temporaries, which are summed up afterwards in the order
+        of the operators.
+        """
+        if out is None:
+            out = self.range.element()
+
+        tasks = []
+        tmps = []
+        evaluated_rows = set()
+        try:
+            for i, j, op in zip(self.ops.row, self.ops.col, self.ops.data):
+                if i not in evaluated_rows:
+                    dst = out[i]
+                    evaluated_rows.add(i)
+                else:
+                    dst = SCRATCH_POOL.acquire(self.range[i])
+                    tmps.append((i, dst))
+                tasks.append(self.__executor.submit(call_in_worker,
+                                                    op, x[j], out=dst))
+
+            for task in tasks:
+                task.result()
+            for i, tmp in tmps:
+                out[i] += tmp
+        finally:
+            for task in tasks:
+                # Make sure no temporary is in use before releasing it
+                task.exception()
+            for _, tmp in tmps:
+                SCRATCH_POOL.release(tmp)
+
+        for i in range(len(self.range)):
+            if i not in evaluated_rows:
+                out[i].set_zero()
+
+        return out
+
     def derivative(self, x):
         """Derivative of the product space operator.
 
@@ -307,7 +369,8 @@ class ProductSpaceOperator(Operator):
         indices = [self.ops.row, self.ops.col]
         shape = self.ops.shape
         deriv_matrix = sp.sparse.coo_matrix((deriv_ops, indices), shape)
-        return ProductSpaceOperator(deriv_matrix, self.domain, self.range)
+        return ProductSpaceOperator(deriv_matrix, self.domain, self.range,
+                                    parallel=self.parallel)
 
     @property
     def adjoint(self):
@@ -350,7 +413,8 @@ class ProductSpaceOperator(Operator):
         indices = [self.ops.col, self.ops.row]  # Swap col/row -> transpose
         shape = (self.ops.shape[1], self.ops.shape[0])
         adj_matrix = sp.sparse.coo_matrix((adjoint_ops, indices), shape)
-        return ProductSpaceOperator(adj_matrix, self.range, self.domain)
+        return ProductSpaceOperator(adj_matrix, self.range, self.domain,
+                                    parallel=self.parallel)
 
     def __getitem__(self, index):
         """Get sub-operator by index.
@@ -413,7 +477,7 @@ class ProductSpaceOperator(Operator):
                 if ops[i] is None:
                     ops[i] = ZeroOperator(self.domain[i])
 
-            return ReductionOperator(*ops)
+            return ReductionOperator(*ops, parallel=self.parallel)
 
     @property
     def shape(self):
@@ -434,7 +498,11 @@ class ProductSpaceOperator(Operator):
         aslist = [[0] * self.domain.size for _ in range(self.range.size)]
         for i, j, op in zip(self.ops.row, self.ops.col, self.ops.data):
             aslist[i][j] = op
-        return '{}({!r})'.format(self.__class__.__name__, aslist)
+        if self.parallel is False:
+            return '{}({!r})'.format(self.__class__.__name__, aslist)
+        else:
+            return '{}({!r}, parallel={!r})'.format(
+                self.__class__.__name__, aslist, self.parallel)
 
 
 class ComponentProjection(Operator):
@@ -645,7 +713,7 @@ class BroadcastOperator(Operator):
     ReductionOperator : Calculates sum of operator results.
     DiagonalOperator : Case where each operator should have its own argument.
     """
-    def __init__(self, *operators):
+    def __init__(self, *operators, **kwargs):
         """Initialize a new instance
 
         Parameters
@@ -654,6 +722,10 @@ class BroadcastOperator(Operator):
             The individual operators that should be evaluated.
             Can also be given as ``operator, n`` with ``n`` integer,
             in which case ``operator`` is repeated ``n`` times.
+        parallel : bool, int or executor, optional
+            Evaluate the operators concurrently, see
+            `ProductSpaceOperator` for details.
+            Default: ``False``
 
         Examples
         --------
@@ -687,8 +759,14 @@ class BroadcastOperator(Operator):
                 isinstance(operators[1], Integral)):
             operators = (operators[0],) * operators[1]
 
+        parallel = kwargs.pop('parallel', False)
+        if kwargs:
+            raise TypeError('got unexpected keyword arguments {}'
+                            ''.format(kwargs))
+
         self.__operators = operators
-        self.__prod_op = ProductSpaceOperator([[op] for op in operators])
+        self.__prod_op = ProductSpaceOperator([[op] for op in operators],
+                                              parallel=parallel)
 
         super().__init__(self.prod_op.domain[0],
                          self.prod_op.range,
@@ -699,6 +777,11 @@ class BroadcastOperator(Operator):
         """`ProductSpaceOperator` implementation."""
         return self.__prod_op
 
+    @property
+    def parallel(self):
+        """Parallelization setting of the evaluation."""
+        return self.prod_op.parallel
+
     @property
     def operators(self):
         """Tuple of sub-operators that comprise ``self``."""
@@ -761,7 +844,8 @@ class BroadcastOperator(Operator):
         ])
         """
         return BroadcastOperator(*[op.derivative(x) for op in
-                                   self.operators])
+                                   self.operators],
+                                 parallel=self.parallel)
 
     @property
     def adjoint(self):
@@ -778,7 +862,8 @@ class BroadcastOperator(Operator):
         >>> op.adjoint([[1, 2, 3], [2, 3, 4]])
         rn(3).element([5.0, 8.0, 11.0])
         """
-        return ReductionOperator(*[op.adjoint for op in self.operators])
+        return ReductionOperator(*[op.adjoint for op in self.operators],
+                                 parallel=self.parallel)
 
     def __repr__(self):
         """Return ``repr(self)``.
@@ -794,11 +879,12 @@ class BroadcastOperator(Operator):
         BroadcastOperator(IdentityOperator(rn(3)), ScalingOperator(rn(3), 3.0))
         """
         if all(op == self[0] for op in self):
-            return '{}({!r}, {})'.format(self.__class__.__name__,
-                                         self[0], len(self))
+            inner_repr = '{!r}, {}'.format(self[0], len(self))
         else:
-            op_repr = ', '.join(repr(op) for op in self)
-            return '{}({})'.format(self.__class__.__name__, op_repr)
+            inner_repr = ', '.join(repr(op) for op in self)
+        if self.parallel is not False:
+            inner_repr += ', parallel={!r}'.format(self.parallel)
+        return '{}({})'.format(self.__class__.__name__, inner_repr)
 
 
 class ReductionOperator(Operator):
@@ -815,7 +901,7 @@ class ReductionOperator(Operator):
     BroadcastOperator : Calls several operators with same argument.
     DiagonalOperator : Case where each operator should have its own argument.
     """
-    def __init__(self, *operators):
+    def __init__(self, *operators, **kwargs):
         """Initialize a new instance.
 
         Parameters
@@ -824,6 +910,11 @@ class ReductionOperator(Operator):
             The individual operators that should be evaluated and summed.
             Can also be given as ``operator, n`` with ``n`` integer,
             in which case ``operator`` is repeated ``n`` times.
+        parallel : bool, int or executor, optional
+            Evaluate the operators concurrently, see
+            `ProductSpaceOperator` for details. The results are summed
+            in the order of the operators.
+            Default: ``False``
 
         Examples
         --------
@@ -863,8 +954,13 @@ class ReductionOperator(Operator):
                 isinstance(operators[1], Integral)):
             operators = (operators[0],) * operators[1]
 
+        parallel = kwargs.pop('parallel', False)
+        if kwargs:
+            raise TypeError('got unexpected keyword arguments {}'
+                            ''.format(kwargs))
+
         self.__operators = operators
-        self.__prod_op = ProductSpaceOperator([operators])
+        self.__prod_op = ProductSpaceOperator([operators], parallel=parallel)
 
         super().__init__(self.prod_op.domain,
                          self.prod_op.range[0],
@@ -875,6 +971,11 @@ class ReductionOperator(Operator):
         """`ProductSpaceOperator` implementation."""
         return self.__prod_op
 
+    @property
+    def parallel(self):
+        """Parallelization setting of the evaluation."""
+        return self.prod_op.parallel
+
     @property
     def operators(self):
         """Tuple of sub-operators that comprise ``self``."""
@@ -945,7 +1046,8 @@ class ReductionOperator(Operator):
         rn(3).element([9.0, 14.0, 19.0])
         """
         return ReductionOperator(*[op.derivative(xi)
-                                   for op, xi in zip(self.operators, x)])
+                                   for op, xi in zip(self.operators, x)],
+                                 parallel=self.parallel)
 
     @property
     def adjoint(self):
@@ -965,7 +1067,8 @@ class ReductionOperator(Operator):
             [2.0, 4.0, 6.0]
         ])
         """
-        return BroadcastOperator(*[op.adjoint for op in self.operators])
+        return BroadcastOperator(*[op.adjoint for op in self.operators],
+                                 parallel=self.parallel)
 
     def __repr__(self):
         """Return ``repr(self)``.
@@ -981,11 +1084,12 @@ class ReductionOperator(Operator):
         ReductionOperator(IdentityOperator(rn(3)), ScalingOperator(rn(3), 3.0))
         """
         if all(op == self[0] for op in self):
-            return '{}({!r}, {})'.format(self.__class__.__name__,
-                                         self[0], len(self))
+            inner_repr = '{!r}, {}'.format(self[0], len(self))
         else:
-            op_repr = ', '.join(repr(op) for op in self)
-            return '{}({})'.format(self.__class__.__name__, op_repr)
+            inner_repr = ', '.join(repr(op) for op in self)
+        if self.parallel is not False:
+            inner_repr += ', parallel={!r}'.format(self.parallel)
+        return '{}({})'.format(self.__class__.__name__, inner_repr)
 
 
 class DiagonalOperator(ProductSpaceOperator):
@@ -1110,7 +1214,8 @@ class DiagonalOperator(ProductSpaceOperator):
 
         derivs = [op.derivative(p) for op, p in zip(self.operators, point)]
         return DiagonalOperator(*derivs,
-                                domain=self.domain, range=self.range)
+                                domain=self.domain, range=self.range,
+                                parallel=self.parallel)
 
     @property
     def adjoint(self):
@@ -1139,7 +1244,8 @@ class DiagonalOperator(ProductSpaceOperator):
         """
         adjoints = [op.adjoint for op in self.operators]
         return DiagonalOperator(*adjoints,
-                                domain=self.range, range=self.domain)
+                                domain=self.range, range=self.domain,
+                                parallel=self.parallel)
 
     @property
     def inverse(self):
@@ -1168,7 +1274,8 @@ class DiagonalOperator(ProductSpaceOperator):
         """
         inverses = [op.inverse for op in self.operators]
         return DiagonalOperator(*inverses,
-                                domain=self.range, range=self.domain)
+                                domain=self.range, range=self.domain,
+                                parallel=self.parallel)
 
     def __repr__(self):
         """Return ``repr(self)``.
@@ -1184,11 +1291,12 @@ class DiagonalOperator(ProductSpaceOperator):
         DiagonalOperator(IdentityOperator(rn(3)), ScalingOperator(rn(3), 3.0))
         """
         if all(op == self[0] for op in self):
-            return '{}({!r}, {})'.format(self.__class__.__name__,
-                                         self[0], len(self))
+            inner_repr = '{!r}, {}'.format(self[0], len(self))
         else:
-            op_repr = ', '.join(repr(op) for op in self)
-            return '{}({})'.format(self.__class__.__name__, op_repr)
+            inner_repr = ', '.join(repr(op) for op in self)
+        if self.parallel is not False:
+            inner_repr += ', parallel={!r}'.format(self.parallel)
+        return '{}({})'.format(self.__class__.__name__, inner_repr)
 
 
 if __name__ == '__main__':
@@ -16,13 +16,16 @@ from builtins import super
 
 import numpy as np
 import scipy
+import scipy.sparse
 
 from odl.operator import Operator
 from odl.set import RealNumbers, ComplexNumbers, LinearSpace
 from odl.space import ProductSpace, fn
 from odl.space.base_ntuples import FnBase
-from odl.space.npy_ntuples import NumpyFn
-from odl.util import writable_array, signature_string, indent_rows
+from odl.space.npy_ntuples import NumpyFn, NumpyFnVector, CHUNK_SIZE
+from odl.util import (
+    writable_array, signature_string, indent_rows, thread_pool,
+    in_worker_thread)
 
 
 __all__ = ('PointwiseNorm', 'PointwiseInner', 'PointwiseSum', 'MatrixOperator')
@@ -108,9 +111,13 @@ class PointwiseNorm(PointwiseTensorFieldOperator):
     space. For example, if ``X`` is a `DiscreteLp` space, then
     ``ProductSpace(X, d)`` is a valid domain for any positive integer
     ``d``.
+
+    For components stored in Numpy arrays, the norm is computed in a
+    single pass over the data, processing all components chunk by chunk.
     """
 
-    def __init__(self, vfspace, exponent=None, weighting=None):
+    def __init__(self, vfspace, exponent=None, weighting=None,
+                 parallel=False):
         """Initialize a new instance.
 
         Parameters
@@ -131,6 +138,12 @@ class PointwiseNorm(PointwiseTensorFieldOperator):
             By default, the weights are is taken from
             ``domain.weighting``. Note that this excludes unusual
             weightings with custom inner product, norm or dist.
+        parallel : bool, int or `ThreadPoolExecutor`, optional
+            If ``True``, large vector fields are processed in blocks on
+            a shared thread pool. An integer gives the number of worker
+            threads, and a thread pool is used as it is, see
+            `thread_pool`. Process pools are not supported.
+            Default: ``False``
 
         Examples
         --------
@@ -206,6 +219,8 @@ class PointwiseNorm(PointwiseTensorFieldOperator):
                 raise ValueError('weighting array {} contains invalid '
                                  'entries'.format(weighting))
         self.__is_weighted = not np.array_equiv(self.weights, 1.0)
+        self.__parallel = parallel
+        self.__executor, self.__num_workers = thread_pool(parallel)
 
     @property
     def exponent(self):
@@ -222,9 +237,22 @@ class PointwiseNorm(PointwiseTensorFieldOperator):
         """``True`` if weighting is not 1 or all ones."""
         return self.__is_weighted
 
+    @property
+    def parallel(self):
+        """Parallelization setting of the evaluation."""
+        return self.__parallel
+
     def _call(self, f, out):
         """Implement ``self(f, out)``."""
-        if self.exponent == 1.0:
+        arrays = _component_arrays(f)
+        out_arr = _numpy_data(out)
+        if (arrays is not None and out_arr is not None and
+                np.issubdtype(out_arr.dtype, np.inexact)):
+            weights = self.weights if self.is_weighted else None
+            _run_blocks(self.__executor, self.__num_workers,
+                        _pointwise_norm_kernel, out_arr.size,
+                        arrays, out_arr, weights, self.exponent)
+        elif self.exponent == 1.0:
             self._call_vecfield_1(f, out)
         elif self.exponent == float('inf'):
             self._call_vecfield_inf(f, out)
@@ -342,7 +370,8 @@ class PointwiseNorm(PointwiseTensorFieldOperator):
         for gi in inner_vf:
             gi /= vf_pwnorm_fac * gi ** (self.exponent - 2)
 
-        return PointwiseInner(self.domain, inner_vf, weighting=self.weights)
+        return PointwiseInner(self.domain, inner_vf, weighting=self.weights,
+                              parallel=self.parallel)
 
 
 class PointwiseInnerBase(PointwiseTensorFieldOperator):
@@ -351,7 +380,8 @@ class PointwiseInnerBase(PointwiseTensorFieldOperator):
     Implemented to allow code reuse between the classes.
     """
 
-    def __init__(self, adjoint, vfspace, vecfield, weighting=None):
+    def __init__(self, adjoint, vfspace, vecfield, weighting=None,
+                 parallel=False):
         """Initialize a new instance.
 
         All parameters are given according to the specifics of the "usual"
@@ -376,6 +406,9 @@ class PointwiseInnerBase(PointwiseTensorFieldOperator):
             By default, the weights are is taken from
             ``domain.weighting``. Note that this excludes unusual
             weightings with custom inner product, norm or dist.
+        parallel : bool, int or executor, optional
+            Parallelization setting of the evaluation, see
+            `PointwiseInner`.
         """
         if not isinstance(vfspace, ProductSpace):
             raise TypeError('`vfsoace` {!r} is not a ProductSpace '
@@ -414,12 +447,19 @@ class PointwiseInnerBase(PointwiseTensorFieldOperator):
         else:
             self.__weights = np.asarray(weighting, dtype='float64')
         self.__is_weighted = not np.array_equiv(self.weights, 1.0)
+        self.__parallel = parallel
+        self._executor, self._num_workers = thread_pool(parallel)
 
     @property
     def vecfield(self):
         """Fixed vector field ``G`` of this inner product."""
         return self._vecfield
 
+    @property
+    def parallel(self):
+        """Parallelization setting of the evaluation."""
+        return self.__parallel
+
     @property
     def weights(self):
         """Weighting array of this operator."""
@@ -451,9 +491,13 @@ class PointwiseInner(PointwiseInnerBase):
     discretized function space. For example, if ``X`` is a `DiscreteLp`
     space, then ``ProductSpace(X, d)`` is a valid domain for any
     positive integer ``d``.
+
+    For components stored in Numpy arrays, the inner product is computed
+    in a single pass over the data, processing all components chunk by
+    chunk.
     """
 
-    def __init__(self, vfspace, vecfield, weighting=None):
+    def __init__(self, vfspace, vecfield, weighting=None, parallel=False):
         """Initialize a new instance.
 
         Parameters
@@ -472,6 +516,12 @@ class PointwiseInner(PointwiseInnerBase):
             By default, the weights are is taken from
             ``domain.weighting``. Note that this excludes unusual
             weightings with custom inner product, norm or dist.
+        parallel : bool, int or `ThreadPoolExecutor`, optional
+            If ``True``, large vector fields are processed in blocks on
+            a shared thread pool. An integer gives the number of worker
+            threads, and a thread pool is used as it is, see
+            `thread_pool`. Process pools are not supported.
+            Default: ``False``
 
         Examples
         --------
@@ -495,7 +545,7 @@ class PointwiseInner(PointwiseInnerBase):
         [[0.0, -7.0]]
         """
         super().__init__(adjoint=False, vfspace=vfspace, vecfield=vecfield,
-                         weighting=weighting)
+                         weighting=weighting, parallel=parallel)
 
     @property
     def vecfield(self):
@@ -504,6 +554,19 @@ class PointwiseInner(PointwiseInnerBase):
 
     def _call(self, vf, out):
         """Implement ``self(vf, out)``."""
+        arrays = _component_arrays(vf)
+        vf_arrays = _component_arrays(self.vecfield)
+        out_arr = _numpy_data(out)
+        if (arrays is not None and vf_arrays is not None and
+                out_arr is not None and
+                np.issubdtype(out_arr.dtype, np.inexact)):
+            weights = self.weights if self.is_weighted else None
+            conj = self.domain.field == ComplexNumbers()
+            _run_blocks(self._executor, self._num_workers,
+                        _pointwise_inner_kernel, out_arr.size, arrays,
+                        vf_arrays, out_arr, weights, conj)
+            return
+
         if self.domain.field == ComplexNumbers():
             vf[0].multiply(self._vecfield[0].conj(), out=out)
         else:
@@ -695,9 +758,15 @@ class MatrixOperator(Operator):
     adjoint and inverse by doing computations on the matrix. This is in
     general a rather slow and memory-inefficient approach, and users are
     recommended to use other alternatives if possible.
+
+    Sparse matrices are converted to CSR format once, and the adjoint
+    stores the adjoint matrix in CSR format as well, such that all sparse
+    products run row by row. Dense matrices are multiplied with BLAS
+    ``gemv`` directly into the output array where the data types allow
+    it, and the adjoint of a real dense matrix is a transposed view.
     """
 
-    def __init__(self, matrix, domain=None, range=None):
+    def __init__(self, matrix, domain=None, range=None, parallel=False):
         """Initialize a new instance.
 
         Parameters
@@ -716,6 +785,15 @@ class MatrixOperator(Operator):
             of the result of the multiplication.
             For the default ``None``, the range is inferred from
             ``matrix`` and ``domain``.
+        parallel : bool, int or `ThreadPoolExecutor`, optional
+            If ``True``, products with a sparse matrix are computed in
+            chunks of rows on a shared thread pool. An integer gives the
+            number of worker threads, and a thread pool is used as it
+            is, see `thread_pool`. Process pools are not supported.
+            Small matrices are always multiplied in the calling thread.
+            Dense products are left to the (possibly multithreaded) BLAS
+            library. The adjoint and inverse inherit this setting.
+            Default: ``False``
 
         Examples
         --------
@@ -764,7 +842,8 @@ class MatrixOperator(Operator):
         """
         # TODO: fix dead link `scipy.sparse.spmatrix`
         if scipy.sparse.isspmatrix(matrix):
-            self.__matrix = matrix
+            # Row-wise products, also in chunks of rows, need CSR
+            self.__matrix = matrix.tocsr()
         else:
             self.__matrix = np.asarray(matrix)
 
@@ -804,12 +883,19 @@ class MatrixOperator(Operator):
                             ''.format(matrix.dtype, range.dtype))
 
         super().__init__(domain, range, linear=True)
+        self.__parallel = parallel
+        self.__executor, self.__num_workers = thread_pool(parallel)
 
     @property
     def matrix(self):
         """Matrix representing this operator."""
         return self.__matrix
 
+    @property
+    def parallel(self):
+        """Parallelization setting of sparse matrix products."""
+        return self.__parallel
+
     @property
     def matrix_issparse(self):
         """Whether the representing matrix is sparse or not."""
@@ -819,6 +905,10 @@ class MatrixOperator(Operator):
     def adjoint(self):
         """Adjoint operator represented by the adjoint matrix.
 
+        The adjoint is created only once. For real dense matrices, its
+        matrix is a transposed view of `matrix`, for sparse matrices, it
+        is the CSR format of the adjoint matrix.
+
         Returns
         -------
         adjoint : `MatrixOperator`
@@ -828,8 +918,20 @@ class MatrixOperator(Operator):
                                       'of domain and range differ ({} != {})'
                                       ''.format(self.domain.field,
                                                 self.range.field))
-        return MatrixOperator(self.matrix.conj().T,
-                              domain=self.range, range=self.domain)
+        try:
+            return self.__adjoint
+        except AttributeError:
+            pass
+
+        if np.issubdtype(self.matrix.dtype, np.complexfloating):
+            adj_matrix = self.matrix.conj().T
+        else:
+            adj_matrix = self.matrix.T
+        adjoint = MatrixOperator(adj_matrix, domain=self.range,
+                                 range=self.domain, parallel=self.parallel)
+        adjoint.__adjoint = self
+        self.__adjoint = adjoint
+        return adjoint
 
     @property
     def inverse(self):
@@ -849,20 +951,94 @@ class MatrixOperator(Operator):
         else:
             dense_matrix = self.matrix
         return MatrixOperator(np.linalg.inv(dense_matrix),
-                              domain=self.range, range=self.domain)
+                              domain=self.range, range=self.domain,
+                              parallel=self.parallel)
 
     def _call(self, x, out=None):
         """Raw apply method on input, writing to given output."""
+        x_arr = _numpy_data(x)
+        if x_arr is None:
+            x_arr = x.asarray()
+
+        if self.matrix_issparse:
+            if out is None:
+                out = self.range.element()
+            out_arr = _numpy_data(out)
+            if out_arr is None:
+                with writable_array(out) as out_arr:
+                    self._call_sparse(x_arr, out_arr)
+            else:
+                self._call_sparse(x_arr, out_arr)
+            return out
+
         if out is None:
-            return self.range.element(self.matrix.dot(x))
+            out = self.range.element()
+        out_arr = _numpy_data(out)
+        if (out_arr is not None and out_arr.dtype == self.matrix.dtype and
+                np.can_cast(x_arr.dtype, self.matrix.dtype)):
+            # Matrix-vector product with BLAS gemv into the output array
+            x_arr = x_arr.astype(self.matrix.dtype, copy=False)
+            self.matrix.dot(x_arr, out=out_arr)
         else:
-            if self.matrix_issparse:
-                # Unfortunately, there is no native in-place dot product for
-                # sparse matrices
-                out[:] = self.matrix.dot(x)
-            else:
-                with writable_array(out) as out_arr:
-                    self.matrix.dot(x, out=out_arr)
+            with writable_array(out) as out_arr:
+                out_arr[:] = self.matrix.dot(x_arr)
+        return out
+
+    def _row_chunks(self):
+        """Return the row chunks of the sparse matrix for products.
+
+        The rows are split into one chunk per worker thread, with roughly
+        the same number of nonzero entries each, or into a single chunk
+        without thread pool. Each chunk is a list of ``(start, stop,
+        block)``, where ``block`` is a CSR view of at most ``CHUNK_SIZE``
+        rows of `matrix`, such that the temporaries of the products stay
+        small.
+        """
+        try:
+            return self.__row_chunks
+        except AttributeError:
+            pass
+
+        csr = self.matrix
+        num_chunks = 1
+        if self.__executor is not None:
+            num_chunks = max(1, min(self.__num_workers,
+                                    csr.nnz // _MIN_CHUNK_NNZ, csr.shape[0]))
+
+        # Split the rows at (roughly) equal numbers of nonzeros
+        bounds = np.searchsorted(
+            csr.indptr, np.linspace(0, csr.nnz, num_chunks + 1)[1:-1])
+        bounds = np.unique(np.concatenate([[0], bounds, [csr.shape[0]]]))
+        chunks = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            rows = list(range(start, stop, CHUNK_SIZE)) + [stop]
+            chunks.append([(lo, hi, _csr_rows(csr, lo, hi))
+                           for lo, hi in zip(rows[:-1], rows[1:])])
+
+        self.__row_chunks = chunks
+        return chunks
+
+    def _call_sparse(self, x_arr, out_arr):
+        """Compute ``out_arr[:] = matrix.dot(x_arr)`` for a sparse matrix.
+
+        The row chunks are computed on the thread pool if enabled.
+        """
+        if np.shares_memory(x_arr, out_arr):
+            # The rows of `out_arr` are written while `x_arr` is still
+            # read for the other rows
+            x_arr = x_arr.copy()
+
+        chunks = self._row_chunks()
+        if len(chunks) < 2 or in_worker_thread():
+            for chunk in chunks:
+                _sparse_matvec(chunk, x_arr, out_arr)
+            return
+
+        tasks = [self.__executor.submit(_sparse_matvec, chunk, x_arr,
+                                        out_arr)
+                 for chunk in chunks]
+        for task in tasks:
+            task.result()
 
     def __repr__(self):
         """Return ``repr(self)``."""
@@ -886,9 +1062,11 @@ class MatrixOperator(Operator):
             ('range', self.range, fn(self.matrix.shape[0],
                                      self.matrix.dtype))
         )
+        # parallel
+        optargs.append(('parallel', self.parallel, False))
 
         inner_str = signature_string(posargs, optargs, sep=[', ', ', ', ',\n'],
-                                     mod=[['!s'], ['!r', '!r']])
+                                     mod=[['!s'], ['!r', '!r', '!r']])
         return '{}(\n{}\n)'.format(self.__class__.__name__,
                                    indent_rows(inner_str))
 
@@ -896,6 +1074,153 @@ class MatrixOperator(Operator):
         """Return ``str(self)``."""
         return repr(self)
 
+
+# Minimum number of nonzeros per row block in parallel sparse products
+_MIN_CHUNK_NNZ = 2 ** 16
+
+
+def _numpy_data(x):
+    """Return the Numpy array of ``x`` without copying, or ``None``.
+
+    For `DiscreteLp` elements, this is the flat array in storage order.
+    """
+    if isinstance(x, NumpyFnVector):
+        return x.data
+    ntuple = getattr(x, 'ntuple', None)
+    if isinstance(ntuple, NumpyFnVector):
+        return ntuple.data
+    return None
+
+
+def _component_arrays(vf):
+    """Return the flat Numpy arrays of the parts of ``vf``, or ``None``."""
+    if vf.data is not None:
+        return list(vf.data)
+    arrays = [_numpy_data(part) for part in vf.parts]
+    if any(arr is None for arr in arrays):
+        return None
+    return arrays
+
+
+def _csr_rows(csr, start, stop):
+    """Return the rows ``start:stop`` of ``csr`` as a CSR view."""
+    indptr = csr.indptr[start:stop + 1]
+    slc = slice(indptr[0], indptr[-1])
+    return scipy.sparse.csr_matrix(
+        (csr.data[slc], csr.indices[slc], indptr - indptr[0]),
+        shape=(stop - start, csr.shape[1]), copy=False)
+
+
+def _sparse_matvec(blocks, x_arr, out_arr):
+    """Compute the rows of ``out_arr[:] = matrix.dot(x_arr)`` in ``blocks``.
+
+    ``blocks`` is a list of ``(start, stop, block)`` as returned by
+    `MatrixOperator._row_chunks`. ``x_arr`` and ``out_arr`` must not
+    share memory.
+    """
+    for start, stop, block in blocks:
+        out_arr[start:stop] = block.dot(x_arr)
+
+
+def _run_blocks(executor, num_workers, kernel, size, *args):
+    """Call ``kernel(start, stop, *args)`` on blocks of ``range(size)``.
+
+    Without ``executor``, or for small sizes, the kernel is called once
+    for the whole range. Otherwise, the range is split into one block
+    per worker thread, with boundaries at multiples of ``CHUNK_SIZE``.
+    """
+    num_chunks = -(-size // CHUNK_SIZE)
+    if executor is None or in_worker_thread() or num_chunks < 2:
+        kernel(0, size, *args)
+        return
+
+    num_blocks = min(num_workers, num_chunks)
+    bounds = [min(size, CHUNK_SIZE * (num_chunks * i // num_blocks))
+              for i in range(num_blocks + 1)]
+    tasks = [executor.submit(kernel, start, stop, *args)
+             for start, stop in zip(bounds[:-1], bounds[1:])]
+    for task in tasks:
+        task.result()
+
+
+def _pointwise_norm_kernel(start, stop, arrays, out_arr, weights, p):
+    """Write the pointwise ``p``-norm of ``arrays`` to ``out_arr``.
+
+    Only the index range ``[start, stop)`` is processed, in chunks of
+    size ``CHUNK_SIZE``, such that the temporaries stay small.
+    """
+    real_dtype = np.abs(arrays[0][:0]).dtype
+    is_complex = np.issubdtype(arrays[0].dtype, np.complexfloating)
+    buf_size = min(CHUNK_SIZE, stop - start)
+    tmp_buf = np.empty(buf_size, dtype=real_dtype)
+    if out_arr.dtype == real_dtype:
+        acc_buf = None
+    else:
+        acc_buf = np.empty(buf_size, dtype=real_dtype)
+
+    for begin in range(start, stop, CHUNK_SIZE):
+        end = min(begin + CHUNK_SIZE, stop)
+        if acc_buf is None:
+            acc = out_arr[begin:end]
+        else:
+            acc = acc_buf[:end - begin]
+        tmp = tmp_buf[:end - begin]
+
+        for i, arr in enumerate(arrays):
+            dst = acc if i == 0 else tmp
+            arr = arr[begin:end]
+            if p == 2.0 and not is_complex:
+                np.multiply(arr, arr, out=dst)
+            else:
+                np.abs(arr, out=dst)
+                if p == 2.0:
+                    np.multiply(dst, dst, out=dst)
+                elif p != 1.0 and p != float('inf'):
+                    np.power(dst, p, out=dst)
+            if weights is not None:
+                dst *= weights[i]
+
+            if i == 0:
+                continue
+            elif p == float('inf'):
+                np.maximum(acc, tmp, out=acc)
+            else:
+                acc += tmp
+
+        if p == 2.0:
+            np.sqrt(acc, out=acc)
+        elif p != 1.0 and p != float('inf'):
+            np.power(acc, 1 / p, out=acc)
+        if acc_buf is not None:
+            out_arr[begin:end] = acc
+
+
+def _pointwise_inner_kernel(start, stop, arrays, vf_arrays, out_arr,
+                            weights, conj):
+    """Write the pointwise inner product of two fields to ``out_arr``.
+
+    Only the index range ``[start, stop)`` is processed, in chunks of
+    size ``CHUNK_SIZE``, such that the temporaries stay small.
+    """
+    tmp_buf = np.empty(min(CHUNK_SIZE, stop - start), dtype=out_arr.dtype)
+    for begin in range(start, stop, CHUNK_SIZE):
+        end = min(begin + CHUNK_SIZE, stop)
+        acc = out_arr[begin:end]
+        tmp = tmp_buf[:end - begin]
+
+        for i, (arr, vf_arr) in enumerate(zip(arrays, vf_arrays)):
+            dst = acc if i == 0 else tmp
+            if conj:
+                np.conj(vf_arr[begin:end], out=dst)
+                dst *= arr[begin:end]
+            else:
+                np.multiply(arr[begin:end], vf_arr[begin:end], out=dst)
+            if weights is not None:
+                dst *= weights[i]
+            if i > 0:
+                acc += tmp
+
+
 if __name__ == '__main__':
     # pylint: disable=wrong-import-position
     from odl.util.testutils import run_doctests
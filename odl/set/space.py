@@ -157,7 +157,10 @@ class LinearSpace(Set):
         This is the strict default where spaces must be equal.
         Subclasses may choose to implement a less strict check.
         """
-        return getattr(other, 'space', None) == self
+        # Identity check first to avoid the (potentially expensive)
+        # equality check in the most common case
+        space = getattr(other, 'space', None)
+        return space is self or space == self
 
     # Error checking variant of methods
     def lincomb(self, a, x1, b=None, x2=None, out=None):
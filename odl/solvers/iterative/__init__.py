@@ -15,5 +15,8 @@ __all__ = ()
 from .iterative import *
 __all__ += iterative.__all__
 
+from .krylov import *
+__all__ += krylov.__all__
+
 from .statistical import *
 __all__ += statistical.__all__
@@ -13,12 +13,17 @@ from __future__ import print_function, division, absolute_import
 from future import standard_library
 standard_library.install_aliases()
 
+import numpy as np
+
 from odl.operator import IdentityOperator, OperatorComp, OperatorSum
-from odl.util import normalized_scalar_param_list
+from odl.solvers.util.checkpoint import load_checkpoint, _restore
+from odl.solvers.util.preconditioner import _preconditioner
+from odl.util import normalized_scalar_param_list, IdentityMemo
 
 
 __all__ = ('landweber', 'conjugate_gradient', 'conjugate_gradient_normal',
-           'gauss_newton', 'kaczmarz')
+           'conjugate_gradient_block', 'gauss_newton', 'kaczmarz', 'sirt',
+           'sart')
 
 
 # TODO: update all docs
@@ -117,7 +122,8 @@ def landweber(op, x, rhs, niter, omega=1, projection=None, callback=None):
             callback(x)
 
 
-def conjugate_gradient(op, x, rhs, niter, callback=None):
+def conjugate_gradient(op, x, rhs, niter, callback=None, checkpoint=None,
+                       resume=None, preconditioner=None):
     """Optimized implementation of CG for self-adjoint operators.
 
     This method solves the inverse problem (of the first kind)::
@@ -149,10 +155,22 @@ def conjugate_gradient(op, x, rhs, niter, callback=None):
         Number of iterations.
     callback : callable, optional
         Object executing code per iteration, e.g. plotting each iterate.
+    checkpoint : `Checkpoint`, optional
+        If given, ``x``, the residual and the search direction are saved
+        whenever it is due.
+    resume : str, optional
+        Path of a checkpoint written by ``checkpoint``. The iteration
+        continues from the saved state, overwriting ``x``, until ``niter``
+        iterations have been run in total.
+    preconditioner : `Operator` or {'jacobi', 'circulant'}, optional
+        Linear, self-adjoint and positive definite operator approximating
+        the inverse of ``op``. The strings select one built from ``op``,
+        see `jacobi_preconditioner` and `circulant_preconditioner`.
 
     See Also
     --------
     conjugate_gradient_normal : Solver for nonsymmetric matrices
+    conjugate_gradient_block : Solver for several right-hand sides
     """
     # TODO: add a book reference
     # TODO: update doc
@@ -164,17 +182,35 @@ def conjugate_gradient(op, x, rhs, niter, callback=None):
         raise TypeError('`x` {!r} is not in the domain of `op` {!r}'
                         ''.format(x, op.domain))
 
-    r = op(x)
-    r.lincomb(1, rhs, -1, r)       # r = rhs - A x
-    p = r.copy()
-    d = op.domain.element()  # Extra storage for storing A x
+    precon = _preconditioner(preconditioner, op)
+
+    start = 0
+    if resume is not None:
+        # The residual is updated recursively, hence it is restored
+        # instead of recomputed
+        start, state = load_checkpoint(resume)
+        _restore(x, state['x'])
+        r = _restore(op.range.element(), state['r'])
+        p = _restore(op.domain.element(), state['p'])
+        inner_r_z_old = state['inner_r_z']
+        z = r if precon is None else op.domain.element()
+    else:
+        r = op(x)
+        r.lincomb(1, rhs, -1, r)       # r = rhs - A x
+        if precon is None:
+            z = r
+            inner_r_z_old = r.norm() ** 2  # Only recalculate after update
+        else:
+            z = precon(r)              # z = M r
+            inner_r_z_old = r.inner(z)
+        p = z.copy()
 
-    sqnorm_r_old = r.norm() ** 2  # Only recalculate norm after update
+    d = op.domain.element()  # Extra storage for storing A x
 
-    if sqnorm_r_old == 0:  # Return if no step forward
+    if inner_r_z_old == 0:  # Return if no step forward
         return
 
-    for _ in range(niter):
+    for k in range(start, niter):
         op(p, out=d)  # d = A p
 
         inner_p_d = p.inner(d)
@@ -182,23 +218,32 @@ def conjugate_gradient(op, x, rhs, niter, callback=None):
         if inner_p_d == 0.0:  # Return if step is 0
             return
 
-        alpha = sqnorm_r_old / inner_p_d
+        alpha = inner_r_z_old / inner_p_d
 
         x.lincomb(1, x, alpha, p)            # x = x + alpha*p
         r.lincomb(1, r, -alpha, d)           # r = r - alpha*d
 
-        sqnorm_r_new = r.norm() ** 2
+        if precon is None:
+            inner_r_z_new = r.norm() ** 2
+        else:
+            precon(r, out=z)                 # z = M r
+            inner_r_z_new = r.inner(z)
 
-        beta = sqnorm_r_new / sqnorm_r_old
-        sqnorm_r_old = sqnorm_r_new
+        beta = inner_r_z_new / inner_r_z_old
+        inner_r_z_old = inner_r_z_new
 
-        p.lincomb(1, r, beta, p)                       # p = s + b * p
+        p.lincomb(1, z, beta, p)                       # p = z + b * p
 
         if callback is not None:
             callback(x)
 
+        if checkpoint is not None and checkpoint.due(k + 1):
+            checkpoint.save(k + 1, {'x': x, 'r': r, 'p': p,
+                                    'inner_r_z': inner_r_z_old})
+
 
-def conjugate_gradient_normal(op, x, rhs, niter=1, callback=None):
+def conjugate_gradient_normal(op, x, rhs, niter=1, callback=None,
+                              preconditioner=None):
     """Optimized implementation of CG for the normal equation.
 
     This method solves the inverse problem (of the first kind) ::
@@ -234,6 +279,11 @@ Conjugate_gradient_on_the_normal_equations>`_.
         Number of iterations.
     callback : callable, optional
         Object executing code per iteration, e.g. plotting each iterate.
+    preconditioner : `Operator` or {'jacobi', 'circulant'}, optional
+        Linear, self-adjoint and positive definite operator on
+        ``op.domain`` approximating the inverse of the normal operator
+        ``A^* A``. The strings select one built from ``A^* A``, see
+        `jacobi_preconditioner` and `circulant_preconditioner`.
 
     See Also
     --------
@@ -247,12 +297,20 @@ Conjugate_gradient_on_the_normal_equations>`_.
         raise TypeError('`x` {!r} is not in the domain of `op` {!r}'
                         ''.format(x, op.domain))
 
+    if preconditioner is None:
+        precon = None
+    else:
+        deriv = op.derivative(x)
+        precon = _preconditioner(preconditioner, deriv.adjoint * deriv)
+
     d = op(x)
     d.lincomb(1, rhs, -1, d)               # d = rhs - A x
-    p = op.derivative(x).adjoint(d)
-    s = p.copy()
+    s = op.derivative(x).adjoint(d)
+    z = s if precon is None else precon(s)
+    p = z.copy()
     q = op.range.element()
-    sqnorm_s_old = s.norm() ** 2  # Only recalculate norm after update
+    # Only recalculate after update
+    inner_s_z_old = s.norm() ** 2 if precon is None else s.inner(z)
 
     for _ in range(niter):
         op(p, out=q)                       # q = A p
@@ -260,21 +318,138 @@ Conjugate_gradient_on_the_normal_equations>`_.
         if sqnorm_q == 0.0:  # Return if residual is 0
             return
 
-        a = sqnorm_s_old / sqnorm_q
+        a = inner_s_z_old / sqnorm_q
         x.lincomb(1, x, a, p)               # x = x + a*p
         d.lincomb(1, d, -a, q)              # d = d - a*Ap
         op.derivative(p).adjoint(d, out=s)  # s = A^T d
 
-        sqnorm_s_new = s.norm() ** 2
-        b = sqnorm_s_new / sqnorm_s_old
-        sqnorm_s_old = sqnorm_s_new
+        if precon is None:
+            inner_s_z_new = s.norm() ** 2
+        else:
+            precon(s, out=z)                # z = M s
+            inner_s_z_new = s.inner(z)
+        b = inner_s_z_new / inner_s_z_old
+        inner_s_z_old = inner_s_z_new
+
+        p.lincomb(1, z, b, p)               # p = z + b * p
+
+        if callback is not None:
+            callback(x)
+
+
+def conjugate_gradient_block(op, x, rhs, niter, callback=None,
+                             preconditioner=None):
+    """Block CG for self-adjoint operators and several right-hand sides.
+
+    This method solves the inverse problems::
+
+        A(x_j) = y_j,  j = 1, ..., m
+
+    for a linear and self-adjoint `Operator` ``A`` simultaneously. In
+    each iteration, the solutions are updated in the space spanned by the
+    search directions of all right-hand sides instead of one direction
+    each, which typically needs much fewer iterations, and hence
+    evaluations of ``A``, than solving the problems one by one. See
+    [OLe1980] for details.
+
+    Parameters
+    ----------
+    op : linear `Operator`
+        Operator in the inverse problems. It must be linear and
+        self-adjoint. Normal equations can be solved by passing
+        ``A.adjoint * A`` and the right-hand sides ``A.adjoint(y_j)``.
+    x : sequence of ``op.domain`` elements
+        Elements to which the results are written, e.g., a list or a
+        `ProductSpace` element. Their initial values are used as starting
+        points of the iteration, and they are updated in each iteration.
+    rhs : sequence of ``op.range`` elements
+        Right-hand sides of the equations, one per element of ``x``.
+    niter : int
+        Number of iterations.
+    callback : callable, optional
+        Object executing code per iteration, called with ``x``.
+    preconditioner : `Operator` or {'jacobi', 'circulant'}, optional
+        Linear, self-adjoint and positive definite operator approximating
+        the inverse of ``op``, see `conjugate_gradient`.
+
+    See Also
+    --------
+    conjugate_gradient : Solver for a single right-hand side
 
-        p.lincomb(1, s, b, p)               # p = s + b * p
+    References
+    ----------
+    [OLe1980] O'Leary, D P. *The block conjugate gradient algorithm and
+    related methods*. Linear Algebra and its Applications, 29 (1980),
+    pp 293--322.
+    """
+    if op.domain != op.range:
+        raise ValueError('operator needs to be self-adjoint')
+
+    xs = list(x)
+    rhss = list(rhs)
+    if len(xs) != len(rhss):
+        raise ValueError('number of right-hand sides {} does not match '
+                         'number of solutions {}'.format(len(rhss), len(xs)))
+    for xi in xs:
+        if xi not in op.domain:
+            raise TypeError('`x` contains {!r}, which is not in the domain '
+                            'of `op` {!r}'.format(xi, op.domain))
+
+    precon = _preconditioner(preconditioner, op)
+
+    r = [op(xi) for xi in xs]
+    for ri, rhsi in zip(r, rhss):
+        ri.lincomb(1, rhsi, -1, ri)         # r = rhs - A x
+    z = r if precon is None else [precon(ri) for ri in r]
+    p = [zi.copy() for zi in z]
+    p_new = [op.domain.element() for _ in xs]
+    q = [op.domain.element() for _ in xs]   # Storage for A p
+    inner_r_z_old = _gram_matrix(r, z)
+
+    for _ in range(niter):
+        if not np.any(inner_r_z_old):  # Return if all residuals are 0
+            return
+
+        for pi, qi in zip(p, q):
+            op(pi, out=qi)                  # q = A p
+
+        # x = x + p * alpha, r = r - q * alpha, with matrix alpha. The
+        # least-squares solution handles directions that have become
+        # linearly dependent, e.g., after one of the problems is solved.
+        alpha = _lstsq(_gram_matrix(p, q), inner_r_z_old)
+        for j in range(len(xs)):
+            for i in range(len(xs)):
+                xs[j].lincomb(1, xs[j], alpha[i, j], p[i])
+                r[j].lincomb(1, r[j], -alpha[i, j], q[i])
+
+        if precon is not None:
+            for ri, zi in zip(r, z):
+                precon(ri, out=zi)          # z = M r
+        inner_r_z_new = _gram_matrix(r, z)
+
+        # p = z + p * beta
+        beta = _lstsq(inner_r_z_old, inner_r_z_new)
+        for j in range(len(xs)):
+            p_new[j].assign(z[j])
+            for i in range(len(xs)):
+                p_new[j].lincomb(1, p_new[j], beta[i, j], p[i])
+        p, p_new = p_new, p
+        inner_r_z_old = inner_r_z_new
 
         if callback is not None:
             callback(x)
 
 
+def _gram_matrix(a, b):
+    """Return the matrix of inner products ``<b_j, a_i>``."""
+    return np.array([[bj.inner(ai) for bj in b] for ai in a])
+
+
+def _lstsq(matrix, rhs):
+    """Return the least-squares solution of ``matrix * result = rhs``."""
+    return np.linalg.lstsq(matrix, rhs, rcond=1e-12)[0]
+
+
 def exp_zero_seq(base):
     """Default exponential zero sequence.
 
@@ -506,6 +681,237 @@ def kaczmarz(ops, x, rhs, niter, omega=1, projection=None,
                 callback(x)
 
 
+def sirt(op, x, rhs, niter, omega=1, lower=None, upper=None, callback=None):
+    """Simultaneous iterative reconstruction technique (SIRT).
+
+    Solves the inverse problem::
+
+        A(x) = rhs
+
+    for a linear operator ``A`` with non-negative entries, e.g., a ray
+    transform.
+
+    Parameters
+    ----------
+    op : linear `Operator`
+        Operator in the inverse problem.
+    x : ``op.domain`` element
+        Element to which the result is written. Its initial value is
+        used as starting point of the iteration, and its values are
+        updated in each iteration step.
+    rhs : ``op.range`` element
+        Right-hand side of the equation defining the inverse problem.
+    niter : int
+        Number of iterations.
+    omega : positive float, optional
+        Relaxation parameter in the iteration. Convergence is guaranteed
+        for ``0 < omega < 2``.
+    lower, upper : float or ``op.domain`` element, optional
+        Bounds to which the iterates are clipped in each iteration, e.g.,
+        ``lower=0`` to enforce positivity.
+    callback : callable, optional
+        Object executing code per iteration, e.g. plotting each iterate.
+
+    Notes
+    -----
+    With the row and column sums :math:`R = \\mathcal{A}(1)` and
+    :math:`C = \\mathcal{A}^*(1)`, the method uses the iteration
+
+    .. math::
+        x_{k+1} = x_k + \\omega \\, C^{-1} \\mathcal{A}^*
+                  \\big(R^{-1} (y - \\mathcal{A}(x_k))\\big),
+
+    where the inverses are taken pointwise, with :math:`1 / 0 := 0`. This
+    is `landweber`'s method with diagonal weights in domain and range,
+    see [GBH1970] and Natterer, F. Mathematical Methods in Image
+    Reconstruction, section 5.3.2.
+
+    The weights :math:`R^{-1}` and :math:`C^{-1}` are computed with two
+    evaluations of ``op`` and its adjoint on the first call, and reused
+    in subsequent calls with the same operator.
+
+    References
+    ----------
+    [GBH1970] Gordon, R, Bender, R, and Herman, G T. *Algebraic
+    Reconstruction Techniques (ART) for three-dimensional electron
+    microscopy and X-ray photography*. Journal of Theoretical Biology, 29
+    (1970), pp 471--481.
+
+    See Also
+    --------
+    sart : Ordered-subset variant
+    landweber : Method with scalar relaxation parameter
+    """
+    if x not in op.domain:
+        raise TypeError('`x` {!r} is not in the domain of `op` {!r}'
+                        ''.format(x, op.domain))
+    omega, omega_in = float(omega), omega
+    if omega <= 0:
+        raise ValueError('`omega` must be positive, got {}'.format(omega_in))
+
+    row_weights, col_weights = _sirt_weights(op)
+    col_weights = omega * col_weights
+
+    # Reusable temporaries
+    tmp_ran = op.range.element()
+    tmp_dom = op.domain.element()
+
+    for _ in range(niter):
+        _sirt_step(op, x, rhs, row_weights, col_weights, tmp_ran, tmp_dom)
+        _clip(x, lower, upper)
+
+        if callback is not None:
+            callback(x)
+
+
+def sart(ops, x, rhs, niter, omega=1, lower=None, upper=None,
+         callback=None):
+    """Ordered-subset simultaneous algebraic reconstruction technique.
+
+    Solves the inverse problem given by the set of equations::
+
+        A_n(x) = rhs_n
+
+    where each ``A_n`` is a linear operator with non-negative entries,
+    e.g., a ray transform restricted to a subset of the angles.
+
+    Parameters
+    ----------
+    ops : `BroadcastOperator` or sequence of linear `Operator`'s
+        Operators in the inverse problem, one per subset.
+    x : ``op.domain`` element
+        Element to which the result is written. Its initial value is
+        used as starting point of the iteration, and its values are
+        updated in each iteration step.
+    rhs : sequence of ``ops[i].range`` elements
+        Right-hand side of the equation defining the inverse problem.
+    niter : int
+        Number of iterations, each of which runs through all subsets.
+    omega : positive float or sequence of positive floats, optional
+        Relaxation parameter in the iteration. If a single float is given
+        the same value is used for all subsets, otherwise separate values
+        are used.
+    lower, upper : float or ``op.domain`` element, optional
+        Bounds to which the iterates are clipped after each subset update,
+        e.g., ``lower=0`` to enforce positivity.
+    callback : callable, optional
+        Object executing code per subset update, e.g. plotting each
+        iterate.
+
+    Notes
+    -----
+    This method applies the `sirt` update for each subset in turn, with
+    row and column sums of the respective operator :math:`\\mathcal{A}_i`,
+    see [AK1984] for the case of one subset per projection. The weights
+    are computed once per subset on the first call, and reused in
+    subsequent calls with the same operators.
+
+    References
+    ----------
+    [AK1984] Andersen, A H, and Kak, A C. *Simultaneous algebraic
+    reconstruction technique (SART): A superior implementation of the ART
+    algorithm*. Ultrasonic Imaging, 6 (1984), pp 81--94.
+
+    See Also
+    --------
+    sirt : Method with a single subset
+    kaczmarz : Method with scalar relaxation parameters
+    """
+    ops = list(getattr(ops, 'operators', ops))
+    domain = ops[0].domain
+    if any(domain != opi.domain for opi in ops):
+        raise ValueError('`opi[i].domain` are not all equal')
+
+    if x not in domain:
+        raise TypeError('`x` {!r} is not in the domain of `ops` {!r}'
+                        ''.format(x, domain))
+
+    if len(ops) != len(rhs):
+        raise ValueError('`number of `ops` {} does not match number of '
+                         '`rhs` {}'.format(len(ops), len(rhs)))
+
+    omega = normalized_scalar_param_list(omega, len(ops), param_conv=float)
+    if min(omega) <= 0:
+        raise ValueError('`omega` must be positive, got {}'.format(omega))
+
+    weights = []
+    for opi, omega_i in zip(ops, omega):
+        row_weights, col_weights = _sirt_weights(opi)
+        weights.append((row_weights, omega_i * col_weights))
+
+    # Reusable elements in the range, one per type of space
+    tmp_rans = {opi.range: opi.range.element() for opi in ops}
+
+    # Single reusable element in the domain
+    tmp_dom = domain.element()
+
+    for _ in range(niter):
+        for i in range(len(ops)):
+            _sirt_step(ops[i], x, rhs[i], weights[i][0], weights[i][1],
+                       tmp_rans[ops[i].range], tmp_dom)
+            _clip(x, lower, upper)
+
+            if callback is not None:
+                callback(x)
+
+
+def _sirt_step(op, x, rhs, row_weights, col_weights, tmp_ran, tmp_dom):
+    """Update ``x`` in-place with one (weighted) SIRT step."""
+    op(x, out=tmp_ran)
+    tmp_ran.lincomb(1, rhs, -1, tmp_ran)
+    tmp_ran *= row_weights
+    op.adjoint(tmp_ran, out=tmp_dom)
+    tmp_dom *= col_weights
+    x += tmp_dom
+
+
+def _clip(x, lower, upper):
+    """Clip ``x`` in-place to the bounds, ``None`` meaning unbounded."""
+    if lower is not None:
+        x.ufuncs.maximum(lower, out=x)
+    if upper is not None:
+        x.ufuncs.minimum(upper, out=x)
+
+
+# Memoized weights of `sirt` and `sart`, `op -> (row_weights, col_weights)`
+_SIRT_WEIGHTS = IdentityMemo()
+
+
+def _sirt_weights(op):
+    """Return the inverse row and column sums of ``op``, memoized.
+
+    The returned elements are shared between calls and must not be
+    modified.
+    """
+    try:
+        return _SIRT_WEIGHTS[op]
+    except KeyError:
+        pass
+
+    if not op.is_linear:
+        raise ValueError('`op` {!r} is not linear'.format(op))
+
+    row_weights = _inverse_sums(op(op.domain.one()))
+    col_weights = _inverse_sums(op.adjoint(op.range.one()))
+    _SIRT_WEIGHTS[op] = (row_weights, col_weights)
+    return row_weights, col_weights
+
+
+def _inverse_sums(sums):
+    """Invert ``sums`` in-place, with non-positive values mapped to 0."""
+    parts = getattr(sums, 'parts', None)
+    if parts is not None:
+        for part in parts:
+            _inverse_sums(part)
+    else:
+        arr = sums.asarray()
+        positive = arr > 0
+        inverse = np.zeros_like(arr)
+        inverse[positive] = 1.0 / arr[positive]
+        sums[:] = inverse
+    return sums
+
+
 if __name__ == '__main__':
     # pylint: disable=wrong-import-position
     from odl.util.testutils import run_doctests
@@ -0,0 +1,504 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Krylov subspace methods for least squares and symmetric problems.
+
+In contrast to `conjugate_gradient_normal`, the least-squares methods
+`lsqr` and `lsmr` never form the normal equations explicitly, which makes
+them numerically more stable for ill-conditioned operators.
+"""
+
+# Imports for common Python 2/3 codebase
+from __future__ import print_function, division, absolute_import
+from future import standard_library
+standard_library.install_aliases()
+
+import numpy as np
+
+from odl.solvers.util.stopping import ConvergenceInfo, _stopping_params
+
+
+__all__ = ('lsqr', 'lsmr', 'minres')
+
+
+def lsqr(op, x, rhs, niter, damp=0, callback=None, **kwargs):
+    """Solve a linear least-squares problem with LSQR.
+
+    This method solves the (damped) least-squares problem ::
+
+        min_x ||A(x) - rhs||^2 + damp^2 ||x||^2
+
+    for a linear `Operator` ``A``, using only evaluations of ``A`` and its
+    adjoint. It is mathematically equivalent to
+    `conjugate_gradient_normal`, but numerically more reliable. See
+    [PS1982] for details.
+
+    Parameters
+    ----------
+    op : linear `Operator`
+        Operator ``A`` in the least-squares problem.
+    x : ``op.domain`` element
+        Element to which the result is written. Its initial value is
+        used as starting point of the iteration, and its values are
+        updated in each iteration step. For a nonzero initial value,
+        the damping term applies to the change of ``x``.
+    rhs : ``op.range`` element
+        Right-hand side of the problem.
+    niter : int
+        Maximum number of iterations.
+    damp : float, optional
+        Tikhonov damping parameter.
+    callback : callable, optional
+        Object executing code per iteration, e.g. plotting each iterate.
+
+    Other Parameters
+    ----------------
+    tol : non-negative float, optional
+        If given, the iteration stops once the estimated residual
+        ``r = rhs - A(x)`` fulfills ``||r|| <= tol * (||rhs|| + ||A|| ||x||)``
+        (``'residual'``, the equation is solved), or once
+        ``||A^* r|| <= tol * ||A|| ||r||`` (``'normal_residual'``, the
+        least-squares problem is solved). The estimates are obtained
+        from the iteration at negligible cost.
+
+    Returns
+    -------
+    info : `ConvergenceInfo`
+        The number of iterations run and the reason for stopping.
+
+    See Also
+    --------
+    lsmr : Similar method with monotonically decreasing ``||A^* r||``
+    conjugate_gradient_normal : CG on the normal equations
+
+    References
+    ----------
+    [PS1982] Paige, C C, and Saunders, M A. *LSQR: An algorithm for sparse
+    linear equations and sparse least squares*. ACM Transactions on
+    Mathematical Software, 8 (1982), pp 43--71.
+    """
+    if x not in op.domain:
+        raise TypeError('`x` {!r} is not in the domain of `op` {!r}'
+                        ''.format(x, op.domain))
+    tol, _ = _stopping_params(kwargs, gap=False)
+    if kwargs:
+        raise TypeError('unexpected keyword arguments {}'
+                        ''.format(sorted(kwargs)))
+    damp = float(damp)
+
+    # Work vectors
+    u = op(x)
+    u.lincomb(1, rhs, -1, u)               # u = rhs - A x
+    tmp_ran = op.range.element()
+    v = op.domain.element()
+    tmp_dom = op.domain.element()
+
+    beta = u.norm()
+    if beta == 0:
+        return ConvergenceInfo(0, 'residual')
+    u /= beta
+    op.adjoint(u, out=v)
+    alpha = v.norm()
+    if alpha == 0:
+        return ConvergenceInfo(0, 'normal_residual')
+    v /= alpha
+    w = v.copy()
+
+    bnorm = beta
+    rhobar = alpha
+    phibar = beta
+    anorm2 = 0.0
+    res2 = 0.0
+
+    for k in range(1, niter + 1):
+        # Continue the bidiagonalization
+        op(v, out=tmp_ran)
+        u.lincomb(1, tmp_ran, -alpha, u)   # u = A v - alpha u
+        beta = u.norm()
+        if beta > 0:
+            u /= beta
+        anorm2 += alpha ** 2 + beta ** 2 + damp ** 2
+
+        op.adjoint(u, out=tmp_dom)
+        v.lincomb(1, tmp_dom, -beta, v)    # v = A^* u - beta v
+        alpha = v.norm()
+        if alpha > 0:
+            v /= alpha
+
+        # Eliminate the damping parameter
+        rhobar1 = np.hypot(rhobar, damp)
+        cs1 = rhobar / rhobar1
+        sn1 = damp / rhobar1
+        psi = sn1 * phibar
+        phibar = cs1 * phibar
+
+        # Eliminate the subdiagonal element of the bidiagonal matrix
+        rho = np.hypot(rhobar1, beta)
+        cs = rhobar1 / rho
+        sn = beta / rho
+        theta = sn * alpha
+        rhobar = -cs * alpha
+        phi = cs * phibar
+        phibar = sn * phibar
+
+        x.lincomb(1, x, phi / rho, w)      # x = x + phi / rho * w
+        w.lincomb(1, v, -theta / rho, w)   # w = v - theta / rho * w
+
+        if callback is not None:
+            callback(x)
+
+        if tol is not None:
+            res2 += psi ** 2
+            rnorm = np.sqrt(phibar ** 2 + res2)
+            arnorm = alpha * abs(sn * phi)
+            anorm = np.sqrt(anorm2)
+            if rnorm <= tol * (bnorm + anorm * x.norm()):
+                return ConvergenceInfo(k, 'residual')
+            if arnorm <= tol * anorm * rnorm:
+                return ConvergenceInfo(k, 'normal_residual')
+
+    return ConvergenceInfo(niter, 'niter')
+
+
+def lsmr(op, x, rhs, niter, damp=0, callback=None, **kwargs):
+    """Solve a linear least-squares problem with LSMR.
+
+    This method solves the (damped) least-squares problem ::
+
+        min_x ||A(x) - rhs||^2 + damp^2 ||x||^2
+
+    for a linear `Operator` ``A``, using only evaluations of ``A`` and its
+    adjoint. It is mathematically equivalent to MINRES on the normal
+    equations, hence the norm of the normal residual ``A^* (rhs - A(x))``
+    decreases monotonically, which allows to stop the iteration earlier
+    than with `lsqr`. See [FS2011] for details.
+
+    Parameters
+    ----------
+    op : linear `Operator`
+        Operator ``A`` in the least-squares problem.
+    x : ``op.domain`` element
+        Element to which the result is written. Its initial value is
+        used as starting point of the iteration, and its values are
+        updated in each iteration step. For a nonzero initial value,
+        the damping term applies to the change of ``x``.
+    rhs : ``op.range`` element
+        Right-hand side of the problem.
+    niter : int
+        Maximum number of iterations.
+    damp : float, optional
+        Tikhonov damping parameter.
+    callback : callable, optional
+        Object executing code per iteration, e.g. plotting each iterate.
+
+    Other Parameters
+    ----------------
+    tol : non-negative float, optional
+        Tolerance for stopping the iteration, see `lsqr`.
+
+    Returns
+    -------
+    info : `ConvergenceInfo`
+        The number of iterations run and the reason for stopping.
+
+    See Also
+    --------
+    lsqr : Similar method with monotonically decreasing ``||r||``
+
+    References
+    ----------
+    [FS2011] Fong, D C-L, and Saunders, M A. *LSMR: An iterative algorithm
+    for sparse least-squares problems*. SIAM Journal on Scientific
+    Computing, 33 (2011), pp 2950--2971.
+    """
+    if x not in op.domain:
+        raise TypeError('`x` {!r} is not in the domain of `op` {!r}'
+                        ''.format(x, op.domain))
+    tol, _ = _stopping_params(kwargs, gap=False)
+    if kwargs:
+        raise TypeError('unexpected keyword arguments {}'
+                        ''.format(sorted(kwargs)))
+    damp = float(damp)
+
+    # Work vectors
+    u = op(x)
+    u.lincomb(1, rhs, -1, u)               # u = rhs - A x
+    tmp_ran = op.range.element()
+    v = op.domain.element()
+    tmp_dom = op.domain.element()
+
+    beta = u.norm()
+    if beta == 0:
+        return ConvergenceInfo(0, 'residual')
+    u /= beta
+    op.adjoint(u, out=v)
+    alpha = v.norm()
+    if alpha == 0:
+        return ConvergenceInfo(0, 'normal_residual')
+    v /= alpha
+    h = v.copy()
+    hbar = op.domain.zero()
+
+    # Variables for the iteration
+    normb = beta
+    zetabar = alpha * beta
+    alphabar = alpha
+    rho = rhobar = cbar = 1.0
+    sbar = 0.0
+
+    # Variables for the estimation of ||r||
+    betadd = beta
+    betad = 0.0
+    rhodold = 1.0
+    tautildeold = 0.0
+    thetatilde = 0.0
+    zeta = 0.0
+    d = 0.0
+
+    normA2 = alpha ** 2
+
+    for k in range(1, niter + 1):
+        # Continue the bidiagonalization
+        op(v, out=tmp_ran)
+        u.lincomb(1, tmp_ran, -alpha, u)   # u = A v - alpha u
+        beta = u.norm()
+        if beta > 0:
+            u /= beta
+
+        op.adjoint(u, out=tmp_dom)
+        v.lincomb(1, tmp_dom, -beta, v)    # v = A^* u - beta v
+        alpha = v.norm()
+        if alpha > 0:
+            v /= alpha
+
+        # Rotations eliminating the damping parameter and the subdiagonal
+        chat, shat, alphahat = _sym_ortho(alphabar, damp)
+        rhoold = rho
+        c, s, rho = _sym_ortho(alphahat, beta)
+        thetanew = s * alpha
+        alphabar = c * alpha
+
+        rhobarold = rhobar
+        zetaold = zeta
+        thetabar = sbar * rho
+        cbar, sbar, rhobar = _sym_ortho(cbar * rho, thetanew)
+        zeta = cbar * zetabar
+        zetabar = -sbar * zetabar
+
+        # hbar = h - thetabar * rho / (rhoold * rhobarold) * hbar
+        hbar.lincomb(1, h, -thetabar * rho / (rhoold * rhobarold), hbar)
+        x.lincomb(1, x, zeta / (rho * rhobar), hbar)
+        h.lincomb(1, v, -thetanew / rho, h)  # h = v - thetanew / rho * h
+
+        if callback is not None:
+            callback(x)
+
+        if tol is not None:
+            # Estimate ||r||
+            betaacute = chat * betadd
+            betacheck = -shat * betadd
+            betahat = c * betaacute
+            betadd = -s * betaacute
+
+            thetatildeold = thetatilde
+            ctildeold, stildeold, rhotildeold = _sym_ortho(rhodold, thetabar)
+            thetatilde = stildeold * rhobar
+            rhodold = ctildeold * rhobar
+            betad = -stildeold * betad + ctildeold * betahat
+
+            tautildeold = ((zetaold - thetatildeold * tautildeold) /
+                           rhotildeold)
+            taud = (zeta - thetatilde * tautildeold) / rhodold
+            d += betacheck ** 2
+            normr = np.sqrt(d + (betad - taud) ** 2 + betadd ** 2)
+
+            # Estimate ||A|| and ||A^* r||
+            normA2 += beta ** 2
+            normA = np.sqrt(normA2)
+            normA2 += alpha ** 2
+            normar = abs(zetabar)
+
+            if normr <= tol * (normb + normA * x.norm()):
+                return ConvergenceInfo(k, 'residual')
+            if normar <= tol * normA * normr:
+                return ConvergenceInfo(k, 'normal_residual')
+
+    return ConvergenceInfo(niter, 'niter')
+
+
+def minres(op, x, rhs, niter, shift=0, callback=None, **kwargs):
+    """Solve a linear system with a self-adjoint operator using MINRES.
+
+    This method solves the equation ::
+
+        A(x) - shift * x = rhs
+
+    for a linear and self-adjoint `Operator` ``A``, which may be
+    indefinite or singular. In each iteration, ``x`` minimizes the norm
+    of the residual over the current Krylov subspace. See [PS1975] for
+    details.
+
+    Parameters
+    ----------
+    op : linear `Operator`
+        Self-adjoint operator ``A``, in particular its domain and range
+        must be equal.
+    x : ``op.domain`` element
+        Element to which the result is written. Its initial value is
+        used as starting point of the iteration, and its values are
+        updated in each iteration step.
+    rhs : ``op.range`` element
+        Right-hand side of the equation.
+    niter : int
+        Maximum number of iterations.
+    shift : float, optional
+        Shift of the operator, e.g., a negative shift adds Tikhonov
+        regularization for positive semidefinite ``A``.
+    callback : callable, optional
+        Object executing code per iteration, e.g. plotting each iterate.
+
+    Other Parameters
+    ----------------
+    tol : non-negative float, optional
+        If given, the iteration stops once the estimated residual
+        ``r = rhs - A(x) + shift * x`` fulfills
+        ``||r|| <= tol * (||A|| ||x|| + ||rhs||)`` (``'residual'``), or once
+        the estimate of ``||A r|| / ||A||`` is at most ``tol``
+        (``'normal_residual'``, for singular systems).
+
+    Returns
+    -------
+    info : `ConvergenceInfo`
+        The number of iterations run and the reason for stopping.
+
+    See Also
+    --------
+    conjugate_gradient : Solver for positive definite operators
+
+    References
+    ----------
+    [PS1975] Paige, C C, and Saunders, M A. *Solution of sparse indefinite
+    systems of linear equations*. SIAM Journal on Numerical Analysis, 12
+    (1975), pp 617--629.
+    """
+    if op.domain != op.range:
+        raise ValueError('operator needs to be self-adjoint')
+    if x not in op.domain:
+        raise TypeError('`x` {!r} is not in the domain of `op` {!r}'
+                        ''.format(x, op.domain))
+    tol, _ = _stopping_params(kwargs, gap=False)
+    if kwargs:
+        raise TypeError('unexpected keyword arguments {}'
+                        ''.format(sorted(kwargs)))
+    shift = float(shift)
+
+    # Work vectors. The Lanczos vectors r1, r2, y and the search
+    # directions w1, w2, w are rotated instead of copied.
+    r2 = op(x)
+    r2.lincomb(1, rhs, -1, r2)             # r = rhs - A x
+    if shift != 0:
+        r2.lincomb(1, r2, shift, x)
+    r1 = op.domain.zero()
+    y = op.domain.element()
+    v = op.domain.element()
+    w = op.domain.zero()
+    w1 = op.domain.zero()
+    w2 = op.domain.zero()
+
+    beta1 = r2.norm()
+    if beta1 == 0:
+        return ConvergenceInfo(0, 'residual')
+
+    oldb = 0.0
+    beta = beta1
+    dbar = 0.0
+    epsln = 0.0
+    phibar = beta1
+    tnorm2 = 0.0
+    cs = -1.0
+    sn = 0.0
+
+    for k in range(1, niter + 1):
+        # Lanczos step
+        v.lincomb(1 / beta, r2)            # v = r2 / beta
+        op(v, out=y)
+        if shift != 0:
+            y.lincomb(1, y, -shift, v)
+        if k > 1:
+            y.lincomb(1, y, -beta / oldb, r1)
+        alfa = v.inner(y).real
+        y.lincomb(1, y, -alfa / beta, r2)
+        r1, r2, y = r2, y, r1
+        oldb = beta
+        beta = r2.norm()
+        tnorm2 += alfa ** 2 + oldb ** 2 + beta ** 2
+
+        # Apply the previous rotation and compute the next one
+        oldeps = epsln
+        delta = cs * dbar + sn * alfa
+        gbar = sn * dbar - cs * alfa
+        epsln = sn * beta
+        dbar = -cs * beta
+        root = np.hypot(gbar, dbar)
+        gamma = max(np.hypot(gbar, beta), np.finfo(float).eps)
+        cs = gbar / gamma
+        sn = beta / gamma
+        phi = cs * phibar
+        phibar = sn * phibar
+
+        # w = (v - oldeps * w1 - delta * w2) / gamma, with the previous
+        # two search directions w1 and w2
+        w1, w2, w = w2, w, w1
+        w.lincomb(1 / gamma, v, -oldeps / gamma, w1)
+        w.lincomb(1, w, -delta / gamma, w2)
+        x.lincomb(1, x, phi, w)
+
+        if callback is not None:
+            callback(x)
+
+        if beta == 0:
+            # The Krylov space is invariant, x is the solution
+            return ConvergenceInfo(k, 'residual')
+
+        if tol is not None:
+            anorm = np.sqrt(tnorm2)
+            rnorm = phibar
+            if rnorm <= tol * (anorm * x.norm() + beta1):
+                return ConvergenceInfo(k, 'residual')
+            if root <= tol * anorm:
+                return ConvergenceInfo(k, 'normal_residual')
+
+    return ConvergenceInfo(niter, 'niter')
+
+
+def _sym_ortho(a, b):
+    """Return a stable Givens rotation ``(c, s, r)`` eliminating ``b``.
+
+    The result fulfills ``[c, s; -s, c] * [a; b] = [r; 0]``.
+    """
+    if b == 0:
+        return np.sign(a), 0.0, abs(a)
+    elif a == 0:
+        return 0.0, np.sign(b), abs(b)
+    elif abs(b) > abs(a):
+        tau = a / b
+        s = np.sign(b) / np.sqrt(1 + tau * tau)
+        c = s * tau
+        r = b / s
+    else:
+        tau = b / a
+        c = np.sign(a) / np.sqrt(1 + tau * tau)
+        s = c * tau
+        r = a / c
+    return c, s, r
+
+
+if __name__ == '__main__':
+    # pylint: disable=wrong-import-position
+    from odl.util.testutils import run_doctests
+    run_doctests()
@@ -15,6 +15,8 @@ standard_library.install_aliases()
 
 import numpy as np
 
+from odl.solvers.util.checkpoint import load_checkpoint, _restore
+
 __all__ = ('mlem', 'osmlem', 'loglikelihood')
 
 
@@ -125,6 +127,13 @@ def osmlem(op, x, data, niter, noise='poisson', callback=None, **kwargs):
         Usable with ``noise='poisson'``. The algorithm contains an ``A^T 1``
         term, if this parameter is given, it is replaced by it.
         Default: ``op[i].adjoint(op[i].range.one())``
+    checkpoint : `Checkpoint`, optional
+        If given, ``x`` is saved after each full pass over the subsets
+        whenever it is due.
+    resume : str, optional
+        Path of a checkpoint written by ``checkpoint``. The iteration
+        continues from the saved state, overwriting ``x``, until ``niter``
+        iterations have been run in total.
 
     Notes
     -----
@@ -170,6 +179,13 @@ def osmlem(op, x, data, niter, noise='poisson', callback=None, **kwargs):
     # Convert data to range elements
     data = [op[i].range.element(data[i]) for i in range(len(op))]
 
+    checkpoint = kwargs.pop('checkpoint', None)
+    resume = kwargs.pop('resume', None)
+    start = 0
+    if resume is not None:
+        start, state = load_checkpoint(resume)
+        _restore(x, state['x'])
+
     if noise == 'poisson':
         # Parameter used to enforce positivity.
         # TODO: let users give this.
@@ -193,7 +209,7 @@ def osmlem(op, x, data, niter, noise='poisson', callback=None, **kwargs):
         tmp_dom = op[0].domain.element()
         tmp_ran = [opi.range.element() for opi in op]
 
-        for _ in range(niter):
+        for k in range(start, niter):
             for i in range(n_ops):
                 op[i](x, out=tmp_ran[i])
                 tmp_ran[i].ufuncs.maximum(eps, out=tmp_ran[i])
@@ -206,6 +222,9 @@ def osmlem(op, x, data, niter, noise='poisson', callback=None, **kwargs):
 
                 if callback is not None:
                     callback(x)
+
+            if checkpoint is not None and checkpoint.due(k + 1):
+                checkpoint.save(k + 1, {'x': x})
     else:
         raise RuntimeError('unknown noise model')
 
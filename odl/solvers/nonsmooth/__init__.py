@@ -26,3 +26,6 @@ __all__ += forward_backward.__all__
 
 from .proximal_gradient_solvers import *
 __all__ += proximal_gradient_solvers.__all__
+
+from .stochastic_primal_dual import *
+__all__ += stochastic_primal_dual.__all__
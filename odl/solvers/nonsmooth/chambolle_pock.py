@@ -19,15 +19,21 @@ standard_library.install_aliases()
 
 import numpy as np
 
-from odl.operator import Operator
+from odl.discr.diff_ops import Gradient, PartialDerivative
+from odl.operator import (
+    Operator, BroadcastOperator, ProductSpaceOperator, ScalingOperator,
+    MatrixOperator, OperatorComp, OperatorLeftScalarMult,
+    OperatorRightScalarMult, FlatteningOperator, FlatteningOperatorAdjoint)
+from odl.set import LinearSpaceElement
+from odl.solvers.util.checkpoint import load_checkpoint, _restore
+from odl.solvers.util.stopping import (
+    ConvergenceInfo, _stopping_params, _residual_small, _gap_small)
+from odl.space import ProductSpace
 
 
-__all__ = ('chambolle_pock_solver',)
+__all__ = ('chambolle_pock_solver', 'diagonal_step_sizes')
 
 
-# TODO: add dual gap as convergence measure
-# TODO: diagonal preconditioning
-
 def chambolle_pock_solver(x, f, g, L, tau, sigma, niter, **kwargs):
     """Chambolle-Pock algorithm for non-smooth convex optimization problems.
 
@@ -60,10 +66,14 @@ def chambolle_pock_solver(x, f, g, L, tau, sigma, niter, **kwargs):
         The linear operator that should be applied before ``f``. Its range must
         match the domain of ``f`` and its domain must match the domain of
         ``g``.
-    tau : positive float
+    tau : positive float or ``L.domain`` element
         Step size parameter for the update of the primal (``g``) variable.
-    sigma : positive float
+        An element gives an elementwise (diagonal) step size, see
+        `diagonal_step_sizes`.
+    sigma : positive float or ``L.range`` element
         Step size parameter for the update of the dual (``f``) variable.
+        An element gives an elementwise (diagonal) step size, see
+        `diagonal_step_sizes`.
     niter : non-negative int
         Number of iterations.
 
@@ -78,7 +88,7 @@ def chambolle_pock_solver(x, f, g, L, tau, sigma, niter, **kwargs):
         Acceleration parameter. If not ``None``, it overrides ``theta`` and
         causes variable relaxation parameter and step sizes to be used,
         with ``tau`` and ``sigma`` as initial values. Requires ``G`` or
-        ``F^*`` to be uniformly convex.
+        ``F^*`` to be uniformly convex, and scalar step sizes.
         Default: ``None``
     x_relax : ``op.domain`` element, optional
         Required to resume iteration. For ``None``, a copy of the primal
@@ -88,6 +98,35 @@ def chambolle_pock_solver(x, f, g, L, tau, sigma, niter, **kwargs):
         Required to resume iteration. For ``None``, ``op.range.zero()``
         is used.
         Default: ``None``
+    tol : non-negative float, optional
+        If given, stop before ``niter`` iterations once the relative change
+        of the primal-dual pair ``(x, y)`` in one iteration is at most
+        ``tol``. This uses only the iterates and no extra evaluations of
+        ``L``.
+        Default: ``None``
+    gap_interval : positive int, optional
+        If given, the duality gap
+        ``f(L x) + g(x) + f^*(y) + g^*(-L^* y)`` is evaluated every
+        ``gap_interval`` iterations instead, and the iteration stops once
+        it is at most ``tol`` relative to the objective values. Each
+        evaluation costs one application of ``L`` and its adjoint, and
+        requires the convex conjugates to be finite at the iterates.
+        Default: ``None``
+    checkpoint : `Checkpoint`, optional
+        If given, the state of the iteration, i.e., ``x``, ``x_relax``,
+        ``y`` and the current step sizes, is saved whenever it is due.
+        Default: ``None``
+    resume : str, optional
+        Path of a checkpoint written by ``checkpoint``. The iteration
+        continues from the saved state and stops after ``niter`` iterations
+        in total, giving the same result as an uninterrupted run.
+        ``x``, ``x_relax`` and ``y`` are overwritten with the saved state.
+        Default: ``None``
+
+    Returns
+    -------
+    info : `ConvergenceInfo`
+        The number of iterations run and the reason for stopping.
 
     Notes
     -----
@@ -111,6 +150,19 @@ def chambolle_pock_solver(x, f, g, L, tau, sigma, niter, **kwargs):
 
     where :math:`\|K\|` is the operator norm of :math:`K`.
 
+    Alternatively, :math:`\\tau` and :math:`\\sigma` can be positive
+    diagonal matrices, i.e., elementwise step sizes, which converge if
+
+    .. math::
+       \|\\sigma^{1/2} K \\tau^{1/2}\| \leq 1.
+
+    This is the diagonal preconditioning of [CP2011b], and the step sizes
+    computed by `diagonal_step_sizes` satisfy this condition. For badly
+    scaled operators, this often converges considerably faster than scalar
+    step sizes. In this case, the proximals of ``g`` and ``f.convex_conj``
+    need to support elementwise step sizes, which is the case for separable
+    functionals like the :math:`L^1` norm or the squared :math:`L^2` norm.
+
     It is often of interest to study problems that involve several operators,
     for example the classical TV regularized problem
 
@@ -174,21 +226,20 @@ def chambolle_pock_solver(x, f, g, L, tau, sigma, niter, **kwargs):
         raise TypeError('`x` {!r} is not in the domain of `op` {!r}'
                         ''.format(x, L.domain))
 
-    # Step size parameter
-    tau, tau_in = float(tau), tau
-    if tau <= 0:
-        raise ValueError('`tau` must be positive, got {}'.format(tau_in))
-
-    # Step size parameter
-    sigma, sigma_in = float(sigma), sigma
-    if sigma <= 0:
-        raise ValueError('`sigma` must be positive, got {}'.format(sigma_in))
+    # Step size parameters
+    tau = _step_size(tau, L.domain, 'tau')
+    sigma = _step_size(sigma, L.range, 'sigma')
+    elementwise = (isinstance(tau, LinearSpaceElement) or
+                   isinstance(sigma, LinearSpaceElement))
 
     # Number of iterations
     if not isinstance(niter, int) or niter < 0:
         raise ValueError('`niter` {} not understood'
                          ''.format(niter))
 
+    # Stopping criterion
+    tol, gap_interval = _stopping_params(kwargs)
+
     # Relaxation parameter
     theta = kwargs.pop('theta', 1)
     theta, theta_in = float(theta), theta
@@ -203,6 +254,9 @@ def chambolle_pock_solver(x, f, g, L, tau, sigma, niter, **kwargs):
         if gamma < 0:
             raise ValueError('`gamma` must be non-negative, got {}'
                              ''.format(gamma_in))
+        if elementwise:
+            raise ValueError('`gamma` cannot be used with elementwise step '
+                             'sizes')
 
     # Callback object
     callback = kwargs.pop('callback', None)
@@ -226,6 +280,18 @@ def chambolle_pock_solver(x, f, g, L, tau, sigma, niter, **kwargs):
         raise TypeError('`y` {} is not in the range of `L` '
                         '{}'.format(y.space, L.range))
 
+    # Saving and restoring the state
+    checkpoint = kwargs.pop('checkpoint', None)
+    resume = kwargs.pop('resume', None)
+    start = 0
+    if resume is not None:
+        start, state = load_checkpoint(resume)
+        _restore(x, state['x'])
+        _restore(x_relax, state['x_relax'])
+        _restore(y, state['y'])
+        if gamma is not None:
+            tau, sigma = state['tau'], state['sigma']
+
     # Get the proximals
     proximal_dual = f.convex_conj.proximal
     proximal_primal = g.proximal
@@ -242,14 +308,28 @@ def chambolle_pock_solver(x, f, g, L, tau, sigma, niter, **kwargs):
     dual_tmp = L.range.element()
     primal_tmp = L.domain.element()
 
-    for _ in range(niter):
+    # Previous dual iterate, only needed for the residual
+    if tol is not None and gap_interval is None:
+        y_old = L.range.element()
+    else:
+        y_old = None
+
+    reason = 'niter'
+    num_iter = start
+    for num_iter in range(start + 1, niter + 1):
         # Copy required for relaxation
         x_old.assign(x)
+        if y_old is not None:
+            y_old.assign(y)
 
         # Gradient ascent in the dual variable y
         # Compute dual_tmp = y + sigma * L(x_relax)
         L(x_relax, out=dual_tmp)
-        dual_tmp.lincomb(1, y, sigma, dual_tmp)
+        if isinstance(sigma, LinearSpaceElement):
+            dual_tmp *= sigma
+            dual_tmp += y
+        else:
+            dual_tmp.lincomb(1, y, sigma, dual_tmp)
 
         # Apply the dual proximal
         if not proximal_constant:
@@ -259,7 +339,11 @@ def chambolle_pock_solver(x, f, g, L, tau, sigma, niter, **kwargs):
         # Gradient descent in the primal variable x
         # Compute primal_tmp = x + (- tau) * L.derivative(x).adjoint(y)
         L.derivative(x).adjoint(y, out=primal_tmp)
-        primal_tmp.lincomb(1, x, -tau, primal_tmp)
+        if isinstance(tau, LinearSpaceElement):
+            primal_tmp *= tau
+            primal_tmp.lincomb(1, x, -1, primal_tmp)
+        else:
+            primal_tmp.lincomb(1, x, -tau, primal_tmp)
 
         # Apply the primal proximal
         if not proximal_constant:
@@ -278,6 +362,240 @@ def chambolle_pock_solver(x, f, g, L, tau, sigma, niter, **kwargs):
         if callback is not None:
             callback(x)
 
+        if checkpoint is not None and checkpoint.due(num_iter):
+            state = {'x': x, 'x_relax': x_relax, 'y': y}
+            if gamma is not None:
+                state.update(tau=tau, sigma=sigma)
+            checkpoint.save(num_iter, state)
+
+        if tol is None:
+            continue
+        elif gap_interval is None:
+            if _residual_small(tol, [x.dist(x_old), y.dist(y_old)],
+                               [x.norm(), y.norm()]):
+                reason = 'residual'
+                break
+        elif num_iter % gap_interval == 0:
+            primal = f(L(x)) + g(x)
+            dual = (-f.convex_conj(y) -
+                    g.convex_conj(-L.derivative(x).adjoint(y)))
+            if _gap_small(tol, primal, dual):
+                reason = 'gap'
+                break
+
+    return ConvergenceInfo(num_iter, reason)
+
+
+def diagonal_step_sizes(L, nonnegative=False):
+    """Return elementwise step sizes for diagonal preconditioning.
+
+    The step sizes are computed from the absolute row and column sums of
+    ``L`` as in [CP2011b] (with ``alpha = 1``)::
+
+        tau[j] = 1 / sum_i |L^*[j, i]|
+        sigma[i] = 1 / sum_j |L[i, j]|
+
+    and satisfy the convergence condition of `chambolle_pock_solver`.
+    Here, ``L[i, j]`` and ``L^*[j, i]`` are the entries of the matrices
+    of ``L`` and ``L.adjoint``, which differ by the ratio of the
+    weightings of ``L.range`` and ``L.domain``, e.g., the cell volume for
+    a `FlatteningOperator` on a `DiscreteLp` space.
+
+    Parameters
+    ----------
+    L : linear `Operator`
+        The forward operator of the problem. `BroadcastOperator`,
+        `ProductSpaceOperator`, scalar multiples and compositions with
+        `FlatteningOperator` are handled component-wise, and exact sums
+        are used for `MatrixOperator` and `ScalingOperator`. For `Gradient`
+        and `PartialDerivative`, upper bounds are used, which also give
+        convergent step sizes.
+    nonnegative : bool, optional
+        If ``True``, all other operators are assumed to have nonnegative
+        entries, and their absolute sums are computed as ``L(one)`` and
+        ``L.adjoint(one)``. This is always done for `RayTransform`.
+        Otherwise, such operators raise ``NotImplementedError`` since
+        the result is not a valid bound for operators with entries of
+        different signs.
+
+    Returns
+    -------
+    tau : ``L.domain`` element
+        Step sizes for the primal variable.
+    sigma : ``L.range`` element
+        Step sizes for the dual variable.
+
+    Raises
+    ------
+    NotImplementedError
+        If no absolute sums are known for ``L`` or one of its components.
+
+    Notes
+    -----
+    Zero row or column sums correspond to zero rows or columns of ``L``,
+    i.e., to variables that are not coupled by ``L`` and do not enter the
+    convergence condition. Their step sizes are set to the smallest step
+    size of the other variables.
+
+    References
+    ----------
+    [CP2011b] Chambolle, A and Pock, T. *Diagonal
+    preconditioning for first order primal-dual algorithms in convex
+    optimization*. 2011 IEEE International Conference on Computer Vision
+    (ICCV), 2011, pp 1762-1769.
+
+    Examples
+    --------
+    >>> L = odl.MatrixOperator([[2.0, -2.0],
+    ...                         [0.0, 2.0]])
+    >>> tau, sigma = diagonal_step_sizes(L)
+    >>> tau
+    rn(2).element([0.5, 0.25])
+    >>> sigma
+    rn(2).element([0.25, 0.5])
+    """
+    if not isinstance(L, Operator) or not L.is_linear:
+        raise TypeError('`L` {!r} is not a linear `Operator`'.format(L))
+
+    row_sums, col_sums = _abs_sums(L, bool(nonnegative))
+    return _reciprocal(col_sums), _reciprocal(row_sums)
+
+
+def _step_size(step, space, name):
+    """Check a scalar or elementwise step size."""
+    if isinstance(step, LinearSpaceElement):
+        if step not in space:
+            raise TypeError('`{}` {!r} is not an element of {!r}'
+                            ''.format(name, step, space))
+        if not np.all(_element_array(step) > 0):
+            raise ValueError('`{}` must be positive'.format(name))
+        return step
+
+    step, step_in = float(step), step
+    if step <= 0:
+        raise ValueError('`{}` must be positive, got {}'
+                         ''.format(name, step_in))
+    return step
+
+
+def _element_array(x):
+    """Return the values of ``x`` as a flat array."""
+    if isinstance(x.space, ProductSpace):
+        return np.concatenate([_element_array(xi) for xi in x])
+    else:
+        return np.asarray(x).ravel()
+
+
+def _reciprocal(sums):
+    """Return ``1 / sums`` with zeros replaced by the largest sum."""
+    arr = _element_array(sums)
+    if not np.any(arr > 0):
+        raise ValueError('operator has only zero row or column sums')
+    largest = arr.max()
+
+    if isinstance(sums.space, ProductSpace):
+        parts = [_reciprocal_part(s, largest) for s in sums]
+        return sums.space.element(parts)
+    else:
+        return _reciprocal_part(sums, largest)
+
+
+def _reciprocal_part(sums, largest):
+    """Return ``1 / sums`` for a non-product space element."""
+    arr = np.asarray(sums)
+    return sums.space.element(1.0 / np.where(arr > 0, arr, largest))
+
+
+def _abs_sums(L, nonnegative):
+    """Return the absolute row and column sums of ``L``.
+
+    The row sums are an ``L.range`` element with the absolute row sums of
+    the matrix of ``L``, the column sums an ``L.domain`` element with the
+    absolute row sums of the matrix of ``L.adjoint``.
+    """
+    # Lazy import to avoid importing the tomography backends
+    from odl.tomo import RayTransform
+
+    if isinstance(L, BroadcastOperator):
+        sums = [_abs_sums(op, nonnegative) for op in L.operators]
+        rows = L.range.element([row for row, _ in sums])
+        cols = L.domain.zero()
+        for _, col in sums:
+            cols += col
+        return rows, cols
+
+    elif isinstance(L, ProductSpaceOperator):
+        rows = L.range.zero()
+        cols = L.domain.zero()
+        for i, j, op in zip(L.ops.row, L.ops.col, L.ops.data):
+            row, col = _abs_sums(op, nonnegative)
+            rows[i] += row
+            cols[j] += col
+        return rows, cols
+
+    elif isinstance(L, MatrixOperator):
+        abs_mat = abs(L.matrix)
+        row = np.asarray(abs_mat.sum(axis=1)).ravel()
+        col = np.asarray(abs_mat.sum(axis=0)).ravel()
+        return L.range.element(row), L.domain.element(col)
+
+    elif isinstance(L, ScalingOperator):
+        return (abs(L.scalar) * L.range.one(),
+                abs(L.scalar) * L.domain.one())
+
+    elif isinstance(L, (Gradient, PartialDerivative)):
+        # Each row has at most two entries of size at most 1 / h, and so has
+        # each column if the padding does not extrapolate
+        if L.pad_mode not in ('constant', 'periodic', 'order0'):
+            raise ValueError("no absolute sums for `pad_mode` '{}'"
+                             ''.format(L.pad_mode))
+        cell_sides = L.domain.cell_sides
+        if isinstance(L, Gradient):
+            rows = L.range.element([2.0 / h * L.domain.one()
+                                    for h in cell_sides])
+            cols = np.sum(2.0 / cell_sides) * L.domain.one()
+        else:
+            rows = 2.0 / cell_sides[L.axis] * L.range.one()
+            cols = 2.0 / cell_sides[L.axis] * L.domain.one()
+        return rows, cols
+
+    elif _is_reordering(L):
+        return L.range.one(), L.adjoint(L.range.one())
+
+    elif isinstance(L, (OperatorLeftScalarMult, OperatorRightScalarMult)):
+        rows, cols = _abs_sums(L.operator, nonnegative)
+        return abs(L.scalar) * rows, abs(L.scalar) * cols
+
+    elif isinstance(L, OperatorComp) and _is_reordering(L.right):
+        # The columns of ``L.left`` are reordered, and those of the adjoint
+        # are scaled by the weighting ratio of ``L.right``
+        rows, cols = _abs_sums(L.left, nonnegative)
+        return rows, L.right.adjoint(cols)
+
+    elif isinstance(L, OperatorComp) and _is_reordering(L.left):
+        # The rows of ``L.right`` are reordered, and the adjoint is scaled
+        # by the constant ``L.left.adjoint(one)``
+        rows, cols = _abs_sums(L.right, nonnegative)
+        ratio = _element_array(L.left.adjoint(L.left.range.one())).max()
+        return L.left(rows), ratio * cols
+
+    elif nonnegative or isinstance(L, RayTransform):
+        # Only valid without cancellations, i.e., for nonnegative entries
+        rows = L(L.domain.one())
+        cols = L.adjoint(L.range.one())
+        return rows.ufuncs.absolute(), cols.ufuncs.absolute()
+
+    else:
+        raise NotImplementedError(
+            'no absolute row and column sums known for {!r}, use '
+            '`nonnegative=True` for operators with nonnegative entries'
+            ''.format(L))
+
+
+def _is_reordering(op):
+    """Return ``True`` if ``op`` only reorders the entries."""
+    return isinstance(op, (FlatteningOperator, FlatteningOperatorAdjoint))
+
 
 if __name__ == '__main__':
     # pylint: disable=wrong-import-position
@@ -14,6 +14,9 @@ from future import standard_library
 standard_library.install_aliases()
 
 from odl.operator import Operator
+from odl.solvers.util.checkpoint import load_checkpoint, _restore
+from odl.solvers.util.stopping import (
+    ConvergenceInfo, _stopping_params, _residual_small, _gap_small)
 
 
 __all__ = ('douglas_rachford_pd',)
@@ -69,6 +72,27 @@ def douglas_rachford_pd(x, f, g, L, tau, sigma, niter,
     lam : float or callable, optional
         Overrelaxation step size. If callable, it should take an index
         (starting at zero) and return the corresponding step size.
+    tol : non-negative float, optional
+        If given, the iteration stops early once the fixed-point residual,
+        i.e., the change of ``x`` and the dual variables in one iteration,
+        is at most ``tol`` relative to their norms. The residual is
+        computed from the temporaries of the iteration.
+    gap_interval : positive int, optional
+        If given, the relative duality gap of the primal and dual
+        estimates is evaluated every ``gap_interval`` iterations and
+        compared to ``tol`` instead of the residual. Not available with
+        ``l``.
+    checkpoint : `Checkpoint`, optional
+        If given, the state of the iteration is saved whenever it is due.
+    resume : str, optional
+        Path of a checkpoint written by ``checkpoint``. The iteration
+        continues from the saved state, overwriting ``x``, until ``niter``
+        iterations have been run in total.
+
+    Returns
+    -------
+    info : `ConvergenceInfo`
+        The number of iterations run and the reason for stopping.
 
     Notes
     -----
@@ -152,6 +176,13 @@ def douglas_rachford_pd(x, f, g, L, tau, sigma, niter,
         raise ValueError('`lam` must callable or a number between 0 and 2')
     lam = lam_in if callable(lam_in) else lambda _: lam_in
 
+    tol, gap_interval = _stopping_params(kwargs)
+    if gap_interval is not None and l is not None:
+        raise ValueError('duality gap not available with `l`')
+
+    checkpoint = kwargs.pop('checkpoint', None)
+    resume = kwargs.pop('resume', None)
+
     # Check for unused parameters
     if kwargs:
         raise TypeError('unexpected keyword argument: {}'.format(kwargs))
@@ -168,7 +199,18 @@ def douglas_rachford_pd(x, f, g, L, tau, sigma, niter,
     # Temporaries (not in original article)
     tmp_domain = x.space.zero()
 
-    for k in range(niter):
+    start = 0
+    if resume is not None:
+        start, state = load_checkpoint(resume)
+        _restore(x, state['x'])
+        _restore(p1, state['p1'])
+        for vi, vi_state in zip(v, state['v']):
+            _restore(vi, vi_state)
+
+    reason = 'niter'
+    num_iter = start
+    for k in range(start, niter):
+        num_iter = k + 1
         lam_k = lam(k)
 
         if len(L) > 0:
@@ -225,6 +267,36 @@ def douglas_rachford_pd(x, f, g, L, tau, sigma, niter,
         if callback is not None:
             callback(p1)
 
+        if checkpoint is not None and checkpoint.due(num_iter):
+            checkpoint.save(num_iter, {'x': x, 'v': v, 'p1': p1})
+
+        if tol is None:
+            continue
+        elif gap_interval is None:
+            changes = ([lam_k * z1.dist(p1)] +
+                       [lam_k * z2[i].dist(p2[i]) for i in range(m)])
+            norms = [x.norm()] + [vi.norm() for vi in v]
+            if _residual_small(tol, changes, norms):
+                reason = 'residual'
+                break
+        elif num_iter % gap_interval == 0:
+            if _gap_small(tol, *_duality_gap_values(f, g, L, p1, p2)):
+                reason = 'gap'
+                break
+
     # The final result is actually in p1 according to the algorithm, so we need
     # to assign here.
     x.assign(p1)
+
+    return ConvergenceInfo(num_iter, reason)
+
+
+def _duality_gap_values(f, g, L, x, y):
+    """Return the primal and dual objective values at ``x`` and ``y``."""
+    primal = f(x) + sum(gi(Li(x)) for gi, Li in zip(g, L))
+    adj_sum = x.space.zero()
+    for Li, yi in zip(L, y):
+        adj_sum -= Li.adjoint(yi)
+    dual = (-f.convex_conj(adj_sum) -
+            sum(gi.convex_conj(yi) for gi, yi in zip(g, y)))
+    return primal, dual
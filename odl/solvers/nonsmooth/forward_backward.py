@@ -15,6 +15,8 @@ from future import standard_library
 standard_library.install_aliases()
 
 from odl.operator import Operator
+from odl.solvers.util.stopping import (
+    ConvergenceInfo, _stopping_params, _residual_small)
 
 
 __all__ = ('forward_backward_pd',)
@@ -72,6 +74,14 @@ def forward_backward_pd(x, f, g, L, h, tau, sigma, niter,
     l : sequence of `Functional`'s, optional
         The functionals ``l_i``. Needs to have ``g_i.convex_conj.gradient``.
         If omitted, the simpler problem without ``l_i``  will be considered.
+    tol : non-negative float, optional
+        If given, stop early once the change of ``x`` and the dual variables
+        in one iteration is at most ``tol`` relative to their norms.
+
+    Returns
+    -------
+    info : `ConvergenceInfo`
+        The number of iterations run and the reason for stopping.
 
     Notes
     -----
@@ -165,6 +175,8 @@ def forward_backward_pd(x, f, g, L, h, tau, sigma, niter,
             raise ValueError('`grad_cc_l` not same length as `L`')
         grad_cc_l = [li.convex_conj.gradient for li in l]
 
+    tol, _ = _stopping_params(kwargs, gap=False)
+
     if kwargs:
         raise TypeError('unexpected keyword argument: {}'.format(kwargs))
 
@@ -172,7 +184,20 @@ def forward_backward_pd(x, f, g, L, h, tau, sigma, niter,
     v = [Li.range.zero() for Li in L]
     y = x.space.zero()
 
+    # Previous iterates, only needed for the residual
+    if tol is not None:
+        x_prev = x.space.element()
+        v_prev = [Li.range.element() for Li in L]
+
+    reason = 'niter'
+    num_iter = 0
     for k in range(niter):
+        num_iter = k + 1
+        if tol is not None:
+            x_prev.assign(x)
+            for vi_prev, vi in zip(v_prev, v):
+                vi_prev.assign(vi)
+
         x_old = x
 
         tmp_1 = grad_h(x) + sum(Li.adjoint(vi) for Li, vi in zip(L, v))
@@ -192,3 +217,13 @@ def forward_backward_pd(x, f, g, L, h, tau, sigma, niter,
 
         if callback is not None:
             callback(x)
+
+        if tol is not None:
+            changes = ([x.dist(x_prev)] +
+                       [vi.dist(vi_prev) for vi, vi_prev in zip(v, v_prev)])
+            norms = [x.norm()] + [vi.norm() for vi in v]
+            if _residual_small(tol, changes, norms):
+                reason = 'residual'
+                break
+
+    return ConvergenceInfo(num_iter, reason)
@@ -16,6 +16,9 @@ standard_library.install_aliases()
 
 import numpy as np
 
+from odl.solvers.util.stopping import (
+    ConvergenceInfo, _stopping_params, _residual_small)
+
 
 __all__ = ('proximal_gradient', 'accelerated_proximal_gradient')
 
@@ -55,6 +58,15 @@ def proximal_gradient(x, f, g, gamma, niter, callback=None, **kwargs):
         Overrelaxation step size. If callable, it should take an index
         (starting at zero) and return the corresponding step size.
         Default: 1.0
+    tol : non-negative float, optional
+        If given, stop early once the change of ``x`` in one iteration is
+        at most ``tol`` relative to its norm.
+        Default: ``None``
+
+    Returns
+    -------
+    info : `ConvergenceInfo`
+        The number of iterations run and the reason for stopping.
 
     Notes
     -----
@@ -102,25 +114,40 @@ def proximal_gradient(x, f, g, gamma, niter, callback=None, **kwargs):
     lam_in = kwargs.pop('lam', 1.0)
     lam = lam_in if callable(lam_in) else lambda _: float(lam_in)
 
+    tol, _ = _stopping_params(kwargs, gap=False)
+
     # Get the proximal and gradient
     f_prox = f.proximal(gamma)
     g_grad = g.gradient
 
-    # Create temporary
+    # Create temporaries
     tmp = x.space.element()
+    x_prox = x.space.element()
 
+    reason = 'niter'
+    num_iter = 0
     for k in range(niter):
+        num_iter = k + 1
         lam_k = lam(k)
 
         # x - gamma grad_g (x)
         tmp.lincomb(1, x, -gamma, g_grad(x))
 
-        # Update x
-        x.lincomb(1 - lam_k, x, lam_k, f_prox(tmp))
+        # Update x, the change is lam_k * (prox - x)
+        f_prox(tmp, out=x_prox)
+        if tol is not None:
+            change = lam_k * x.dist(x_prox)
+        x.lincomb(1 - lam_k, x, lam_k, x_prox)
 
         if callback is not None:
             callback(x)
 
+        if tol is not None and _residual_small(tol, [change], [x.norm()]):
+            reason = 'residual'
+            break
+
+    return ConvergenceInfo(num_iter, reason)
+
 
 def accelerated_proximal_gradient(x, f, g, gamma, niter, callback=None,
                                   **kwargs):
@@ -152,6 +179,19 @@ def accelerated_proximal_gradient(x, f, g, gamma, niter, callback=None,
     callback : callable, optional
         Function called with the current iterate after each iteration.
 
+    Other Parameters
+    ----------------
+    tol : non-negative float, optional
+        If given, stop early once the change of ``x`` compared to the
+        previous iterate (not the extrapolated point) is at most ``tol``
+        relative to its norm.
+        Default: ``None``
+
+    Returns
+    -------
+    info : `ConvergenceInfo`
+        The number of iterations run and the reason for stopping.
+
     Notes
     -----
     The problem of interest is
@@ -188,6 +228,8 @@ def accelerated_proximal_gradient(x, f, g, gamma, niter, callback=None,
     if int(niter) != niter:
         raise ValueError('`niter` {} not understood'.format(niter))
 
+    tol, _ = _stopping_params(kwargs, gap=False)
+
     # Get the proximal
     f_prox = f.proximal(gamma)
     g_grad = g.gradient
@@ -197,7 +239,10 @@ def accelerated_proximal_gradient(x, f, g, gamma, niter, callback=None,
     y = x.copy()
     t = 1
 
+    reason = 'niter'
+    num_iter = 0
     for k in range(niter):
+        num_iter = k + 1
         # Update t
         t, t_old = (1 + np.sqrt(1 + 4 * t ** 2)) / 2, t
         alpha = (t_old - 1) / t
@@ -205,11 +250,14 @@ def accelerated_proximal_gradient(x, f, g, gamma, niter, callback=None,
         # x - gamma grad_g (y)
         tmp.lincomb(1, y, -gamma, g_grad(y))
 
-        # Store old x value in y
+        # Store old x value in y, the extrapolated point is not needed
+        # anymore
         y.assign(x)
 
-        # Update x
+        # Update x, the change is measured against the previous iterate
         f_prox(tmp, out=x)
+        if tol is not None:
+            change = x.dist(y)
 
         # Update y
         y.lincomb(1 + alpha, x, -alpha, y)
@@ -217,6 +265,12 @@ def accelerated_proximal_gradient(x, f, g, gamma, niter, callback=None,
         if callback is not None:
             callback(x)
 
+        if tol is not None and _residual_small(tol, [change], [x.norm()]):
+            reason = 'residual'
+            break
+
+    return ConvergenceInfo(num_iter, reason)
+
 
 if __name__ == '__main__':
     # pylint: disable=wrong-import-position
@@ -26,6 +26,7 @@ from __future__ import print_function, division, absolute_import
 from future import standard_library
 standard_library.install_aliases()
 from builtins import super
+import functools
 
 import numpy as np
 import scipy.special
@@ -73,6 +74,9 @@ def combine_proximals(*factory_list):
     .. math::
         \mathrm{prox}_{\\sigma (F(x) + G(y))}(x, y) =
         (\mathrm{prox}_{\\sigma F}(x), \mathrm{prox}_{\\sigma G}(y)).
+
+    An elementwise step size :math:`\\sigma = (\\sigma_1, \\sigma_2)` in
+    the product space is split accordingly.
     """
 
     def diag_op_factory(sigma):
@@ -80,15 +84,24 @@ def combine_proximals(*factory_list):
 
         Parameters
         ----------
-        sigma : positive float
-            Step size parameter
+        sigma : positive float or `ProductSpaceElement`
+            Step size parameter. An element is split into the step sizes
+            of the individual proximals.
 
         Returns
         -------
         diag_op : `DiagonalOperator`
         """
-        return DiagonalOperator(
-            *[factory(sigma) for factory in factory_list])
+        if isinstance(sigma, LinearSpaceElement):
+            if len(sigma) != len(factory_list):
+                raise ValueError('`sigma` has {} parts, expected {}'
+                                 ''.format(len(sigma), len(factory_list)))
+            return DiagonalOperator(
+                *[factory(sigma_i)
+                  for factory, sigma_i in zip(factory_list, sigma)])
+        else:
+            return DiagonalOperator(
+                *[factory(sigma) for factory in factory_list])
 
     return diag_op_factory
 
@@ -126,6 +139,9 @@ def proximal_convex_conj(prox_factory):
     Note that since :math:`(F^*)^* = F`, this can be used to get the proximal
     of the original function from the proximal of the convex conjugate.
 
+    For separable :math:`F`, the same identity holds with an elementwise
+    step size :math:`\\sigma`, i.e., a diagonal metric.
+
     For reference on the Moreau identity, see [CP2011c].
 
     References
@@ -141,15 +157,15 @@ def proximal_convex_conj(prox_factory):
 
         Parameters
         ----------
-        sigma : positive float
-            Step size parameter
+        sigma : positive float or `LinearSpaceElement`
+            Step size parameter, possibly elementwise.
 
         Returns
         -------
         proximal : `Operator`
             The proximal operator of ``s * F^*`` where ``s`` is the step size
         """
-        sigma = float(sigma)
+        sigma = _step_size(sigma)
         prox_other = sigma * prox_factory(1.0 / sigma) * (1.0 / sigma)
         return IdentityOperator(prox_other.domain) - prox_other
 
@@ -221,8 +237,9 @@ def proximal_arg_scaling(prox_factory, scaling):
     prox_factory : callable
         A factory function that, when called with a step size, returns the
         proximal operator of ``F``
-    scaling : float
-        Scaling parameter
+    scaling : float or `LinearSpaceElement`
+        Scaling parameter. An element gives an elementwise scaling, which
+        requires ``F`` to be separable.
 
     Returns
     -------
@@ -253,18 +270,19 @@ def proximal_arg_scaling(prox_factory, scaling):
     2011.
     """
 
-    scaling = float(scaling)
-    if scaling == 0:
-        return proximal_const_func(prox_factory(1.0).domain)
+    if not isinstance(scaling, LinearSpaceElement):
+        scaling = float(scaling)
+        if scaling == 0:
+            return proximal_const_func(prox_factory(1.0).domain)
 
-    @cache_arguments
+    @_cache_scalar_step
     def arg_scaling_prox_factory(sigma):
         """Create proximal for the translation with a given sigma.
 
         Parameters
         ----------
-        sigma : positive float
-            Step size parameter
+        sigma : positive float or `LinearSpaceElement`
+            Step size parameter, possibly elementwise.
 
         Returns
         -------
@@ -337,14 +355,14 @@ def proximal_quadratic_perturbation(prox_factory, a, u=None):
         raise TypeError('`u` must be `None` or a `LinearSpaceElement` '
                         'instance, got {!r}.'.format(u))
 
-    @cache_arguments
+    @_cache_scalar_step
     def quadratic_perturbation_prox_factory(sigma):
         """Create proximal for the quadratic perturbation with a given sigma.
 
         Parameters
         ----------
-        sigma : positive float
-            Step size parameter
+        sigma : positive float or `LinearSpaceElement`
+            Step size parameter, possibly elementwise.
 
         Returns
         -------
@@ -354,7 +372,13 @@ def proximal_quadratic_perturbation(prox_factory, a, u=None):
         """
         const = 1.0 / np.sqrt(sigma * 2.0 * a + 1)
         prox = proximal_arg_scaling(prox_factory, const)(sigma)
-        if u is not None:
+        if isinstance(sigma, LinearSpaceElement):
+            prox = const * prox * const
+            if u is not None:
+                prox = prox * (IdentityOperator(u.space) -
+                               ConstantOperator(sigma * u))
+            return prox
+        elif u is not None:
             return (const * prox *
                     (ScalingOperator(u.space, const) - sigma * const * u))
         else:
@@ -743,7 +767,7 @@ def proximal_l2(space, lam=1, g=None):
             sigma : positive float
                 Step size parameter
             """
-            self.sigma = float(sigma)
+            self.sigma = _step_size(sigma, space, elementwise=False)
             super().__init__(domain=space, range=space, linear=False)
 
         def _call(self, x, out):
@@ -843,10 +867,10 @@ def proximal_convex_conj_l2_squared(space, lam=1, g=None):
 
             Parameters
             ----------
-            sigma : positive float
-                Step size parameter
+            sigma : positive float or ``space`` element
+                Step size parameter, possibly elementwise.
             """
-            self.sigma = float(sigma)
+            self.sigma = _step_size(sigma, space)
             super().__init__(domain=space, range=space, linear=g is None)
 
         def _call(self, x, out):
@@ -855,7 +879,13 @@ def proximal_convex_conj_l2_squared(space, lam=1, g=None):
             # (x - sig*g) / (1 + sig/(2 lam))
 
             sig = self.sigma
-            if g is None:
+            if isinstance(sig, LinearSpaceElement):
+                if g is None:
+                    out.assign(x)
+                else:
+                    out.lincomb(1, x, -1, sig * g)
+                out /= 1 + sig * (0.5 / lam)
+            elif g is None:
                 out.lincomb(1.0 / (1 + 0.5 * sig / lam), x)
             else:
                 out.lincomb(1.0 / (1 + 0.5 * sig / lam), x,
@@ -1017,11 +1047,11 @@ def proximal_convex_conj_l1(space, lam=1, g=None, isotropic=False):
 
             Parameters
             ----------
-            sigma : positive float
-                Step size parameter
+            sigma : positive float or ``space`` element
+                Step size parameter, possibly elementwise.
             """
-            # sigma is not used
-            self.sigma = float(sigma)
+            # sigma is only used with g
+            self.sigma = _step_size(sigma, space)
             super().__init__(domain=space, range=space, linear=False)
 
         def _call(self, x, out):
@@ -1238,9 +1268,10 @@ def proximal_convex_conj_kl(space, lam=1, g=None):
 
             Parameters
             ----------
-            sigma : positive float
+            sigma : positive float or ``space`` element
+                Step size parameter, possibly elementwise.
             """
-            self.sigma = float(sigma)
+            self.sigma = _step_size(sigma, space)
             super().__init__(domain=space, range=space, linear=False)
 
         def _call(self, x, out):
@@ -1259,6 +1290,8 @@ def proximal_convex_conj_kl(space, lam=1, g=None):
             # If g is None, it is taken as the one element
             if g is None:
                 out += 4.0 * lam * self.sigma
+            elif isinstance(self.sigma, LinearSpaceElement):
+                out += (4.0 * lam) * self.sigma * g
             else:
                 out.lincomb(1, out, 4.0 * lam * self.sigma, g)
 
@@ -1373,9 +1406,10 @@ def proximal_convex_conj_kl_cross_entropy(space, lam=1, g=None):
 
             Parameters
             ----------
-            sigma : positive float
+            sigma : positive float or ``space`` element
+                Step size parameter, possibly elementwise.
             """
-            self.sigma = float(sigma)
+            self.sigma = _step_size(sigma, space)
             super().__init__(domain=space, range=space, linear=False)
 
         def _call(self, x, out):
@@ -1395,6 +1429,51 @@ def proximal_convex_conj_kl_cross_entropy(space, lam=1, g=None):
     return ProximalConvexConjKLCrossEntropy
 
 
+def _cache_scalar_step(factory):
+    """Decorate a proximal factory to cache proximals for scalar steps.
+
+    Elementwise step sizes are not hashable, hence the proximal is created
+    anew for them.
+    """
+    cached_factory = cache_arguments(factory)
+
+    @functools.wraps(factory)
+    def step_factory(sigma):
+        if isinstance(sigma, LinearSpaceElement):
+            return factory(sigma)
+        else:
+            return cached_factory(sigma)
+
+    return step_factory
+
+
+def _step_size(sigma, space=None, elementwise=True):
+    """Return a scalar or elementwise step size for a proximal.
+
+    Parameters
+    ----------
+    sigma : positive float or `LinearSpaceElement`
+        The step size to check.
+    space : `LinearSpace`, optional
+        If given, elementwise step sizes must be elements of this space.
+    elementwise : bool, optional
+        If ``False``, elementwise step sizes are rejected.
+
+    Returns
+    -------
+    sigma : float or `LinearSpaceElement`
+    """
+    if not isinstance(sigma, LinearSpaceElement):
+        return float(sigma)
+    if not elementwise:
+        raise TypeError('elementwise step size {!r} not supported, '
+                        'need a scalar'.format(sigma))
+    if space is not None and sigma not in space:
+        raise TypeError('step size {!r} is not an element of {!r}'
+                        ''.format(sigma, space))
+    return sigma
+
+
 if __name__ == '__main__':
     # pylint: disable=wrong-import-position
     from odl.util.testutils import run_doctests
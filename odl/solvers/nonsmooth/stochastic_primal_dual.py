@@ -0,0 +1,241 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Stochastic primal-dual hybrid gradient algorithm.
+
+In each iteration, only one randomly selected block of the forward operator
+and its adjoint is applied, which makes the method well suited for problems
+with many blocks, e.g., subsets of projection data in tomography.
+"""
+
+# Imports for common Python 2/3 codebase
+from __future__ import print_function, division, absolute_import
+from future import standard_library
+standard_library.install_aliases()
+
+import numpy as np
+
+from odl.operator import Operator
+from odl.util import SCRATCH_POOL
+
+
+__all__ = ('spdhg',)
+
+
+def spdhg(x, f, g, A, tau, sigma, niter, **kwargs):
+    """Stochastic primal-dual hybrid gradient algorithm.
+
+    The method solves problems of the form::
+
+        min_{x in X} sum_i f_i(A_i x) + g(x)
+
+    where ``A_i`` are linear operators and ``f_i`` and ``g`` are convex
+    functionals. It is a randomized version of `chambolle_pock_solver`
+    (see [CERS2018]), where in each iteration the dual variable is only
+    updated for randomly selected blocks ``i``. Hence, only ``A_i`` and
+    its adjoint have to be evaluated instead of the full operator. The
+    sum ``A^* y = sum_i A_i^* y_i`` needed in the primal update is
+    updated incrementally.
+
+    Parameters
+    ----------
+    x : ``A.domain`` element
+        Starting point of the iteration, updated in-place.
+    f : `SeparableSum` or sequence of `Functional`'s
+        The functionals ``f_i``. Each needs to have
+        ``f_i.convex_conj.proximal``.
+    g : `Functional`
+        The functional ``g``. Needs to have ``g.proximal``.
+    A : `BroadcastOperator` or sequence of linear `Operator`'s
+        The operators ``A_i``, with the same domain as ``g``.
+    tau : positive float
+        Step size for the update of the primal variable.
+    sigma : positive float or sequence of positive floats
+        Step sizes for the updates of the dual variables, either the same
+        for all blocks or one per block.
+    niter : non-negative int
+        Number of iterations.
+
+    Other Parameters
+    ----------------
+    prob : sequence of floats or 'importance', optional
+        Probabilities with which the blocks are selected. For
+        ``'importance'``, block ``i`` is selected with probability
+        proportional to the norm of ``A_i``, which is estimated if needed.
+        Default: Uniform probabilities
+    fun_select : callable, optional
+        Function called without arguments in each iteration, returning the
+        list of blocks to update. By default, one block is drawn according
+        to ``prob`` using `numpy.random`, i.e., serial sampling.
+    theta : float, optional
+        Extrapolation parameter.
+        Default: 1
+    y : ``A.range`` element, optional
+        Starting point of the dual variable, updated in-place. For
+        ``None``, zero is used.
+        Default: ``None``
+    z : ``A.domain`` element, optional
+        The aggregate ``A^* y``, updated in-place. It is computed from
+        ``y`` if not given.
+        Default: ``None``
+    callback : callable, optional
+        Function called with the current iterate after each iteration.
+
+    Notes
+    -----
+    With probabilities :math:`p_i`, the iteration reads
+
+    .. math::
+        x^{k+1} = \\mathrm{prox}_{\\tau g}(x^k - \\tau \\bar{z}^k)
+
+        y_i^{k+1} =
+        \\mathrm{prox}_{\\sigma_i f_i^*}(y_i^k + \\sigma_i A_i x^{k+1})
+        \\quad \\text{for the selected } i, \\quad
+        y_j^{k+1} = y_j^k \\text{ otherwise}
+
+        z^{k+1} = z^k + \\sum_{i \\text{ selected}}
+        A_i^*(y_i^{k+1} - y_i^k)
+
+        \\bar{z}^{k+1} = z^{k+1} + \\sum_{i \\text{ selected}}
+        \\frac{\\theta}{p_i} A_i^*(y_i^{k+1} - y_i^k)
+
+    For serial sampling, convergence is guaranteed if
+
+    .. math::
+        \\tau \\sigma_i \\|A_i\\|^2 < p_i \\quad \\text{for all } i,
+
+    e.g., with :math:`\\sigma_i = \\gamma / \\|A_i\\|` and
+    :math:`\\tau = \\gamma \\min_i p_i / \\|A_i\\|` for some
+    :math:`\\gamma < 1`.
+
+    References
+    ----------
+    [CERS2018] Chambolle, A, Ehrhardt, M J, Richtarik, P, and Schoenlieb,
+    C-B. *Stochastic Primal-Dual Hybrid Gradient Algorithm with Arbitrary
+    Sampling and Imaging Applications*. SIAM Journal on Optimization, 28
+    (2018), pp 2783--2808.
+    """
+    # Blocks of the operator and the functional
+    ops = getattr(A, 'operators', A)
+    if isinstance(ops, Operator):
+        raise TypeError('`A` {!r} is not a block operator'.format(A))
+    ops = list(ops)
+    funcs = list(getattr(f, 'functionals', f))
+    nblocks = len(ops)
+    if len(funcs) != nblocks:
+        raise ValueError('number of functionals {} does not match number '
+                         'of operators {}'.format(len(funcs), nblocks))
+    for op in ops:
+        if not isinstance(op, Operator) or not op.is_linear:
+            raise TypeError('`A` has a block {!r} that is not a linear '
+                            '`Operator`'.format(op))
+        if op.domain != g.domain:
+            raise ValueError('block {!r} of `A` has domain {!r}, expected '
+                             '{!r}'.format(op, op.domain, g.domain))
+    if x not in g.domain:
+        raise TypeError('`x` {!r} is not in the domain of `g` {!r}'
+                        ''.format(x, g.domain))
+
+    tau, tau_in = float(tau), tau
+    if tau <= 0:
+        raise ValueError('`tau` must be positive, got {}'.format(tau_in))
+    if np.isscalar(sigma):
+        sigma = [sigma] * nblocks
+    sigma = [float(s) for s in sigma]
+    if len(sigma) != nblocks or min(sigma) <= 0:
+        raise ValueError('`sigma` must be positive with one entry per '
+                         'block, got {}'.format(sigma))
+
+    prob = kwargs.pop('prob', None)
+    if prob is None:
+        prob = [1.0 / nblocks] * nblocks
+    elif isinstance(prob, str):
+        if prob != 'importance':
+            raise ValueError("`prob` '{}' not understood".format(prob))
+        norms = [op.norm(estimate=True) for op in ops]
+        prob = [n / sum(norms) for n in norms]
+    prob = [float(p) for p in prob]
+    if (len(prob) != nblocks or min(prob) <= 0 or
+            not np.isclose(sum(prob), 1)):
+        raise ValueError('`prob` must be positive, sum up to 1 and have '
+                         'one entry per block, got {}'.format(prob))
+
+    fun_select = kwargs.pop('fun_select', None)
+    if fun_select is None:
+        def fun_select():
+            return [np.random.choice(nblocks, p=prob)]
+
+    theta = float(kwargs.pop('theta', 1))
+
+    y = kwargs.pop('y', None)
+    z = kwargs.pop('z', None)
+    if y is None:
+        y = [op.range.zero() for op in ops]
+        if z is None:
+            z = g.domain.zero()
+    elif len(y) != nblocks:
+        raise ValueError('`y` has {} parts, expected {}'
+                         ''.format(len(y), nblocks))
+
+    if z is None:
+        z = g.domain.zero()
+        for op, yi in zip(ops, y):
+            z += op.adjoint(yi)
+
+    callback = kwargs.pop('callback', None)
+    if callback is not None and not callable(callback):
+        raise TypeError('`callback` {} is not callable'.format(callback))
+
+    if kwargs:
+        raise TypeError('unexpected keyword arguments {}'
+                        ''.format(sorted(kwargs)))
+
+    # Pre-compute proximals for efficiency
+    proximal_g = g.proximal(tau)
+    proximal_dual = [fi.convex_conj.proximal(si)
+                     for fi, si in zip(funcs, sigma)]
+
+    # Extrapolated aggregate and temporaries
+    z_relax = z.copy()
+    x_tmp = x.space.element()
+    dz = x.space.element()
+
+    for _ in range(niter):
+        # Primal update
+        x_tmp.lincomb(1, x, -tau, z_relax)
+        proximal_g(x_tmp, out=x)
+
+        # Dual update of the selected blocks, collecting the change of the
+        # aggregate in `dz` and the extrapolation in `z_relax`
+        z_relax.set_zero()
+        for i in fun_select():
+            op = ops[i]
+            with SCRATCH_POOL.borrow(op.range) as y_tmp, \
+                    SCRATCH_POOL.borrow(op.range) as y_new:
+                op(x, out=y_tmp)
+                y_tmp.lincomb(1, y[i], sigma[i], y_tmp)
+                proximal_dual[i](y_tmp, out=y_new)
+
+                # y_tmp = y_new - y_i
+                y_tmp.lincomb(1, y_new, -1, y[i])
+                y[i].assign(y_new)
+                op.adjoint(y_tmp, out=dz)
+
+            z += dz
+            z_relax.lincomb(1, z_relax, theta / prob[i], dz)
+
+        z_relax += z
+
+        if callback is not None:
+            callback(x)
+
+
+if __name__ == '__main__':
+    # pylint: disable=wrong-import-position
+    from odl.util.testutils import run_doctests
+    run_doctests()
@@ -10,68 +10,168 @@
 
 # Imports for common Python 2/3 codebase
 from __future__ import print_function, division, absolute_import
+from builtins import object
 from future import standard_library
 standard_library.install_aliases()
 
 import numpy as np
+from odl.set import LinearSpaceElement
 from odl.solvers.util import ConstantLineSearch
+from odl.solvers.util.checkpoint import (
+    load_checkpoint, _restore, _restored_element)
 from odl.solvers.iterative.iterative import conjugate_gradient
 
 
 __all__ = ('newtons_method', 'bfgs_method', 'broydens_method')
 
 
-def _bfgs_direction(s, y, x, hessinv_estimate=None):
-    """Compute ``Hn^-1(x)`` for the L-BFGS method.
+class _CorrectionPairs(object):
 
-    Parameters
-    ----------
-    s : sequence of `LinearSpaceElement`
-        The ``s`` coefficients in the BFGS update, see Notes.
-    y : sequence of `LinearSpaceElement`
-        The ``y`` coefficients in the BFGS update, see Notes.
-    x : `LinearSpaceElement`
-        Point in which to evaluate the product.
-    hessinv_estimate : `Operator`, optional
-        Initial estimate of the hessian ``H0^-1``.
+    """Storage of the correction pairs ``(s, y)`` of the BFGS method.
 
-    Returns
-    -------
-    r : ``x.space`` element
-        The result of ``Hn^-1(x)``.
-
-    Notes
-    -----
-    :math:`H_n^{-1}` is defined recursively as
-
-    .. math::
-        H_{n+1}^{-1} =
-        \\left(I - \\frac{ s_n y_n^T}{y_n^T s_n} \\right)
-        H_{n}^{-1}
-        \\left(I - \\frac{ y_n s_n^T}{y_n^T s_n} \\right) +
-        \\frac{s_n s_n^T}{y_n^T \, s_n}
-
-    With :math:`H_0^{-1}` given by ``hess_estimate``.
+    The pairs are kept in a ring buffer: once ``size`` pairs are stored,
+    the buffers of the oldest pair are reused for the next one. Together
+    with the cached values of ``1 / <y, s>``, this lets `direction`
+    evaluate the L-BFGS two-loop recursion in-place without allocating
+    new elements.
     """
-    assert len(s) == len(y)
-
-    r = x.copy()
-    alphas = np.zeros(len(s))
-    rhos = np.zeros(len(s))
 
-    for i in reversed(range(len(s))):
-        rhos[i] = 1.0 / y[i].inner(s[i])
-        alphas[i] = rhos[i] * (s[i].inner(r))
-        r.lincomb(1, r, -alphas[i], y[i])
+    def __init__(self, space, size=None):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        space : `LinearSpace`
+            Space of the pairs.
+        size : positive int, optional
+            Maximum number of stored pairs. For ``None``, all pairs are
+            stored.
+        """
+        if size is not None:
+            size, size_in = int(size), size
+            if size != size_in or size <= 0:
+                raise ValueError('`num_store` must be a positive integer, '
+                                 'got {}'.format(size_in))
+        self.space = space
+        self.size = size
+        self.s = []
+        self.y = []
+        self.rho = []
+        self.y_norm2 = []
+        # Index of the oldest pair and number of stored pairs
+        self.first = 0
+        self.count = 0
+        self.alphas = np.empty(size or 0)
+        self.tmp = None
+
+    def order(self):
+        """Return the buffer indices of the stored pairs, oldest first."""
+        nbuf = len(self.s)
+        return [(self.first + k) % nbuf for k in range(self.count)]
+
+    def pending(self):
+        """Return the buffers ``(s, y)`` for the next pair.
+
+        The buffers belong to the oldest pair if the storage is full, hence
+        the next call must be `commit` or `clear`.
+        """
+        if self.count < len(self.s):
+            index = (self.first + self.count) % len(self.s)
+        elif self.size is None or self.count < self.size:
+            # Buffers are only added before the first wrap-around, hence
+            # the new buffer is the slot after the newest pair
+            self.s.append(self.space.element())
+            self.y.append(self.space.element())
+            self.rho.append(0.0)
+            self.y_norm2.append(0.0)
+            index = len(self.s) - 1
+        else:
+            index = self.first
+        return self.s[index], self.y[index]
+
+    def commit(self, y_inner_s):
+        """Store the pair last returned by `pending`."""
+        nbuf = len(self.s)
+        if self.count == nbuf:
+            # Overwrote the oldest pair
+            index = self.first
+            self.first = (self.first + 1) % nbuf
+        else:
+            index = (self.first + self.count) % nbuf
+            self.count += 1
+        self.rho[index] = 1.0 / y_inner_s
+        self.y_norm2[index] = self.y[index].inner(self.y[index])
+
+    def clear(self):
+        """Forget all pairs, keeping the buffers for reuse."""
+        self.first = 0
+        self.count = 0
+
+    def pairs(self):
+        """Return lists of the stored ``s`` and ``y``, oldest first."""
+        order = self.order()
+        return [self.s[j] for j in order], [self.y[j] for j in order]
+
+    def direction(self, x, out, hessinv_estimate=None):
+        """Compute ``Hn^-1(x)`` with the L-BFGS two-loop recursion.
+
+        Parameters
+        ----------
+        x : `LinearSpaceElement`
+            Point in which to evaluate the product.
+        out : `LinearSpaceElement`
+            Element to which the result is written. Must not be ``x``.
+        hessinv_estimate : `Operator`, ``x.space`` element or 'scaled', \
+optional
+            Initial estimate of the inverse hessian ``H0^-1``. An element
+            is used as diagonal, and ``'scaled'`` uses
+            ``<s, y> / <y, y>`` times identity for the newest pair.
+
+        Notes
+        -----
+        :math:`H_n^{-1}` is defined recursively as
+
+        .. math::
+            H_{n+1}^{-1} =
+            \\left(I - \\frac{ s_n y_n^T}{y_n^T s_n} \\right)
+            H_{n}^{-1}
+            \\left(I - \\frac{ y_n s_n^T}{y_n^T s_n} \\right) +
+            \\frac{s_n s_n^T}{y_n^T \\, s_n}
+
+        With :math:`H_0^{-1}` given by ``hessinv_estimate``.
+        """
+        order = self.order()
+        if len(self.alphas) < len(order):
+            self.alphas = np.empty(len(order))
+        alphas = self.alphas
+
+        out.assign(x)
+        for k in reversed(range(len(order))):
+            j = order[k]
+            alphas[k] = self.rho[j] * self.s[j].inner(out)
+            out.lincomb(1, out, -alphas[k], self.y[j])
+
+        if hessinv_estimate is None:
+            pass
+        elif isinstance(hessinv_estimate, str):
+            if order:
+                # <s, y> / <y, y> for the newest pair
+                j = order[-1]
+                out *= 1.0 / (self.rho[j] * self.y_norm2[j])
+        elif isinstance(hessinv_estimate, LinearSpaceElement):
+            out *= hessinv_estimate
+        else:
+            if self.tmp is None:
+                self.tmp = self.space.element()
+            hessinv_estimate(out, out=self.tmp)
+            out.assign(self.tmp)
 
-    if hessinv_estimate is not None:
-        r = hessinv_estimate(r)
+        for k in range(len(order)):
+            j = order[k]
+            beta = self.rho[j] * self.y[j].inner(out)
+            out.lincomb(1, out, alphas[k] - beta, self.s[j])
 
-    for i in range(len(s)):
-        beta = rhos[i] * (y[i].inner(r))
-        r.lincomb(1, r, alphas[i] - beta, s[i])
-
-    return r
+        return out
 
 
 def _broydens_direction(s, y, x, hessinv_estimate=None, impl='first'):
@@ -247,7 +347,8 @@ def newtons_method(f, x, line_search=1.0, maxiter=1000, tol=1e-16,
 
 
 def bfgs_method(f, x, line_search=1.0, maxiter=1000, tol=1e-15, num_store=None,
-                hessinv_estimate=None, callback=None):
+                hessinv_estimate=None, callback=None, checkpoint=None,
+                resume=None):
     """Quasi-Newton BFGS method to minimize a differentiable function.
 
     Can use either the regular BFGS method, or the limited memory BFGS method.
@@ -294,46 +395,82 @@ Goldfarb%E2%80%93Shanno_algorithm>`_
     num_store : int, optional
         Maximum number of correction factors to store. For ``None``, the method
         is the regular BFGS method. For an integer, the method becomes the
-        Limited Memory BFGS method.
-    hessinv_estimate : `Operator`, optional
+        Limited Memory BFGS method, with the correction factors kept in a
+        preallocated ring buffer, such that no new elements are allocated
+        once it is filled.
+    hessinv_estimate : `Operator`, ``f.domain`` element or 'scaled', optional
         Initial estimate of the inverse of the Hessian operator. Needs to be an
-        operator from ``f.domain`` to ``f.domain``.
+        operator from ``f.domain`` to ``f.domain``, or an element that is
+        used as its diagonal. With ``'scaled'``, the estimate is
+        ``<s, y> / <y, y>`` times the identity, computed from the newest
+        correction factors ``s`` (step) and ``y`` (gradient change), see
+        [NW2006], Section 7.2.
         Default: Identity on ``f.domain``
     callback : callable, optional
         Object executing code per iteration, e.g. plotting each iterate.
+    checkpoint : `Checkpoint`, optional
+        If given, ``x`` and the stored correction factors are saved
+        whenever it is due.
+    resume : str, optional
+        Path of a checkpoint written by ``checkpoint``. The iteration
+        continues from the saved state, overwriting ``x``, until
+        ``maxiter`` iterations have been run in total.
 
     References
     ----------
     [GNS2009] Griva, I, Nash, S G, and Sofer, A. *Linear and nonlinear
     optimization*. Siam, 2009.
+
+    [NW2006] Nocedal, J, and Wright, S. *Numerical Optimization*.
+    Springer, 2006.
     """
     grad = f.gradient
     if x not in grad.domain:
         raise TypeError('`x` {!r} is not in the domain of `grad` {!r}'
                         ''.format(x, grad.domain))
+    if (isinstance(hessinv_estimate, str) and
+            hessinv_estimate != 'scaled'):
+        raise ValueError("`hessinv_estimate` '{}' not understood"
+                         "".format(hessinv_estimate))
 
     if not callable(line_search):
         line_search = ConstantLineSearch(line_search)
 
-    ys = []
-    ss = []
+    pairs = _CorrectionPairs(x.space, num_store)
+
+    start = 0
+    if resume is not None:
+        start, state = load_checkpoint(resume)
+        _restore(x, state['x'])
+        ys = [_restored_element(x.space, yi) for yi in state['ys']]
+        ss = [_restored_element(x.space, si) for si in state['ss']]
+        for si, yi in zip(ss, ys):
+            s, y = pairs.pending()
+            s.assign(si)
+            y.assign(yi)
+            pairs.commit(y.inner(s))
 
     grad_x = grad(x)
-    for i in range(maxiter):
+    search_dir = x.space.element()
+    for i in range(start, maxiter):
         # Determine a stepsize using line search
-        search_dir = -_bfgs_direction(ss, ys, grad_x, hessinv_estimate)
+        pairs.direction(grad_x, out=search_dir,
+                        hessinv_estimate=hessinv_estimate)
+        search_dir *= -1
         dir_deriv = search_dir.inner(grad_x)
         if np.abs(dir_deriv) == 0:
             return  # we found an optimum
         step = line_search(x, direction=search_dir, dir_derivative=dir_deriv)
 
-        # Update x
-        x_update = search_dir
-        x_update *= step
+        # Update x, storing the update and the gradient difference directly
+        # in the buffers of the next correction pair
+        x_update, grad_diff = pairs.pending()
+        x_update.lincomb(step, search_dir)
         x += x_update
 
-        grad_x, grad_diff = grad(x), grad_x
         # grad_diff = grad(x) - grad(x_old)
+        grad_diff.assign(grad_x)
+        grad(x, out=grad_x)
         grad_diff.lincomb(-1, grad_diff, 1, grad_x)
 
         y_inner_s = grad_diff.inner(x_update)
@@ -344,20 +481,17 @@ Goldfarb%E2%80%93Shanno_algorithm>`_
                 return
             else:
                 # Reset if needed
-                ys = []
-                ss = []
-                continue
-
-        # Update Hessian
-        ys.append(grad_diff)
-        ss.append(x_update)
-        if num_store is not None:
-            # Throw away factors if they are too many.
-            ss = ss[-num_store:]
-            ys = ys[-num_store:]
+                pairs.clear()
+        else:
+            # Update Hessian
+            pairs.commit(y_inner_s)
 
-        if callback is not None:
-            callback(x)
+            if callback is not None:
+                callback(x)
+
+        if checkpoint is not None and checkpoint.due(i + 1):
+            ss, ys = pairs.pairs()
+            checkpoint.save(i + 1, {'x': x, 'ys': ys, 'ss': ss})
 
 
 def broydens_method(f, x, line_search=1.0, impl='first', maxiter=1000,
@@ -13,5 +13,14 @@ __all__ = ()
 from .callback import *
 __all__ += callback.__all__
 
+from .checkpoint import *
+__all__ += checkpoint.__all__
+
+from .preconditioner import *
+__all__ += preconditioner.__all__
+
 from .steplen import *
 __all__ += steplen.__all__
+
+from .stopping import *
+__all__ += stopping.__all__
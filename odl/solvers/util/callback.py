@@ -13,17 +13,23 @@ from __future__ import print_function, division, absolute_import
 from future import standard_library
 standard_library.install_aliases()
 
+import copy
+import json
+import queue
+import struct
+import threading
 import warnings
 import time
 import os
 import numpy as np
+from odl.set import LinearSpaceElement
 from odl.util import signature_string
 
 __all__ = ('CallbackStore', 'CallbackApply',
            'CallbackPrintTiming', 'CallbackPrintIteration',
            'CallbackPrint', 'CallbackPrintNorm', 'CallbackShow',
            'CallbackSaveToDisk', 'CallbackSleep', 'CallbackShowConvergence',
-           'CallbackPrintHardwareUsage')
+           'CallbackPrintHardwareUsage', 'CallbackAsync')
 
 
 class SolverCallback(object):
@@ -681,16 +687,28 @@ class CallbackSaveToDisk(SolverCallback):
                 filename = saveto.format(cur_iter_num)
 
             where ``cur_iter_num`` is the current iteration number.
+            For ``impl='npy_stack'``, it is the name of the single file
+            all iterates are saved in.
         step : positive int, optional
             Number of iterations between saves.
-        impl : {'pickle', 'numpy', 'numpy_txt'}, optional
+        impl : {'pickle', 'numpy', 'numpy_txt', 'npy_stack'}, optional
             The format to store the iterates in. Numpy formats are only usable
             if the data can be converted to an array via `numpy.asarray`.
 
+            ``'npy_stack'`` appends the iterates to a single ``.npy`` file
+            of shape ``(n_saved,) + shape``, which can be read with
+            ``numpy.load(saveto, mmap_mode='r')`` for random access to
+            single iterates. The file is started anew at the first
+            iteration. The space, the original data type and ``step`` are
+            written once to a ``.json`` file with the same base name.
+
         Other Parameters
         ----------------
         kwargs :
             Optional arguments passed to the save function.
+            For ``impl='npy_stack'``, the only option is ``dtype``, the
+            data type in which the iterates are stored, e.g., ``'float32'``
+            or ``'float16'`` to save space.
 
         Examples
         --------
@@ -708,6 +726,15 @@ class CallbackSaveToDisk(SolverCallback):
 
         >>> callback = CallbackSaveToDisk(saveto='my_path/my_iterate_{}',
         ...                               step=5, impl='numpy')
+
+        Save all iterates in single precision to one file, and read the
+        last one after the solver has finished:
+
+        >>> callback = CallbackSaveToDisk(saveto='my_path/iterates.npy',
+        ...                               impl='npy_stack', dtype='float32')
+        >>> iterates = np.load('my_path/iterates.npy',
+        ...                    mmap_mode='r')  # doctest: +SKIP
+        >>> last = iterates[-1]  # doctest: +SKIP
         """
         self.saveto = saveto
         try:
@@ -720,10 +747,24 @@ class CallbackSaveToDisk(SolverCallback):
         self.kwargs = kwargs
         self.iter = 0
 
+        if impl == 'npy_stack':
+            if set(kwargs) - set(['dtype']):
+                raise ValueError('invalid options {} for `npy_stack`'
+                                 ''.format(sorted(set(kwargs) -
+                                                  set(['dtype']))))
+            dtype = kwargs.get('dtype', None)
+            self.__stack_dtype = None if dtype is None else np.dtype(dtype)
+            self.__stack_shape = None
+
     def __call__(self, x):
         """Save the current iterate."""
         if self.iter % self.step == 0:
-            file_path = self.saveto_formatter(self.iter)
+            if self.impl == 'npy_stack':
+                file_path = self.saveto
+                if not file_path.endswith('.npy'):
+                    file_path += '.npy'
+            else:
+                file_path = self.saveto_formatter(self.iter)
             folder_path = os.path.dirname(os.path.realpath(file_path))
 
             if not os.path.exists(folder_path):
@@ -737,11 +778,49 @@ class CallbackSaveToDisk(SolverCallback):
                 np.save(file_path, np.asarray(x), **self.kwargs)
             elif self.impl == 'numpy_txt':
                 np.savetxt(file_path, np.asarray(x), **self.kwargs)
+            elif self.impl == 'npy_stack':
+                self._append_to_stack(file_path, x)
             else:
                 raise RuntimeError('unknown `impl` {}'.format(self.impl))
 
         self.iter += 1
 
+    def _append_to_stack(self, file_path, x):
+        """Append ``x`` to the ``npy_stack`` file ``file_path``."""
+        arr = np.asarray(x)
+        dtype = arr.dtype
+        if self.__stack_dtype is not None:
+            arr = arr.astype(self.__stack_dtype)
+        arr = np.ascontiguousarray(arr)
+
+        if self.iter == 0 or self.__stack_shape is None:
+            # Start a new file with an empty stack
+            with open(file_path, 'wb') as f:
+                f.write(_npy_stack_header(arr.dtype, (0,) + arr.shape))
+            meta = {'space': repr(getattr(x, 'space', None)),
+                    'shape': list(arr.shape),
+                    'dtype': dtype.str,
+                    'stored_dtype': arr.dtype.str,
+                    'step': self.step}
+            with open(os.path.splitext(file_path)[0] + '.json', 'w') as f:
+                json.dump(meta, f)
+            self.__stack_shape = arr.shape
+            self.__stack_size = 0
+        elif arr.shape != self.__stack_shape:
+            raise ValueError('iterate has shape {}, expected {}'
+                             ''.format(arr.shape, self.__stack_shape))
+
+        # The data is written before the header, so the file always holds
+        # a valid stack
+        with open(file_path, 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            f.write(arr.tobytes())
+            f.flush()
+            f.seek(0)
+            self.__stack_size += 1
+            f.write(_npy_stack_header(
+                arr.dtype, (self.__stack_size,) + self.__stack_shape))
+
     def reset(self):
         """Set `iter` to 0."""
         self.iter = 0
@@ -757,6 +836,24 @@ class CallbackSaveToDisk(SolverCallback):
         return '{}({})'.format(self.__class__.__name__, inner_str)
 
 
+# Fixed header size, such that the header can be overwritten in place
+_NPY_STACK_HEADER_BYTES = 256
+
+
+def _npy_stack_header(dtype, shape):
+    """Return a ``.npy`` version 1.0 header of fixed size."""
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': {!r}, }}"
+    header = header.format(np.lib.format.dtype_to_descr(dtype),
+                           tuple(int(n) for n in shape))
+    # Magic string, version and header length take 10 bytes
+    header_len = _NPY_STACK_HEADER_BYTES - 10
+    if len(header) + 1 > header_len:
+        raise ValueError('shape {} has too many axes'.format(shape))
+    header = header.ljust(header_len - 1) + '\n'
+    return (np.lib.format.magic(1, 0) + struct.pack('<H', header_len) +
+            header.encode('latin1'))
+
+
 class CallbackSleep(SolverCallback):
 
     """Callback for sleeping for a specific time span."""
@@ -946,6 +1043,180 @@ class CallbackPrintHardwareUsage(SolverCallback):
         return '{}({})'.format(self.__class__.__name__, inner_str)
 
 
+class CallbackAsync(SolverCallback):
+
+    """Callback running another callback in a background thread.
+
+    Each iterate is copied into a buffer, and the wrapped callback is
+    applied to the copy in a worker thread while the solver continues.
+    This takes slow callbacks like plotting or saving to disk off the
+    critical path of the solver. The buffers are reused once the wrapped
+    callback is done with them, hence it must not keep references to its
+    argument.
+
+    If more than ``max_pending`` iterates are waiting, the solver either
+    waits for the worker (``policy='block'``) or the iterate is skipped
+    (``policy='drop'``).
+
+    Exceptions raised by the wrapped callback are re-raised in the solver
+    thread on the next call or in `wait`.
+
+    Notes
+    -----
+    Many interactive ``matplotlib`` backends only work in the main thread,
+    so `CallbackShow` and `CallbackShowConvergence` should be wrapped only
+    together with a non-interactive backend.
+    """
+
+    # Seconds after which an idle worker thread exits
+    _idle_timeout = 1.0
+
+    def __init__(self, callback, max_pending=2, policy='block'):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        callback : callable
+            The callback to run in the background.
+        max_pending : positive int, optional
+            Maximum number of iterates waiting for the worker.
+        policy : {'block', 'drop'}, optional
+            What to do with an iterate if ``max_pending`` iterates are
+            already waiting.
+
+            ``'block'`` : Wait until the worker has caught up.
+
+            ``'drop'`` : Skip the iterate. The number of skipped iterates
+            is counted in `dropped`.
+
+        Examples
+        --------
+        Save iterates to disk without slowing down the solver, skipping
+        iterates if saving cannot keep up:
+
+        >>> save = odl.solvers.CallbackSaveToDisk('my_path/my_iterate_{}')
+        >>> callback = CallbackAsync(save, policy='drop')
+
+        Iterates are processed in order:
+
+        >>> results = []
+        >>> callback = CallbackAsync(CallbackStore(results))
+        >>> x = odl.rn(3).element([1, 2, 3])
+        >>> for i in range(3):
+        ...     x += 1
+        ...     callback(x)
+        >>> callback.wait()
+        >>> results
+        [rn(3).element([2.0, 3.0, 4.0]), rn(3).element([3.0, 4.0, 5.0]), \
+rn(3).element([4.0, 5.0, 6.0])]
+        """
+        if not callable(callback):
+            raise TypeError('`callback` {!r} is not callable'
+                            ''.format(callback))
+        max_pending, max_pending_in = int(max_pending), max_pending
+        if max_pending != max_pending_in or max_pending <= 0:
+            raise ValueError('`max_pending` must be a positive integer, '
+                             'got {}'.format(max_pending_in))
+        policy, policy_in = str(policy).lower(), policy
+        if policy not in ('block', 'drop'):
+            raise ValueError("`policy` '{}' not understood".format(policy_in))
+
+        self.callback = callback
+        self.max_pending = max_pending
+        self.policy = policy
+        self.dropped = 0
+
+        self.__queue = queue.Queue(maxsize=max_pending)
+        self.__free = []
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__error = None
+
+    def __call__(self, x):
+        """Hand a copy of ``x`` to the worker thread."""
+        self._raise_error()
+        if self.policy == 'drop' and self.__queue.full():
+            # Only the worker removes items, so a put would not fail later
+            self.dropped += 1
+            return
+
+        self.__queue.put(self._snapshot(x))
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self._work)
+                self.__thread.daemon = True
+                self.__thread.start()
+
+    def _snapshot(self, x):
+        """Return a copy of ``x``, reusing a free buffer if possible."""
+        if not isinstance(x, LinearSpaceElement):
+            return copy.deepcopy(x)
+
+        with self.__lock:
+            for i, buf in enumerate(self.__free):
+                if buf.space == x.space:
+                    del self.__free[i]
+                    break
+            else:
+                buf = None
+
+        if buf is None:
+            return x.copy()
+        else:
+            buf.assign(x)
+            return buf
+
+    def _work(self):
+        """Apply the callback to queued iterates until the queue is idle."""
+        while True:
+            try:
+                x = self.__queue.get(timeout=self._idle_timeout)
+            except queue.Empty:
+                with self.__lock:
+                    if self.__queue.empty():
+                        self.__thread = None
+                        return
+                continue
+
+            try:
+                if self.__error is None:
+                    self.callback(x)
+            except Exception as exc:
+                self.__error = exc
+            finally:
+                if isinstance(x, LinearSpaceElement):
+                    with self.__lock:
+                        if len(self.__free) <= self.max_pending:
+                            self.__free.append(x)
+                self.__queue.task_done()
+
+    def _raise_error(self):
+        """Re-raise an exception from the worker thread, if any."""
+        error, self.__error = self.__error, None
+        if error is not None:
+            raise error
+
+    def wait(self):
+        """Block until all pending iterates have been processed."""
+        self.__queue.join()
+        self._raise_error()
+
+    def reset(self):
+        """Wait for pending iterates and reset the wrapped callback."""
+        self.wait()
+        self.dropped = 0
+        if hasattr(self.callback, 'reset'):
+            self.callback.reset()
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        posargs = [self.callback]
+        optargs = [('max_pending', self.max_pending, 2),
+                   ('policy', self.policy, 'block')]
+        inner_str = signature_string(posargs, optargs)
+        return '{}({})'.format(self.__class__.__name__, inner_str)
+
+
 if __name__ == '__main__':
     # pylint: disable=wrong-import-position
     from odl.util.testutils import run_doctests
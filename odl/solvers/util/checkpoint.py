@@ -0,0 +1,286 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Saving and restoring the state of iterative solvers."""
+
+# Imports for common Python 2/3 codebase
+from __future__ import print_function, division, absolute_import
+from builtins import object
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+
+from odl.set import LinearSpaceElement
+from odl.util import signature_string
+
+
+__all__ = ('Checkpoint', 'load_checkpoint')
+
+
+_PREFIX = 'iter_'
+_META = 'state.json'
+
+
+class Checkpoint(object):
+
+    """Periodic saving of the full state of a solver.
+
+    Solvers that support checkpointing take an instance of this class as
+    ``checkpoint`` argument, and call `save` with their complete state
+    whenever `due` returns ``True``. The saved state can be passed as
+    ``resume`` argument to the same solver, which then continues the
+    iteration exactly where it stopped.
+
+    Each checkpoint is a directory ``iter_<n>`` inside `path`, with one
+    ``.npy`` file per array and a ``state.json`` file for the remaining
+    values. It is first written to a temporary directory and then renamed,
+    hence an interrupted save never leaves a broken checkpoint behind.
+    """
+
+    def __init__(self, path, interval=None, time_interval=None, keep=1,
+                 mmap_bytes=2 ** 26):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        path : str
+            Directory in which the checkpoints are stored. It is created
+            if it does not exist.
+        interval : positive int, optional
+            Save the state every ``interval`` iterations.
+        time_interval : positive float, optional
+            Save the state if at least ``time_interval`` seconds have passed
+            since the last save. At least one of ``interval`` and
+            ``time_interval`` must be given.
+        keep : positive int, optional
+            Number of most recent checkpoints to keep.
+        mmap_bytes : int, optional
+            Arrays with at least this many bytes are written and read
+            through memory maps, which avoids holding a second copy of
+            them in memory.
+
+        Examples
+        --------
+        Save the state of the solver every 100 iterations and resume
+        from the last saved state later on:
+
+        >>> checkpoint = odl.solvers.Checkpoint('ckpt', interval=100)
+        >>> odl.solvers.conjugate_gradient(
+        ...     op, x, rhs, niter=1000,
+        ...     checkpoint=checkpoint)  # doctest: +SKIP
+        >>> odl.solvers.conjugate_gradient(
+        ...     op, x, rhs, niter=1000, checkpoint=checkpoint,
+        ...     resume='ckpt')  # doctest: +SKIP
+        """
+        if interval is None and time_interval is None:
+            raise ValueError('need at least one of `interval` and '
+                             '`time_interval`')
+        if interval is not None:
+            interval, interval_in = int(interval), interval
+            if interval != interval_in or interval <= 0:
+                raise ValueError('`interval` must be a positive integer, '
+                                 'got {}'.format(interval_in))
+        if time_interval is not None:
+            time_interval_in = time_interval
+            time_interval = float(time_interval)
+            if time_interval <= 0:
+                raise ValueError('`time_interval` must be positive, got {}'
+                                 ''.format(time_interval_in))
+        keep, keep_in = int(keep), keep
+        if keep != keep_in or keep <= 0:
+            raise ValueError('`keep` must be a positive integer, got {}'
+                             ''.format(keep_in))
+
+        self.path = str(path)
+        self.interval = interval
+        self.time_interval = time_interval
+        self.keep = keep
+        self.mmap_bytes = int(mmap_bytes)
+        self.__last_time = time.time()
+
+    def due(self, iteration):
+        """Return ``True`` if the state after ``iteration`` should be saved.
+
+        Parameters
+        ----------
+        iteration : int
+            Number of completed iterations.
+        """
+        if self.interval is not None and iteration % self.interval == 0:
+            return True
+        return (self.time_interval is not None and
+                time.time() - self.__last_time >= self.time_interval)
+
+    def save(self, iteration, state):
+        """Write the state after ``iteration`` iterations.
+
+        Parameters
+        ----------
+        iteration : int
+            Number of completed iterations.
+        state : dict
+            The state to save. The values can be space elements, numbers,
+            strings, ``None`` and lists of these.
+        """
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp_', dir=self.path)
+        try:
+            meta = {name: self._write(tmp_dir, name, value)
+                    for name, value in state.items()}
+            with open(os.path.join(tmp_dir, _META), 'w') as f:
+                json.dump({'iteration': int(iteration), 'state': meta}, f)
+
+            final_dir = os.path.join(self.path,
+                                     '{}{:09d}'.format(_PREFIX, iteration))
+            if os.path.exists(final_dir):
+                shutil.rmtree(final_dir)
+            os.rename(tmp_dir, final_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        for old_dir in _checkpoint_dirs(self.path)[:-self.keep]:
+            shutil.rmtree(old_dir, ignore_errors=True)
+        self.__last_time = time.time()
+
+    def _write(self, directory, name, value):
+        """Write ``value`` and return its description for ``state.json``."""
+        if isinstance(value, LinearSpaceElement):
+            parts = getattr(value, 'parts', None)
+            if parts is not None:
+                return {'parts': [self._write(directory,
+                                              '{}-{}'.format(name, i), part)
+                                  for i, part in enumerate(parts)]}
+
+            arr = value.asarray()
+            filename = name + '.npy'
+            file_path = os.path.join(directory, filename)
+            if arr.nbytes >= self.mmap_bytes:
+                out = np.lib.format.open_memmap(
+                    file_path, mode='w+', dtype=arr.dtype, shape=arr.shape)
+                out[:] = arr
+                out.flush()
+                del out
+            else:
+                np.save(file_path, arr)
+            return {'file': filename}
+
+        elif isinstance(value, (list, tuple)):
+            return {'items': [self._write(directory,
+                                          '{}_{}'.format(name, i), item)
+                              for i, item in enumerate(value)]}
+
+        elif isinstance(value, np.generic):
+            return {'value': value.item()}
+
+        else:
+            return {'value': value}
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        posargs = [self.path]
+        optargs = [('interval', self.interval, None),
+                   ('time_interval', self.time_interval, None),
+                   ('keep', self.keep, 1),
+                   ('mmap_bytes', self.mmap_bytes, 2 ** 26)]
+        return '{}({})'.format(self.__class__.__name__,
+                               signature_string(posargs, optargs))
+
+
+def load_checkpoint(path, mmap_bytes=2 ** 26):
+    """Return the most recent state saved by a `Checkpoint`.
+
+    Parameters
+    ----------
+    path : str
+        Directory given as ``path`` to `Checkpoint`, or a single
+        checkpoint directory within it.
+    mmap_bytes : int, optional
+        Arrays with at least this many bytes are returned as read-only
+        memory maps.
+
+    Returns
+    -------
+    iteration : int
+        Number of iterations completed when the state was saved.
+    state : dict
+        The saved values. Space elements are returned as arrays, or lists
+        of arrays for product space elements.
+    """
+    path = str(path)
+    if not os.path.exists(os.path.join(path, _META)):
+        dirs = _checkpoint_dirs(path)
+        if not dirs:
+            raise IOError('no checkpoint found in {!r}'.format(path))
+        path = dirs[-1]
+
+    with open(os.path.join(path, _META)) as f:
+        meta = json.load(f)
+
+    state = {name: _read(path, value, mmap_bytes)
+             for name, value in meta['state'].items()}
+    return meta['iteration'], state
+
+
+def _read(directory, meta, mmap_bytes):
+    """Return the value described by ``meta``."""
+    if 'file' in meta:
+        file_path = os.path.join(directory, meta['file'])
+        if os.path.getsize(file_path) >= mmap_bytes:
+            return np.load(file_path, mmap_mode='r')
+        else:
+            return np.load(file_path)
+    elif 'parts' in meta:
+        return [_read(directory, part, mmap_bytes) for part in meta['parts']]
+    elif 'items' in meta:
+        return [_read(directory, item, mmap_bytes) for item in meta['items']]
+    else:
+        return meta['value']
+
+
+def _checkpoint_dirs(path):
+    """Return the checkpoint directories in ``path``, oldest first."""
+    if not os.path.isdir(path):
+        return []
+    names = sorted(name for name in os.listdir(path)
+                   if name.startswith(_PREFIX))
+    return [os.path.join(path, name) for name in names]
+
+
+def _restore(elem, value):
+    """Assign a value returned by `load_checkpoint` to ``elem``."""
+    parts = getattr(elem, 'parts', None)
+    if parts is not None:
+        if len(parts) != len(value):
+            raise ValueError('saved state has {} parts, expected {}'
+                             ''.format(len(value), len(parts)))
+        for part, part_value in zip(parts, value):
+            _restore(part, part_value)
+    else:
+        value = np.asarray(value)
+        if value.size != elem.size:
+            raise ValueError('saved state has size {}, expected {}'
+                             ''.format(value.size, elem.size))
+        elem[:] = value
+    return elem
+
+
+def _restored_element(space, value):
+    """Return a new element of ``space`` holding ``value``."""
+    return _restore(space.element(), value)
+
+
+if __name__ == '__main__':
+    # pylint: disable=wrong-import-position
+    from odl.util.testutils import run_doctests
+    run_doctests()
@@ -0,0 +1,220 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Preconditioners for iterative solvers of linear equations."""
+
+# Imports for common Python 2/3 codebase
+from __future__ import print_function, division, absolute_import
+from builtins import super
+import numpy as np
+
+from odl.operator import Operator, MultiplyOperator
+
+
+__all__ = ('jacobi_preconditioner', 'circulant_preconditioner')
+
+
+def jacobi_preconditioner(op, nprobes=10, rtol=1e-6):
+    """Return the inverse of the diagonal of ``op``, estimated by probing.
+
+    The diagonal of ``op`` is estimated as the mean of ``z * op(z)`` over
+    random vectors ``z`` with entries ``+1`` and ``-1``, see [BKS2007].
+    This needs only ``nprobes`` evaluations of ``op`` and is exact for
+    diagonal operators.
+
+    Parameters
+    ----------
+    op : linear `Operator`
+        Operator whose diagonal should be estimated. Its domain and range
+        must be equal.
+    nprobes : positive int, optional
+        Number of random vectors.
+    rtol : positive float, optional
+        Estimated diagonal entries smaller than ``rtol`` times the largest
+        one (in absolute value) are replaced by this value before
+        inverting.
+
+    Returns
+    -------
+    preconditioner : `MultiplyOperator`
+        Multiplication with the inverse of the estimated diagonal.
+
+    Examples
+    --------
+    The estimate is exact for diagonal operators:
+
+    >>> op = odl.MatrixOperator([[2.0, 0.0],
+    ...                          [0.0, 4.0]])
+    >>> precon = jacobi_preconditioner(op, nprobes=1)
+    >>> precon(op.domain.one())
+    rn(2).element([0.5, 0.25])
+
+    References
+    ----------
+    [BKS2007] Bekas, C, Kokiopoulou, E, and Saad, Y. *An estimator for the
+    diagonal of a matrix*. Applied Numerical Mathematics, 57 (2007),
+    pp 1214--1229.
+    """
+    if op.domain != op.range:
+        raise ValueError('domain {!r} and range {!r} of `op` are not equal'
+                         ''.format(op.domain, op.range))
+    nprobes, nprobes_in = int(nprobes), nprobes
+    if nprobes != nprobes_in or nprobes <= 0:
+        raise ValueError('`nprobes` must be a positive integer, got {}'
+                         ''.format(nprobes_in))
+
+    space = op.domain
+    diag = space.zero()
+    probe = space.element()
+    result = space.element()
+    for _ in range(nprobes):
+        probe[:] = np.random.choice([-1.0, 1.0], size=space.shape)
+        op(probe, out=result)
+        result *= probe
+        diag += result
+
+    diag_arr = np.abs(diag.asarray()) / nprobes
+    diag_arr = np.maximum(diag_arr, rtol * np.max(diag_arr))
+    return MultiplyOperator(space.element(1.0 / diag_arr), domain=space,
+                            range=space)
+
+
+def circulant_preconditioner(op, rtol=1e-6):
+    """Return the inverse of a circulant approximation of ``op``.
+
+    ``op`` is approximated by the periodic convolution with its response
+    to a point source in the center of the domain. The inverse of this
+    approximation is applied with the FFT. This is a good preconditioner
+    for (almost) shift-invariant operators like blurring or the normal
+    operator ``A^* A`` of many tomography problems.
+
+    The Fourier coefficients of the approximation are replaced by their
+    absolute values, hence the preconditioner is symmetric and positive
+    definite, as required by `conjugate_gradient`, also if the point
+    response is not symmetric or has negative Fourier coefficients.
+
+    Parameters
+    ----------
+    op : linear `Operator`
+        Operator to approximate. Its domain and range must be equal, and
+        its elements must be convertible to arrays of shape
+        ``op.domain.shape``.
+    rtol : positive float, optional
+        Absolute values of the Fourier coefficients smaller than ``rtol``
+        times the largest one are replaced by this value before
+        inverting.
+
+    Returns
+    -------
+    preconditioner : `Operator`
+        Linear operator applying the inverse of the approximation.
+
+    Examples
+    --------
+    For a periodic convolution, the preconditioner is the exact inverse:
+
+    >>> mat = [[4.0, 1.0, 0.0, 1.0],
+    ...        [1.0, 4.0, 1.0, 0.0],
+    ...        [0.0, 1.0, 4.0, 1.0],
+    ...        [1.0, 0.0, 1.0, 4.0]]
+    >>> op = odl.MatrixOperator(mat)
+    >>> precon = circulant_preconditioner(op)
+    >>> precon(op([1, 2, 3, 4]))
+    rn(4).element([1.0, 2.0, 3.0, 4.0])
+    """
+    if op.domain != op.range:
+        raise ValueError('domain {!r} and range {!r} of `op` are not equal'
+                         ''.format(op.domain, op.range))
+
+    space = op.domain
+    shape = space.shape
+    center = tuple(n // 2 for n in shape)
+    point = np.zeros(shape, dtype=space.dtype)
+    point[center] = 1
+    response = np.asarray(op(point))
+    response = np.roll(response, [-c for c in center],
+                       axis=tuple(range(len(shape))))
+
+    abs_eig = np.abs(np.fft.fftn(response))
+    abs_eig = np.maximum(abs_eig, rtol * np.max(abs_eig))
+    return _FourierMultiplier(space, 1.0 / abs_eig)
+
+
+class _FourierMultiplier(Operator):
+
+    """Multiplication with fixed values in the discrete Fourier domain."""
+
+    def __init__(self, space, multiplier):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        space : `LinearSpace`
+            Domain and range of the operator.
+        multiplier : `array-like`
+            Values multiplied with the (unnormalized) FFT of the input.
+        """
+        super().__init__(space, space, linear=True)
+        self.multiplier = np.asarray(multiplier)
+
+    def _call(self, x, out):
+        """Implement ``self(x, out)``."""
+        result = np.fft.ifftn(np.fft.fftn(x.asarray()) * self.multiplier)
+        if np.dtype(self.range.dtype).kind != 'c':
+            result = result.real
+        out[:] = result
+
+    @property
+    def adjoint(self):
+        """Adjoint of this operator, multiplying with the conjugate."""
+        return _FourierMultiplier(self.domain, self.multiplier.conj())
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        return '{}({!r}, <multiplier>)'.format(self.__class__.__name__,
+                                               self.domain)
+
+
+def _preconditioner(preconditioner, op):
+    """Return the preconditioner given as argument to a solver.
+
+    Parameters
+    ----------
+    preconditioner : `Operator`, {'jacobi', 'circulant'} or None
+        A user-supplied operator, or how to build one from ``op``.
+    op : linear `Operator`
+        Operator of the system that should be preconditioned.
+
+    Returns
+    -------
+    preconditioner : `Operator` or None
+    """
+    if preconditioner is None:
+        return None
+    elif isinstance(preconditioner, Operator):
+        if (preconditioner.domain != op.domain or
+                preconditioner.range != op.domain):
+            raise ValueError('`preconditioner` {!r} does not map the domain '
+                             '{!r} to itself'
+                             ''.format(preconditioner, op.domain))
+        return preconditioner
+
+    preconditioner, precon_in = str(preconditioner).lower(), preconditioner
+    if preconditioner == 'jacobi':
+        return jacobi_preconditioner(op)
+    elif preconditioner == 'circulant':
+        return circulant_preconditioner(op)
+    else:
+        raise ValueError("`preconditioner` '{}' not understood"
+                         "".format(precon_in))
+
+
+if __name__ == '__main__':
+    # pylint: disable=wrong-import-position
+    from odl.util.testutils import run_doctests
+    run_doctests()
@@ -0,0 +1,109 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Stopping criteria for iterative solvers."""
+
+# Imports for common Python 2/3 codebase
+from __future__ import print_function, division, absolute_import
+from collections import namedtuple
+
+import numpy as np
+
+
+__all__ = ('ConvergenceInfo',)
+
+
+ConvergenceInfo = namedtuple('ConvergenceInfo', ['niter', 'reason'])
+ConvergenceInfo.__doc__ = """Result of a solver run with a stopping criterion.
+
+niter : int
+    Number of iterations that were run.
+reason : {'niter', 'residual', 'normal_residual', 'gap'}
+    Why the iteration stopped. ``'niter'`` means that the maximum number
+    of iterations was reached, ``'residual'`` that the relative change of
+    the iterates (or the relative residual of the equation),
+    ``'normal_residual'`` that the relative residual of the normal
+    equations and ``'gap'`` that the relative duality gap dropped below
+    the tolerance.
+"""
+
+
+def _stopping_params(kwargs, gap=True):
+    """Pop and check the ``tol`` and ``gap_interval`` keyword arguments.
+
+    Parameters
+    ----------
+    kwargs : dict
+        Keyword arguments of a solver, modified in-place.
+    gap : bool, optional
+        If ``False``, the solver has no duality gap and ``gap_interval`` is
+        not accepted.
+
+    Returns
+    -------
+    tol : float or None
+    gap_interval : int or None
+    """
+    tol = kwargs.pop('tol', None)
+    if tol is not None:
+        tol, tol_in = float(tol), tol
+        if tol < 0:
+            raise ValueError('`tol` must be non-negative, got {}'
+                             ''.format(tol_in))
+
+    if not gap:
+        return tol, None
+
+    gap_interval = kwargs.pop('gap_interval', None)
+    if gap_interval is not None:
+        gap_interval, gap_interval_in = int(gap_interval), gap_interval
+        if gap_interval != gap_interval_in or gap_interval <= 0:
+            raise ValueError('`gap_interval` must be a positive integer, '
+                             'got {}'.format(gap_interval_in))
+        if tol is None:
+            raise ValueError('`gap_interval` given without `tol`')
+    return tol, gap_interval
+
+
+def _residual_small(tol, changes, norms):
+    """Return ``True`` if the relative change of the iterates is small.
+
+    Parameters
+    ----------
+    tol : float
+        Tolerance for the relative change.
+    changes : sequence of float
+        Norms of the differences between the current and the previous
+        iterates, e.g., of primal and dual variable.
+    norms : sequence of float
+        Norms of the current iterates.
+    """
+    change = np.sqrt(sum(c ** 2 for c in changes))
+    return change <= tol * np.sqrt(sum(n ** 2 for n in norms))
+
+
+def _gap_small(tol, primal, dual):
+    """Return ``True`` if the relative duality gap is small.
+
+    Parameters
+    ----------
+    tol : float
+        Tolerance for the relative duality gap.
+    primal, dual : float
+        Values of the primal and the dual objective.
+    """
+    gap = primal - dual
+    if not np.isfinite(gap):
+        return False
+    return gap <= tol * max(abs(primal), abs(dual))
+
+
+if __name__ == '__main__':
+    # pylint: disable=wrong-import-position
+    from odl.util.testutils import run_doctests
+    run_doctests()
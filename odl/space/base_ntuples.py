@@ -85,7 +85,8 @@ class NtuplesBase(Set):
         >>> long_3.element() in odl.ntuples(3, dtype='float64')
         False
         """
-        return getattr(other, 'space', None) == self
+        space = getattr(other, 'space', None)
+        return space is self or space == self
 
     def __eq__(self, other):
         """Return ``self == other``.
@@ -173,7 +174,8 @@ class NtuplesBaseVector(object):
         """Return an identical (deep) copy of this vector."""
         raise NotImplementedError('abstract method')
 
-    def asarray(self, start=None, stop=None, step=None, out=None):
+    def asarray(self, start=None, stop=None, step=None, out=None,
+                copy=False):
         """Return the data of this vector as a numpy array.
 
         Parameters
@@ -189,6 +191,11 @@ class NtuplesBaseVector(object):
             ``None`` is equivalent to 1.
         out : `numpy.ndarray`, optional
             Array to write the result to.
+        copy : bool, optional
+            If ``True``, always return a new array. Otherwise, the
+            returned array is a view into the data of this element
+            whenever the storage allows it, i.e., changes to it also
+            change this element.
 
         Returns
         -------
@@ -29,7 +29,7 @@ from odl.space.weighting import (
     Weighting, MatrixWeighting, ArrayWeighting,
     ConstWeighting, NoWeighting,
     CustomInner, CustomNorm, CustomDist)
-from odl.util import dtype_repr, is_real_dtype
+from odl.util import dtype_repr, is_real_dtype, real_dtype
 from odl.util.ufuncs import NumpyNtuplesUfuncs
 
 
@@ -44,6 +44,9 @@ _BLAS_DTYPES = (np.dtype('float32'), np.dtype('float64'),
 THRESHOLD_SMALL = 100
 THRESHOLD_MEDIUM = 50000
 
+# Number of entries processed at a time by the chunked reduction kernels
+CHUNK_SIZE = 2 ** 14
+
 
 class NumpyNtuples(NtuplesBase):
 
@@ -192,7 +195,8 @@ class NumpyNtuplesVector(NtuplesBaseVector):
         """Raw Numpy array representing the data."""
         return self.__data
 
-    def asarray(self, start=None, stop=None, step=None, out=None):
+    def asarray(self, start=None, stop=None, step=None, out=None,
+                copy=False):
         """Extract the data of this array as a numpy array.
 
         Parameters
@@ -207,6 +211,11 @@ class NumpyNtuplesVector(NtuplesBaseVector):
         out : `numpy.ndarray`, optional
             Array to which the result should be written.
             Has to be contiguous and of the correct data type.
+        copy : bool, optional
+            If ``True``, always return a new array. Otherwise, the
+            returned array is a view into the data of this element
+            whenever the storage allows it, i.e., changes to it also
+            change this element.
 
         Returns
         -------
@@ -230,9 +239,22 @@ class NumpyNtuplesVector(NtuplesBaseVector):
         array([ 1.,  2.,  3.])
         >>> result is out
         True
+
+        By default, the result is a view, use ``copy=True`` to get an
+        independent array:
+
+        >>> vec.asarray()[0] = 0
+        >>> vec
+        ntuples(3, 'float').element([0.0, 2.0, 3.0])
+        >>> vec.asarray(copy=True)[0] = 1
+        >>> vec
+        ntuples(3, 'float').element([0.0, 2.0, 3.0])
         """
         if out is None:
-            return self.data[start:stop:step]
+            if copy:
+                return self.data[start:stop:step].copy()
+            else:
+                return self.data[start:stop:step]
         else:
             out[:] = self.data[start:stop:step]
             return out
@@ -1032,7 +1054,12 @@ class NumpyFn(FnBase, NumpyNtuples):
 
     def __hash__(self):
         """Return ``hash(self)``."""
-        return NumpyNtuples.__hash__(self) ^ hash(self.weighting)
+        # Cached since hashing the weighting can be expensive
+        try:
+            return self.__hash
+        except AttributeError:
+            self.__hash = NumpyNtuples.__hash__(self) ^ hash(self.weighting)
+            return self.__hash
 
     def __repr__(self):
         """Return ``repr(self)``."""
@@ -1412,18 +1439,97 @@ def _pnorm_default(x, p):
     return np.linalg.norm(x.data, ord=p)
 
 
+def _chunk_slices(size):
+    """Yield slices that partition ``range(size)`` into chunks."""
+    for start in range(0, size, CHUNK_SIZE):
+        yield slice(start, min(start + CHUNK_SIZE, size))
+
+
+def _abs_chunks(x1, x2=None):
+    """Yield ``|x1|`` or ``|x1 - x2|`` chunk by chunk.
+
+    The chunks are written to the same small buffer, i.e., each yielded
+    array is only valid until the next one is requested. The yielded
+    values are ``(slc, abs_chunk)``, where ``slc`` is the slice of the
+    full arrays the chunk corresponds to.
+    """
+    arr1 = x1.data
+    arr2 = None if x2 is None else x2.data
+    buf_size = min(x1.size, CHUNK_SIZE)
+    abs_buf = np.empty(buf_size,
+                       dtype=real_dtype(x1.dtype, default=np.float64))
+    if arr2 is not None and abs_buf.dtype != x1.dtype:
+        diff_buf = np.empty(buf_size, dtype=x1.dtype)
+    else:
+        diff_buf = abs_buf
+
+    for slc in _chunk_slices(x1.size):
+        n = slc.stop - slc.start
+        abs_chunk = abs_buf[:n]
+        if arr2 is None:
+            np.abs(arr1[slc], out=abs_chunk)
+        else:
+            diff_chunk = diff_buf[:n]
+            np.subtract(arr1[slc], arr2[slc], out=diff_chunk)
+            np.abs(diff_chunk, out=abs_chunk)
+        yield slc, abs_chunk
+
+
+def _pnorm_diagweight_chunks(abs_chunks, p, w):
+    """Reduce chunks of absolute values to a diagonally weighted p-norm."""
+    if p == float('inf'):
+        norm = 0.0
+        for slc, abs_chunk in abs_chunks:
+            abs_chunk *= w[slc]
+            norm = max(norm, float(np.max(abs_chunk)))
+        return norm
+
+    norm_p = 0.0
+    for slc, abs_chunk in abs_chunks:
+        if p == 2.0:
+            np.multiply(abs_chunk, abs_chunk, out=abs_chunk)
+        elif p != 1.0:
+            np.power(abs_chunk, p, out=abs_chunk)
+        norm_p += float(np.dot(abs_chunk, w[slc]))
+
+    if p == 1.0:
+        return norm_p
+    elif p == 2.0:
+        return np.sqrt(norm_p)
+    else:
+        return norm_p ** (1 / p)
+
+
 def _pnorm_diagweight(x, p, w):
     """Diagonally weighted p-norm implementation."""
-    # This is faster than first applying the weights and then summing with
-    # BLAS dot or nrm2
-    xp = np.abs(x.data)
-    if np.isfinite(p):
-        xp = np.power(xp, p, out=xp)
-        xp *= w  # w is a plain NumPy array
-        return np.sum(xp) ** (1 / p)
+    # Process the data in chunks to avoid full-size temporaries
+    return _pnorm_diagweight_chunks(_abs_chunks(x), p, np.asarray(w))
+
+
+def _pdist_diagweight(x1, x2, p, w):
+    """Diagonally weighted p-distance implementation."""
+    return _pnorm_diagweight_chunks(_abs_chunks(x1, x2), p, np.asarray(w))
+
+
+def _inner_diagweight(x1, x2, w):
+    """Diagonally weighted inner product ``<w * x1, x2>`` implementation."""
+    arr1, arr2, w = x1.data, x2.data, np.asarray(w)
+    if is_real_dtype(x1.dtype):
+        conj_buf = None
     else:
-        xp *= w
-        return np.max(xp)
+        conj_buf = np.empty(min(x2.size, CHUNK_SIZE), dtype=x2.dtype)
+
+    # The three-operand einsum sums the products without temporaries
+    inner = 0
+    for slc in _chunk_slices(x1.size):
+        if conj_buf is None:
+            arr2_chunk = arr2[slc]
+        else:
+            arr2_chunk = np.conj(arr2[slc],
+                                 out=conj_buf[:slc.stop - slc.start])
+        inner += np.einsum('i,i,i->', arr1[slc], w[slc], arr2_chunk)
+
+    return inner
 
 
 def _inner_default(x1, x2):
@@ -1699,7 +1805,7 @@ class NumpyFnArrayWeighting(ArrayWeighting):
                                       'exponent != 2 (got {})'
                                       ''.format(self.exponent))
         else:
-            inner = _inner_default(x1 * self.array, x2)
+            inner = _inner_diagweight(x1, x2, self.array)
             if is_real_dtype(x1.dtype):
                 return float(inner)
             else:
@@ -1718,13 +1824,26 @@ class NumpyFnArrayWeighting(ArrayWeighting):
         norm : float
             The norm of the provided vector
         """
-        if self.exponent == 2.0:
-            norm_squared = self.inner(x, x).real  # TODO: optimize?!
-            if norm_squared < 0:
-                norm_squared = 0.0  # Compensate for numerical error
-            return np.sqrt(norm_squared)
+        return float(_pnorm_diagweight(x, self.exponent, self.array))
+
+    def dist(self, x1, x2):
+        """Calculate the array-weighted distance between two vectors.
+
+        Parameters
+        ----------
+        x1, x2 : `NumpyFnVector`
+            Vectors whose mutual distance is calculated
+
+        Returns
+        -------
+        dist : float
+            The distance between the vectors
+        """
+        if self.dist_using_inner:
+            return super().dist(x1, x2)
         else:
-            return float(_pnorm_diagweight(x, self.exponent, self.array))
+            return float(_pdist_diagweight(x1, x2, self.exponent,
+                                           self.array))
 
 
 class NumpyFnConstWeighting(ConstWeighting):
@@ -144,6 +144,18 @@ class ProductSpace(LinearSpace):
 
             Cannot be combined with: ``dist``
 
+        contiguous : bool, optional
+            If ``True``, store the parts of each element as views into
+            a single contiguous array of shape ``(size, n)``, where
+            ``n`` is the size of the factor. This enables vectorized
+            implementations of linear combination, inner product and
+            norm, and makes `ProductSpaceElement.asarray` a view.
+
+            This option can only be used for nonempty power spaces of
+            spaces whose elements are stored in Numpy arrays.
+
+            Default: ``False``.
+
         Examples
         --------
         Product of two rn spaces
@@ -154,6 +166,15 @@ class ProductSpace(LinearSpace):
 
         >>> r2x2x2 = ProductSpace(odl.rn(2), 3)
 
+        Powerspace with parts stored in one contiguous array
+
+        >>> r2x2x2 = ProductSpace(odl.rn(2), 3, contiguous=True)
+        >>> x = r2x2x2.element([[1, 2], [3, 4], [5, 6]])
+        >>> x.asarray()
+        array([[ 1.,  2.],
+               [ 3.,  4.],
+               [ 5.,  6.]])
+
         Notes
         -----
         Inner product, norm and distance are evaluated by collecting
@@ -220,6 +241,7 @@ class ProductSpace(LinearSpace):
         weighting = kwargs.pop('weighting', None)
         exponent = float(kwargs.pop('exponent', 2.0))
         dist_using_inner = bool(kwargs.pop('dist_using_inner', False))
+        contiguous = bool(kwargs.pop('contiguous', False))
         if kwargs:
             raise TypeError('got unexpected keyword arguments: {}'
                             ''.format(kwargs))
@@ -262,6 +284,16 @@ class ProductSpace(LinearSpace):
         self.__is_power_space = all(spc == self.spaces[0]
                                     for spc in self.spaces[1:])
 
+        if contiguous and not (self.size > 0 and
+                               self.is_power_space and
+                               getattr(self.spaces[0], 'impl', None) ==
+                               'numpy' and
+                               hasattr(self.spaces[0], 'dtype')):
+            raise ValueError('`contiguous=True` requires a nonempty power '
+                             'space of Numpy-based spaces, got {!r}'
+                             ''.format(self.spaces))
+        self.__is_contiguous = contiguous
+
         super().__init__(field)
 
         # Assign weighting
@@ -321,6 +353,11 @@ class ProductSpace(LinearSpace):
         """``True`` if all member spaces are equal."""
         return self.__is_power_space
 
+    @property
+    def is_contiguous(self):
+        """``True`` if elements store their parts in a single array."""
+        return self.__is_contiguous
+
     @property
     def exponent(self):
         """Exponent of the product space norm/dist, ``None`` for custom."""
@@ -367,6 +404,10 @@ class ProductSpace(LinearSpace):
             Otherwise, a new element is created from the
             components by calling the ``element()`` methods
             in the component spaces.
+
+            For spaces with `is_contiguous` equal to ``True``, the
+            parts of the new element are copied into a contiguous array,
+            i.e., they never share memory with ``inp``.
         cast : bool, optional
             If ``True``, casting is allowed. Otherwise, a ``TypeError``
             is raised for input that is not a sequence of elements of
@@ -401,6 +442,8 @@ class ProductSpace(LinearSpace):
 
         # If data is given as keyword arg, prefer it over arg list
         if inp is None:
+            if self.is_contiguous:
+                return self._contiguous_element()
             inp = [space.element() for space in self.spaces]
 
         if inp in self:
@@ -421,7 +464,30 @@ class ProductSpace(LinearSpace):
             raise TypeError('input {!r} not a sequence of elements of the '
                             'component spaces'.format(inp))
 
-        return self.element_type(self, parts)
+        if self.is_contiguous:
+            return self._contiguous_element(parts)
+        else:
+            return self.element_type(self, parts)
+
+    def _contiguous_element(self, parts=None, alloc=np.empty):
+        """Return a new element whose parts are views into one array.
+
+        Parameters
+        ----------
+        parts : sequence of `LinearSpaceElement`, optional
+            Elements of the factors whose values are copied into the
+            parts of the new element.
+        alloc : callable, optional
+            Function used to allocate the storage array, called as
+            ``alloc(shape, dtype=dtype)``.
+        """
+        base = self.spaces[0]
+        data = alloc((self.size, base.size), dtype=base.dtype)
+        new_parts = [base.element(data[i]) for i in range(self.size)]
+        if parts is not None:
+            for new_part, part in zip(new_parts, parts):
+                new_part.assign(part)
+        return self.element_type(self, new_parts, data=data)
 
     @property
     def examples(self):
@@ -457,6 +523,8 @@ class ProductSpace(LinearSpace):
         >>> zero_3 == zero_2x3[1]
         True
         """
+        if self.is_contiguous:
+            return self._contiguous_element(alloc=np.zeros)
         return self.element([space.zero() for space in self.spaces])
 
     def one(self):
@@ -485,14 +553,40 @@ class ProductSpace(LinearSpace):
         >>> one_3 == one_2x3[1]
         True
         """
+        if self.is_contiguous:
+            return self._contiguous_element(alloc=np.ones)
         return self.element([space.one() for space in self.spaces])
 
     def _lincomb(self, a, x, b, y, out):
         """Linear combination ``out = a*x + b*y``."""
+        if _all_contiguous(x, y, out):
+            # Wrap the contiguous arrays as flat vectors, preserving
+            # aliasing, and do the linear combination in one call
+            flat_space = self._flat_space()
+            flat = {}
+            for v in (x, y, out):
+                if id(v) not in flat:
+                    flat[id(v)] = flat_space.element_type(
+                        flat_space, v.data.reshape(-1))
+            flat_space._lincomb(a, flat[id(x)], b, flat[id(y)],
+                                flat[id(out)])
+            return
+
         for space, xp, yp, outp in zip(self.spaces, x.parts, y.parts,
                                        out.parts):
             space._lincomb(a, xp, b, yp, outp)
 
+    def _flat_space(self):
+        """Return an unweighted `NumpyFn` matching the contiguous data."""
+        try:
+            return self.__flat_space
+        except AttributeError:
+            from odl.space.npy_ntuples import NumpyFn
+            base = self.spaces[0]
+            self.__flat_space = NumpyFn(self.size * base.size,
+                                        dtype=base.dtype)
+            return self.__flat_space
+
     def _dist(self, x1, x2):
         """Distance between two elements."""
         return self.weighting.dist(x1, x2)
@@ -507,12 +601,20 @@ class ProductSpace(LinearSpace):
 
     def _multiply(self, x1, x2, out):
         """Product ``out = x1 * x2``."""
+        if _all_contiguous(x1, x2, out):
+            np.multiply(x1.data, x2.data, out=out.data)
+            return
+
         for spc, xp, yp, outp in zip(self.spaces, x1.parts, x2.parts,
                                      out.parts):
             spc._multiply(xp, yp, outp)
 
     def _divide(self, x1, x2, out):
         """Quotient ``out = x1 / x2``."""
+        if _all_contiguous(x1, x2, out):
+            np.divide(x1.data, x2.data, out=out.data)
+            return
+
         for spc, xp, yp, outp in zip(self.spaces, x1.parts, x2.parts,
                                      out.parts):
             spc._divide(xp, yp, outp)
@@ -554,7 +656,12 @@ class ProductSpace(LinearSpace):
 
     def __hash__(self):
         """Return ``hash(self)``."""
-        return hash((type(self), self.spaces, self.weighting))
+        # Cached since hashing all factor spaces can be expensive
+        try:
+            return self.__hash
+        except AttributeError:
+            self.__hash = hash((type(self), self.spaces, self.weighting))
+            return self.__hash
 
     def __getitem__(self, indices):
         """Return ``self[indices]``."""
@@ -585,7 +692,7 @@ class ProductSpace(LinearSpace):
             oneline = True
         elif self.is_power_space:
             posargs = [self.spaces[0], self.size]
-            optargs = []
+            optargs = [('contiguous', self.is_contiguous, False)]
             oneline = True
         else:
             posargs = self.spaces
@@ -616,16 +723,103 @@ class ProductSpaceElement(LinearSpaceElement):
 
     """Elements of a `ProductSpace`."""
 
-    def __init__(self, space, parts):
-        """Initialize a new instance."""
+    def __init__(self, space, parts, data=None):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        space : `ProductSpace`
+            Space to which this element belongs.
+        parts : sequence of `LinearSpaceElement`
+            Elements of the factors of ``space``.
+        data : `numpy.ndarray`, optional
+            Array of shape ``(len(parts), n)`` whose rows are the
+            storage of ``parts``. Only to be used if the parts are
+            views into this array.
+        """
         super().__init__(space)
         self.__parts = tuple(parts)
+        self.__data = data
 
     @property
     def parts(self):
         """Parts of this product space element."""
         return self.__parts
 
+    @property
+    def data(self):
+        """Contiguous array holding all parts, or ``None``.
+
+        If not ``None``, this is an array of shape ``(size, n)``, where
+        row ``i`` holds the flat data of ``self[i]``.
+        """
+        return self.__data
+
+    def asarray(self, out=None, copy=False):
+        """Return the parts of this element stacked into one array.
+
+        For elements of a `ProductSpace` with `ProductSpace.is_contiguous`
+        equal to ``True``, the returned array is a view into the data
+        of this element. Otherwise, a new array is created.
+
+        Parameters
+        ----------
+        out : `numpy.ndarray`, optional
+            Array to which the result should be written. It must have
+            shape ``(size,) + self[0].shape``.
+        copy : bool, optional
+            If ``True``, always return a new array. Otherwise, a view is
+            returned for contiguous storage.
+
+        Returns
+        -------
+        asarray : `numpy.ndarray`
+            Array whose ``i``-th entry is ``self[i].asarray()``.
+
+        Examples
+        --------
+        >>> pspace = odl.ProductSpace(odl.rn(3), 2)
+        >>> x = pspace.element([[1, 2, 3], [4, 5, 6]])
+        >>> x.asarray()
+        array([[ 1.,  2.,  3.],
+               [ 4.,  5.,  6.]])
+
+        With contiguous storage, the result is a view:
+
+        >>> pspace = odl.ProductSpace(odl.rn(3), 2, contiguous=True)
+        >>> x = pspace.element([[1, 2, 3], [4, 5, 6]])
+        >>> arr = x.asarray()
+        >>> arr[1, 0] = 0
+        >>> x
+        ProductSpace(rn(3), 2, contiguous=True).element([
+            [1.0, 2.0, 3.0],
+            [0.0, 5.0, 6.0]
+        ])
+        """
+        if self.data is not None:
+            base = self.space[0]
+            shape = base.shape
+            if getattr(base, 'order', 'C') == 'F' and len(shape) > 1:
+                # Rows are stored in Fortran order, hence reversed axes
+                ndim = len(shape)
+                arr = self.data.reshape((self.size,) + shape[::-1])
+                arr = arr.transpose((0,) + tuple(range(ndim, 0, -1)))
+            else:
+                arr = self.data.reshape((self.size,) + shape)
+
+            if out is None:
+                return arr.copy() if copy else arr
+            else:
+                out[:] = arr
+                return out
+
+        if out is None:
+            first = self.parts[0].asarray()
+            out = np.empty((self.size,) + first.shape, dtype=first.dtype)
+        for i, part in enumerate(self.parts):
+            out[i] = part.asarray()
+        return out
+
     @property
     def size(self):
         """Number of factors of this element's space."""
@@ -1072,10 +1266,7 @@ class ProductSpaceArrayWeighting(ArrayWeighting):
                                       'exponent != 2 (got {})'
                                       ''.format(self.exponent))
 
-        inners = np.fromiter(
-            (x1i.inner(x2i) for x1i, x2i in zip(x1, x2)),
-            dtype=x1[0].space.dtype, count=len(x1))
-
+        inners = _inner_parts(x1, x2)
         inner = np.dot(inners, self.array)
         if is_real_dtype(x1[0].dtype):
             return float(inner)
@@ -1099,8 +1290,7 @@ class ProductSpaceArrayWeighting(ArrayWeighting):
             norm_squared = self.inner(x, x).real  # TODO: optimize?!
             return np.sqrt(norm_squared)
         else:
-            norms = np.fromiter(
-                (xi.norm() for xi in x), dtype=np.float64, count=len(x))
+            norms = _norm_parts(x)
             if self.exponent in (1.0, float('inf')):
                 norms *= self.array
             else:
@@ -1190,10 +1380,7 @@ class ProductSpaceConstWeighting(ConstWeighting):
                                       'exponent != 2 (got {})'
                                       ''.format(self.exponent))
 
-        inners = np.fromiter(
-            (x1i.inner(x2i) for x1i, x2i in zip(x1, x2)),
-            dtype=x1[0].space.dtype, count=len(x1))
-
+        inners = _inner_parts(x1, x2)
         inner = self.const * np.sum(inners)
         return x1.space.field.element(inner)
 
@@ -1214,8 +1401,7 @@ class ProductSpaceConstWeighting(ConstWeighting):
             norm_squared = self.inner(x, x).real  # TODO: optimize?!
             return np.sqrt(norm_squared)
         else:
-            norms = np.fromiter(
-                (xi.norm() for xi in x), dtype=np.float64, count=len(x))
+            norms = _norm_parts(x)
 
             if self.exponent in (1.0, float('inf')):
                 return (self.const *
@@ -1407,6 +1593,65 @@ class ProductSpaceCustomDist(CustomDist):
         super().__init__(dist, impl='numpy')
 
 
+def _all_contiguous(*elements):
+    """Return ``True`` if all elements store their parts contiguously."""
+    return all(x.data is not None for x in elements)
+
+
+def _const_weighting_params(space):
+    """Return ``(const, exponent)`` of a constant-weighted factor space.
+
+    ``None`` is returned if the inner product and norm of ``space`` are
+    not given by a constant weighting on the flat data.
+    """
+    weighting = getattr(space, 'weighting', None)
+    if (not isinstance(weighting, ConstWeighting) or
+            not getattr(space, 'is_uniformly_weighted', True)):
+        return None
+    else:
+        return weighting.const, weighting.exponent
+
+
+def _inner_parts(x1, x2):
+    """Return the array of inner products of the parts of two elements."""
+    params = _const_weighting_params(x1.space[0]) if x1.size else None
+    if (params is not None and params[1] == 2.0 and
+            _all_contiguous(x1, x2)):
+        const = params[0]
+        if is_real_dtype(x1.data.dtype):
+            inners = np.einsum('ij,ij->i', x1.data, x2.data)
+        else:
+            inners = np.einsum('ij,ij->i', x1.data, x2.data.conj())
+        inners *= const
+        return inners
+    else:
+        return np.fromiter(
+            (x1i.inner(x2i) for x1i, x2i in zip(x1, x2)),
+            dtype=x1[0].space.dtype, count=len(x1))
+
+
+def _norm_parts(x):
+    """Return the array of norms of the parts of an element."""
+    params = _const_weighting_params(x.space[0]) if x.size else None
+    if params is not None and _all_contiguous(x):
+        const, exponent = params
+        if exponent == 2.0:
+            if is_real_dtype(x.data.dtype):
+                norms = np.einsum('ij,ij->i', x.data, x.data)
+            else:
+                norms = np.einsum('ij,ij->i', x.data, x.data.conj()).real
+            norms = np.sqrt(norms * const)
+        elif exponent == float('inf'):
+            norms = np.max(np.abs(x.data), axis=1) * const
+        else:
+            norms = np.linalg.norm(x.data, ord=exponent, axis=1)
+            norms *= const ** (1 / exponent)
+        return norms.astype(np.float64, copy=False)
+    else:
+        return np.fromiter(
+            (xi.norm() for xi in x), dtype=np.float64, count=len(x))
+
+
 def _strip_space(x):
     """Strip the SPACE.element( ... ) part from a repr."""
     r = repr(x)
@@ -346,8 +346,9 @@ def test_equals_space(exponent, fn_impl):
     x2 = odl.uniform_discr(0, 1, 3, exponent=exponent, impl=fn_impl)
     y = odl.uniform_discr(0, 1, 4, exponent=exponent, impl=fn_impl)
 
+    # Equal parameters give the canonical instance
     assert x1 is x1
-    assert x1 is not x2
+    assert x1 is x2
     assert x1 is not y
     assert x1 == x1
     assert x1 == x2
@@ -355,6 +356,14 @@ def test_equals_space(exponent, fn_impl):
     assert hash(x1) == hash(x2)
     assert hash(x1) != hash(y)
 
+    # Spaces differing only in properties not checked by equality are
+    # not merged
+    z = odl.uniform_discr(0, 1, 3, exponent=exponent, impl=fn_impl,
+                          axis_labels=['t'])
+    assert z == x1
+    assert z is not x1
+    assert z.axis_labels == ('t',)
+
 
 def test_equals_vec(exponent, fn_impl):
     discr = odl.uniform_discr(0, 1, 3, exponent=exponent, impl=fn_impl)
@@ -692,6 +701,24 @@ def test_asarray_2d():
         elem_C.asarray(out=out_C_wrong)
 
 
+def test_asarray_copy():
+    """Check that asarray returns views unless a copy is requested."""
+    for order in ('C', 'F'):
+        discr = odl.uniform_discr([0, 0], [1, 1], (2, 3), order=order)
+        elem = discr.element([[1, 2, 3],
+                              [4, 5, 6]])
+
+        arr = elem.asarray()
+        assert np.shares_memory(arr, elem.ntuple.data)
+        arr[0, 1] = 0
+        assert elem.asarray()[0, 1] == 0
+
+        arr = elem.asarray(copy=True)
+        assert not np.shares_memory(arr, elem.ntuple.data)
+        assert all_equal(arr, elem.asarray())
+        assert arr.flags[order + '_CONTIGUOUS']
+
+
 def test_transpose():
     discr = odl.uniform_discr([0, 0], [1, 1], [2, 2], order='F')
     x = discr.element([[1, 2], [3, 4]])
@@ -0,0 +1,152 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import division
+import pytest
+import numpy as np
+
+import odl
+from odl.operator.cached import CachedOperator
+from odl.util.testutils import all_almost_equal, noise_element
+
+
+def test_cached_operator_hits():
+    """Check that repeated evaluations are answered from the cache."""
+    space = odl.uniform_discr(0, 1, 10)
+    pow_op = odl.PowerOperator(space, 3)
+    op = CachedOperator(pow_op)
+    x = noise_element(space)
+    expected = pow_op(x)
+
+    with odl.util.profile() as prof:
+        results = [op(x), op(x.copy())]
+        out = space.element()
+        assert op(x, out=out) is out
+    assert prof.root.children[id(op)].children[id(pow_op)].calls == 1
+    assert op.hits == 2
+    assert op.misses == 1
+
+    for result in results + [out]:
+        assert all_almost_equal(result, expected)
+
+    # Returned results are independent copies
+    results[0] *= 0
+    assert all_almost_equal(op(x), expected)
+
+    # Changed input content is a miss
+    x *= 2
+    assert all_almost_equal(op(x), pow_op(x))
+    assert op.misses == 2
+
+    op.cache_clear()
+    assert op.cache_info() == (0, 0, 8, 0, 0)
+
+
+def test_cached_operator_in_place_miss():
+    """Check that the cache is not affected by changes to ``out``."""
+    space = odl.rn(3)
+    op = CachedOperator(odl.ScalingOperator(space, 2))
+    x = space.element([1, 2, 3])
+
+    out = space.element()
+    op(x, out=out)
+    out.set_zero()
+    assert all_almost_equal(op(x), [2, 4, 6])
+    assert op.hits == 1
+
+
+def test_cached_operator_bounds():
+    """Check the LRU eviction by number of entries and bytes."""
+    space = odl.rn(4)
+    op = CachedOperator(odl.ScalingOperator(space, 2), maxsize=2)
+    x, y, z = [space.element(np.full(4, i)) for i in range(3)]
+
+    op(x)
+    op(y)
+    op(x)  # x is now most recently used
+    op(z)  # drops y
+    assert op.cache_info().currsize == 2
+    op(x)
+    assert op.hits == 2
+    op(y)
+    assert op.misses == 4
+
+    # Two results of 32 bytes each fit
+    op = CachedOperator(odl.ScalingOperator(space, 2), maxsize=None,
+                        max_bytes=64)
+    for elem in [x, y, z]:
+        op(elem)
+    assert op.cache_info().nbytes == 64
+    assert op.cache_info().currsize == 2
+
+    # Too large results are not cached
+    op = CachedOperator(odl.ScalingOperator(space, 2), max_bytes=16)
+    op(x)
+    assert op.cache_info().currsize == 0
+
+    with pytest.raises(ValueError):
+        CachedOperator(op, maxsize=0)
+    with pytest.raises(ValueError):
+        CachedOperator(op, max_bytes=-1)
+    with pytest.raises(ValueError):
+        CachedOperator(op, key='value')
+
+
+def test_cached_operator_identity_no_copy():
+    """Check the identity key and read-only results."""
+    space = odl.rn(3)
+    op = CachedOperator(odl.ScalingOperator(space, 2), key='identity',
+                        copy=False)
+    x = space.element([1, 2, 3])
+
+    result = op(x)
+    assert op(x) is result
+    with pytest.raises(ValueError):
+        result[0] = 1
+
+    # Equal content, but different object
+    op(x.copy())
+    assert op.hits == 1
+    assert op.misses == 2
+
+
+def test_cached_operator_product_space_functional():
+    """Check caching of product space inputs and scalar outputs."""
+    space = odl.ProductSpace(odl.rn(2), odl.rn(3))
+    func = odl.solvers.L2NormSquared(space)
+    op = CachedOperator(func)
+    x = noise_element(space)
+
+    assert op(x) == pytest.approx(func(x))
+    assert op(x.copy()) == pytest.approx(func(x))
+    assert op.hits == 1
+
+    x[1][0] += 1
+    assert op(x) == pytest.approx(func(x))
+    assert op.misses == 2
+
+
+def test_cached_operator_delegates():
+    """Check derivative, adjoint and inverse of the wrapped operator."""
+    space = odl.rn(3)
+    scal = odl.ScalingOperator(space, 2)
+    op = CachedOperator(scal)
+    assert op.is_linear
+    x = noise_element(space)
+    assert all_almost_equal(op.adjoint(x), scal.adjoint(x))
+    assert all_almost_equal(op.inverse(x), scal.inverse(x))
+    assert all_almost_equal(op.derivative(x)(x), scal(x))
+
+    pow_op = odl.PowerOperator(space, 2)
+    op = CachedOperator(pow_op)
+    assert not op.is_linear
+    assert all_almost_equal(op.derivative(x)(x), pow_op.derivative(x)(x))
+
+
+if __name__ == '__main__':
+    pytest.main([str(__file__.replace('\\', '/')), '-v'])
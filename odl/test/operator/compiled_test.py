@@ -0,0 +1,143 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import division
+import pytest
+import numpy as np
+
+import odl
+from odl.operator.compiled import CompiledOperator
+from odl.util.testutils import all_almost_equal, noise_element
+
+
+def _matrix_ops(space, n):
+    """Return ``n`` random `MatrixOperator`'s on ``space``."""
+    return [odl.MatrixOperator(np.random.rand(space.size, space.size),
+                               domain=space, range=space)
+            for _ in range(n)]
+
+
+def test_compile_linear_expressions():
+    """Check compiled linear expressions against the original ones."""
+    space = odl.rn(5)
+    A, B, C = _matrix_ops(space, 3)
+    I = odl.IdentityOperator(space)
+    y = noise_element(space)
+
+    exprs = [2 * A * B + C,
+             A * (B + 3 * C) * 0.5,
+             (A - B) * (C + I),
+             A * 2 + I * 3 - C,
+             A * B * C,
+             odl.OperatorVectorSum(A * B, y) - C,
+             A + odl.ZeroOperator(space) * B]
+
+    x = noise_element(space)
+    for op in exprs:
+        compiled = odl.operator.compile(op)
+        assert isinstance(compiled, CompiledOperator)
+        assert all_almost_equal(compiled(x), op(x))
+
+        out = space.element()
+        result = compiled(x, out=out)
+        assert result is out
+        assert all_almost_equal(out, op(x))
+
+    # Zero operator only
+    compiled = odl.operator.compile(odl.ZeroOperator(space))
+    assert all_almost_equal(compiled(x), space.zero())
+
+
+def test_compile_folds_scalars():
+    """Check that scalars are folded into linear combinations."""
+    space = odl.rn(3)
+    A, B = _matrix_ops(space, 2)
+
+    compiled = odl.operator.compile(3 * (2 * A) * (B * 0.5))
+    calls = [step for step in compiled.plan if '(' in step]
+    assert len(calls) == 2
+    assert len(compiled.plan) == 3
+    assert compiled.plan[-1] == 'out = 3.0 * out'
+
+    x = noise_element(space)
+    assert all_almost_equal(compiled(x), 3 * A(B(x)))
+
+
+def test_compile_buffer_reuse():
+    """Check that the temporaries share scratch buffers."""
+    space = odl.rn(4)
+    A, B, C, D = _matrix_ops(space, 4)
+
+    # A long chain needs only two alternating buffers
+    compiled = odl.operator.compile(A * B * C * D * A * B)
+    assert compiled.num_buffers == 2
+
+    # Sum of chains, buffers from the first chain are reused
+    compiled = odl.operator.compile(A * B * C + D * A * B)
+    assert compiled.num_buffers == 2
+
+    x = noise_element(space)
+    op = A * B * C + D * A * B
+    assert all_almost_equal(compiled(x), op(x))
+
+
+def test_compile_no_alloc_after_warmup():
+    """Check that in-place evaluation does not allocate temporaries."""
+    space = odl.rn(4)
+    A, B, C = _matrix_ops(space, 3)
+    compiled = odl.operator.compile(2 * A * B + C * A - B)
+
+    x = noise_element(space)
+    out = space.element()
+    compiled(x, out=out)  # warm-up
+
+    with odl.util.profile() as prof:
+        compiled(x, out=out)
+
+    node = prof.root.children[id(compiled)]
+    assert node.total_allocs == 0
+
+
+def test_compile_adjoint_derivative():
+    """Check compiled adjoint and derivative."""
+    space = odl.rn(4)
+    A, B = _matrix_ops(space, 2)
+    op = 2 * A * B - A
+    compiled = odl.operator.compile(op)
+
+    y = noise_element(space)
+    assert isinstance(compiled.adjoint, CompiledOperator)
+    assert compiled.adjoint is compiled.adjoint
+    assert all_almost_equal(compiled.adjoint(y), op.adjoint(y))
+    assert compiled.derivative(y) is compiled
+
+    # Nonlinear expression
+    pow_op = odl.PowerOperator(space, 2)
+    op = A * pow_op * 2 + B
+    compiled = odl.operator.compile(op)
+    assert not compiled.is_linear
+
+    x = noise_element(space)
+    assert all_almost_equal(compiled(x), op(x))
+    deriv = compiled.derivative(x)
+    assert isinstance(deriv, CompiledOperator)
+    assert all_almost_equal(deriv(y), op.derivative(x)(y))
+
+
+def test_compile_invalid():
+    """Check that only operators with linear space range are accepted."""
+    space = odl.rn(3)
+    with pytest.raises(odl.OpTypeError):
+        odl.operator.compile(odl.solvers.L2NormSquared(space))
+
+    with pytest.raises(TypeError):
+        odl.operator.compile(space)
+
+
+if __name__ == '__main__':
+    pytest.main([str(__file__.replace('\\', '/')), '-v'])
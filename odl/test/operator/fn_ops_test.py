@@ -0,0 +1,174 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Unit tests for `fn_ops`."""
+
+from __future__ import division
+import pytest
+import numpy as np
+
+import odl
+from odl.util.scratch import SCRATCH_POOL
+from odl.util.testutils import all_almost_equal, noise_element
+
+
+def test_sampling_operator():
+    """Check sampling and its adjoint against numpy, with duplicates."""
+    space = odl.uniform_discr([0, 0], [1, 1], (3, 4))
+    points = [[0, 2, 1, 2, 0], [3, 0, 1, 0, 3]]
+    flat = np.ravel_multi_index(points, space.shape)
+    x = noise_element(space)
+    x_arr = x.asarray().ravel()
+
+    for variant, weight in [('point_eval', 1.0),
+                            ('integrate', space.cell_volume)]:
+        op = odl.SamplingOperator(space, points, variant)
+        assert all_almost_equal(op.indices_flat, flat)
+        assert all_almost_equal(op(x), weight * x_arr[flat])
+
+        out = op.range.element()
+        assert op(x, out=out) is out
+        assert all_almost_equal(out, weight * x_arr[flat])
+
+        y = noise_element(op.range)
+        expected = np.zeros(space.size)
+        np.add.at(expected, flat, y.asarray())
+        expected *= weight / space.cell_volume
+        adj = op.adjoint
+        assert adj is op.adjoint
+        assert all_almost_equal(adj(y), expected)
+        assert adj(y).inner(x) == pytest.approx(y.inner(op(x)))
+
+        # In-place evaluation overwrites everything
+        out = space.one()
+        adj(y, out=out)
+        assert all_almost_equal(out, expected)
+
+
+def test_sampling_operator_storage_order(monkeypatch):
+    """Check that both evaluation paths agree for Fortran ordered spaces."""
+    space = odl.uniform_discr([0, 0], [1, 1], (3, 4), order='F')
+    points = [[0, 2, 1], [3, 0, 1]]
+    x = noise_element(space)
+    expected = x.asarray()[tuple(points)]
+
+    op = odl.SamplingOperator(space, points)
+    assert all_almost_equal(op(x), expected)
+    y = noise_element(op.range)
+    adj_y = op.adjoint(y)
+
+    # Without direct access to the Numpy data
+    monkeypatch.setattr(odl.operator.fn_ops, '_numpy_data',
+                        lambda x: None)
+    assert all_almost_equal(op(x), expected)
+    assert all_almost_equal(op.adjoint(y), adj_y)
+    assert all_almost_equal(adj_y.asarray()[tuple(points)],
+                            y.asarray() / space.cell_volume)
+
+
+def test_sampling_operator_flat_complex():
+    """Check flat (also negative) indices and complex data."""
+    space = odl.cn(6)
+    points = [5, -1, 0, 2]
+    op = odl.SamplingOperator(space, points)
+    x = noise_element(space)
+    assert all_almost_equal(op(x), x.asarray()[points])
+
+    y = noise_element(op.range)
+    expected = np.zeros(6, dtype=complex)
+    np.add.at(expected, points, y.asarray())
+    assert all_almost_equal(op.adjoint(y), expected)
+
+    # Without duplicates
+    op = odl.SamplingOperator(space, [4, 1])
+    y = noise_element(op.range)
+    expected = np.zeros(6, dtype=complex)
+    expected[[4, 1]] = y.asarray()
+    assert all_almost_equal(op.adjoint(y), expected)
+
+
+def test_sampling_operator_adjoint_temporaries():
+    """Check that the adjoint reuses its temporaries with duplicates."""
+    space = odl.rn(8)
+    op = odl.SamplingOperator(space, [3, 1, 3, 6, 1])
+    adj = op.adjoint
+    y = noise_element(op.range)
+    expected = np.zeros(8)
+    np.add.at(expected, [3, 1, 3, 6, 1], y.asarray())
+
+    SCRATCH_POOL.clear()
+    out = space.element()
+    adj(y, out=out)
+    nbytes = SCRATCH_POOL.nbytes
+    assert nbytes > 0
+    adj(y, out=out)
+    assert SCRATCH_POOL.nbytes == nbytes
+    assert all_almost_equal(out, expected)
+
+
+def test_sampling_operator_invalid():
+    """Check the errors for bad sampling points and variants."""
+    space = odl.uniform_discr([0, 0], [1, 1], (3, 4))
+    with pytest.raises(ValueError):
+        odl.SamplingOperator(space, [[0, 3], [0, 0]])
+    with pytest.raises(IndexError):
+        odl.SamplingOperator(odl.rn(3), [0, 3])
+    with pytest.raises(ValueError):
+        odl.SamplingOperator(space, [[0], [0]], variant='dirac')
+    with pytest.raises(ValueError):
+        odl.WeightedSumSamplingOperator(space, [[0], [0]],
+                                        variant='point_eval')
+
+
+def test_flattening_operator_views():
+    """Check views and copies of flattening and its inverse."""
+    for space_order in ('C', 'F'):
+        space = odl.uniform_discr([0, 0], [1, 1], (2, 3), order=space_order)
+        x = noise_element(space)
+        for order in ('C', 'F'):
+            op = odl.FlatteningOperator(space, order=order, copy=False)
+            y = op(x)
+            assert all_almost_equal(y, x.asarray().ravel(order))
+            is_view = np.shares_memory(y.data, x.ntuple.data)
+            assert is_view == (order == space_order)
+
+            x_back = op.inverse(y)
+            assert all_almost_equal(x_back, x)
+            assert np.shares_memory(x_back.ntuple.data, y.data) == is_view
+
+            out = space.element()
+            op.inverse(y, out=out)
+            assert all_almost_equal(out, x)
+
+            # Adjoint test
+            y = noise_element(op.range)
+            assert op.adjoint(y).inner(x) == pytest.approx(y.inner(op(x)))
+
+            # By default, the results are new elements
+            op = odl.FlatteningOperator(space, order=order)
+            y = op(x)
+            assert all_almost_equal(y, x.asarray().ravel(order))
+            assert not np.shares_memory(y.data, x.ntuple.data)
+            assert not np.shares_memory(op.inverse(y).ntuple.data, y.data)
+            assert op.inverse.copy
+
+    # Elements of fn spaces are views of themselves
+    space = odl.rn(4)
+    x = noise_element(space)
+    op = odl.FlatteningOperator(space, copy=False)
+    assert op.adjoint.__class__ is odl.FlatteningOperatorAdjoint
+    assert np.shares_memory(op(x).data, x.data)
+    assert not np.shares_memory(odl.FlatteningOperator(space)(x).data,
+                                x.data)
+
+    with pytest.raises(ValueError):
+        odl.FlatteningOperator(space, order='A')
+
+
+if __name__ == '__main__':
+    pytest.main([str(__file__.replace('\\', '/')), '-v'])
@@ -74,6 +74,37 @@ def check_call(operator, point, expected):
     assert all_almost_equal(out, expected)
 
 
+def test_call_unchecked():
+    """Test that ``check=False`` gives the same result as a checked call."""
+    A = np.random.rand(4, 3)
+    x = np.random.rand(3)
+    Aop = MultiplyAndSquareOp(A)
+    xvec = Aop.domain.element(x)
+
+    expected = Aop(xvec)
+    assert all_almost_equal(Aop(xvec, check=False), expected)
+
+    out = Aop.range.element()
+    result = Aop(xvec, out=out, check=False)
+    assert result is out
+    assert all_almost_equal(out, expected)
+
+    # Elements of an equal but distinct space pass the checks
+    other_dom = odl.rn(3)
+    assert other_dom is not Aop.domain
+    assert all_almost_equal(Aop(other_dom.element(x)), expected)
+
+    # Raw arrays returned by `_call` are still wrapped
+    class ArrayOperator(odl.Operator):
+        def _call(self, x):
+            return x.asarray() * 2
+
+    op = ArrayOperator(odl.rn(3), odl.rn(3))
+    result = op(op.domain.element(x), check=False)
+    assert result in op.range
+    assert all_almost_equal(result, 2 * x)
+
+
 def test_call_in_place_wrong_return():
     """Test that operator with out parameter actually returns out."""
     class BadInplaceOperator(odl.Operator):
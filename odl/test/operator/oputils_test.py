@@ -12,10 +12,12 @@ import pytest
 import numpy as np
 
 import odl
-from odl.operator.oputils import matrix_representation, power_method_opnorm
+from odl.operator.oputils import (
+    matrix_representation, power_method_opnorm, lanczos_opnorm,
+    as_scipy_operator)
 from odl.space.pspace import ProductSpace
 from odl.operator.pspace_ops import ProductSpaceOperator
-from odl.util.testutils import almost_equal
+from odl.util.testutils import almost_equal, all_almost_equal
 
 
 def test_matrix_representation():
@@ -179,6 +181,60 @@ def test_matrix_representation_wrong_range():
         matrix_representation(nonlin_op)
 
 
+def test_matrix_representation_sparse():
+    # Verify the sparse matrix representation against the dense one
+    space = odl.uniform_discr([0, 0], [1, 1], [3, 4])
+    grad = odl.Gradient(space)
+
+    dense = matrix_representation(grad)
+    assert dense.shape == (2 * space.size, space.size)
+
+    for batch_size in [1, 5, 100]:
+        sparse = matrix_representation(grad, sparse=True,
+                                       batch_size=batch_size)
+        assert sparse.format == 'csr'
+        assert sparse.nnz == np.count_nonzero(dense)
+        assert np.array_equal(sparse.toarray(), dense)
+
+    # Evaluation in worker processes gives the same result
+    sparse = matrix_representation(grad, sparse=True, processes=2)
+    assert np.array_equal(sparse.toarray(), dense)
+
+    with pytest.raises(ValueError):
+        matrix_representation(grad, batch_size=0)
+
+
+def test_matrix_representation_sparsity_pattern():
+    # Verify structural probing with a known sparsity pattern
+    space = odl.uniform_discr([0, 0], [1, 1], [3, 4])
+    grad = odl.Gradient(space)
+    dense = matrix_representation(grad)
+
+    class CountingOp(odl.Operator):
+        def __init__(self, op):
+            super().__init__(op.domain, op.range, linear=True)
+            self.op = op
+            self.calls = 0
+
+        def _call(self, x, out):
+            self.calls += 1
+            self.op(x, out=out)
+
+    counting_op = CountingOp(grad)
+    pattern = dense != 0
+    for sparse in [True, False]:
+        counting_op.calls = 0
+        matrix = matrix_representation(counting_op, sparse=sparse,
+                                       sparsity_pattern=pattern)
+        if sparse:
+            matrix = matrix.toarray()
+        assert np.array_equal(matrix, dense)
+        assert counting_op.calls < space.size
+
+    with pytest.raises(ValueError):
+        matrix_representation(grad, sparsity_pattern=pattern.T)
+
+
 def test_power_method_opnorm_symm():
     # Test the power method on a matrix operator
 
@@ -251,5 +307,130 @@ def test_power_method_opnorm_exceptions():
 
         power_method_opnorm(op, maxiter=1, xstart=op.domain.one())
 
+def test_lanczos_opnorm():
+    # Test the Lanczos method against the singular values of a matrix
+    mat = np.random.rand(6, 4)
+    op = odl.MatrixOperator(mat)
+    svals = np.linalg.svd(mat, compute_uv=False)
+
+    opnorm_est = lanczos_opnorm(op, maxiter=10)
+    assert almost_equal(opnorm_est, svals[0], places=5)
+
+    largest, smallest = lanczos_opnorm(op, maxiter=10, smallest=True)
+    assert almost_equal(largest, svals[0], places=5)
+    assert almost_equal(smallest, svals[-1], places=5)
+
+    xstart = op.domain.one()
+    assert almost_equal(lanczos_opnorm(op, xstart=xstart), svals[0],
+                        places=5)
+
+    with pytest.raises(ValueError):
+        lanczos_opnorm(op, maxiter=0)
+
+    with pytest.raises(ValueError):
+        lanczos_opnorm(op, xstart=op.domain.zero())
+
+    # The smallest value is iterated until it converges relative to its
+    # own size, not to the largest value
+    op = odl.MatrixOperator(np.diag(np.linspace(0.001, 1, 200)))
+    largest, smallest = lanczos_opnorm(op, maxiter=300, smallest=True)
+    assert almost_equal(largest, 1, places=5)
+    assert almost_equal(smallest / 0.001, 1, places=3)
+
+    with pytest.raises(ValueError):
+        lanczos_opnorm(odl.PowerOperator(odl.rn(3), 2))
+
+
+def test_lanczos_opnorm_cache(tmpdir):
+    # Test the in-memory and on-disk caching of the Lanczos method
+    space = odl.uniform_discr([0, 0], [1, 1], [8, 8])
+
+    class CountingGradient(odl.Gradient):
+        calls = 0
+
+        def _call(self, x, out=None):
+            CountingGradient.calls += 1
+            return super()._call(x, out=out)
+
+    grad = CountingGradient(space)
+    op = odl.BroadcastOperator(grad, 2 * odl.IdentityOperator(space))
+
+    opnorm = lanczos_opnorm(op)
+    num_calls = CountingGradient.calls
+    assert num_calls > 0
+    assert lanczos_opnorm(op) == opnorm
+    assert CountingGradient.calls == num_calls
+
+    # A new operator is evaluated again, unless a cache dir is used
+    cache_dir = str(tmpdir.join('cache'))
+    op = odl.BroadcastOperator(odl.Gradient(space),
+                               2 * odl.IdentityOperator(space))
+    assert almost_equal(lanczos_opnorm(op, cache_dir=cache_dir), opnorm)
+    assert len(tmpdir.join('cache').listdir()) == 1
+
+    op = odl.BroadcastOperator(odl.Gradient(space),
+                               2 * odl.IdentityOperator(space))
+    with odl.util.profile() as prof:
+        assert lanczos_opnorm(op, cache_dir=cache_dir) == opnorm
+    assert not prof.root.children
+
+    # Different parameters use different entries
+    with odl.util.profile() as prof:
+        lanczos_opnorm(op, cache_dir=cache_dir, maxiter=5)
+    assert prof.root.children
+    assert len(tmpdir.join('cache').listdir()) == 2
+
+    # Subclasses are not cached on disk since they may behave differently
+    op = odl.BroadcastOperator(CountingGradient(space),
+                               2 * odl.IdentityOperator(space))
+    num_calls = CountingGradient.calls
+    lanczos_opnorm(op, cache_dir=cache_dir)
+    assert CountingGradient.calls > num_calls
+
+
+def test_as_scipy_operator():
+    # Test the scipy wrapper against the matrix representation
+    space = odl.uniform_discr([0, 0], [1, 1], [3, 4], dtype='float32')
+    grad = odl.Gradient(space)
+    mat = matrix_representation(grad)
+    scipy_op = as_scipy_operator(grad)
+    assert scipy_op.dtype == np.float32
+    assert scipy_op.shape == mat.shape
+
+    x = np.random.rand(space.size).astype('float32')
+    y = np.random.rand(2 * space.size).astype('float32')
+    assert scipy_op.matvec(x).dtype == np.float32
+    assert np.allclose(scipy_op.matvec(x), mat.dot(x), rtol=1e-4)
+    assert np.allclose(scipy_op.rmatvec(y), mat.T.dot(y), rtol=1e-4)
+
+    x_block = np.random.rand(space.size, 3).astype('float32')
+    y_block = np.random.rand(2 * space.size, 3)
+    result = scipy_op.matmat(x_block)
+    assert result.dtype == np.float32
+    assert np.allclose(result, mat.dot(x_block), rtol=1e-4)
+    assert np.allclose(scipy_op.H.matmat(y_block), mat.T.dot(y_block),
+                       rtol=1e-4)
+
+
+def test_as_scipy_operator_no_copy():
+    # Test that arrays are wrapped without copying when possible
+    from odl.operator.oputils import _wrap_flat
+
+    pspace = odl.ProductSpace(odl.uniform_discr(0, 1, 3), 2)
+    arr = np.arange(6, dtype=float)
+    for space in [pspace, odl.ProductSpace(pspace[0], 2, contiguous=True)]:
+        elem, is_view = _wrap_flat(space, arr)
+        assert is_view
+        assert all_almost_equal(elem, [[0, 1, 2], [3, 4, 5]])
+        elem[1][0] = -1
+        assert arr[3] == -1
+        arr[3] = 3
+
+    # Different data types need a copy
+    elem, is_view = _wrap_flat(odl.rn(6, dtype='float32'), arr)
+    assert not is_view
+    assert all_almost_equal(elem, arr)
+
+
 if __name__ == '__main__':
     pytest.main([str(__file__.replace('\\', '/')), '-v'])
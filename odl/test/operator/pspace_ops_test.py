@@ -7,10 +7,12 @@
 # obtain one at https://mozilla.org/MPL/2.0/.
 
 from __future__ import division
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
 import pytest
 
 import odl
-from odl.util.testutils import all_almost_equal
+from odl.util.testutils import all_almost_equal, noise_element
 
 
 def test_pspace_op_init():
@@ -109,6 +111,81 @@ def test_pspace_op_swap_call():
     assert result == op(z, out=op.range.element())
 
 
+def test_pspace_op_parallel():
+    """Check that parallel evaluation gives the sequential result."""
+    r3 = odl.rn(3)
+    A, B, C = [odl.MatrixOperator(np.random.rand(3, 3)) for _ in range(3)]
+    matrix = [[A, B, 0],
+              [0, 0, 0],
+              [C, A * B, B]]
+    seq_op = odl.ProductSpaceOperator(matrix, range=odl.ProductSpace(r3, 3))
+    x = noise_element(seq_op.domain)
+    y = noise_element(seq_op.range)
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    for parallel in [True, 3, executor]:
+        op = odl.ProductSpaceOperator(matrix, range=seq_op.range,
+                                      parallel=parallel)
+        assert op.parallel is parallel
+        assert all_almost_equal(op(x), seq_op(x))
+
+        out = op.range.element()
+        op(x, out=out)
+        assert all_almost_equal(out, seq_op(x))
+        assert out[1].norm() == 0
+
+        assert op.adjoint.parallel is parallel
+        assert all_almost_equal(op.adjoint(y), seq_op.adjoint(y))
+        assert op[2].parallel is parallel
+    executor.shutdown()
+
+    with pytest.raises(TypeError):
+        odl.ProductSpaceOperator(matrix, range=seq_op.range, parallel='yes')
+
+    # Process pools would write the results into copies of ``out``
+    executor = ProcessPoolExecutor(max_workers=1)
+    with pytest.raises(TypeError):
+        odl.ProductSpaceOperator(matrix, range=seq_op.range,
+                                 parallel=executor)
+    executor.shutdown()
+    with pytest.raises(ValueError):
+        odl.ProductSpaceOperator(matrix, range=seq_op.range, parallel=0)
+
+
+def test_broadcast_reduction_parallel():
+    """Check parallel broadcast and reduction operators."""
+    r3 = odl.rn(3)
+    A, B = [odl.MatrixOperator(np.random.rand(3, 3)) for _ in range(2)]
+    residual = A - r3.one()
+
+    bc_op = odl.BroadcastOperator(A, residual, B, parallel=True)
+    seq_bc_op = odl.BroadcastOperator(A, residual, B)
+    x = noise_element(r3)
+    y = noise_element(bc_op.range)
+    assert all_almost_equal(bc_op(x), seq_bc_op(x))
+    assert bc_op.derivative(x).parallel is True
+    assert all_almost_equal(bc_op.derivative(x)(x),
+                            seq_bc_op.derivative(x)(x))
+
+    red_op = bc_op.derivative(x).adjoint
+    assert isinstance(red_op, odl.ReductionOperator)
+    assert red_op.parallel is True
+    assert all_almost_equal(red_op(y), seq_bc_op.derivative(x).adjoint(y))
+    assert repr(red_op).endswith('parallel=True)')
+
+    # Errors in the sub-operators are propagated
+    class FailingOp(odl.Operator):
+        def _call(self, x, out):
+            raise RuntimeError
+
+    red_op = odl.ReductionOperator(A, FailingOp(r3, r3), parallel=2)
+    with pytest.raises(RuntimeError):
+        red_op(y[:2])
+
+    with pytest.raises(TypeError):
+        odl.ReductionOperator(A, B, paralel=True)
+
+
 def test_comp_proj():
     r3 = odl.rn(3)
     r3xr3 = odl.ProductSpace(r3, 2)
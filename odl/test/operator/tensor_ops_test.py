@@ -1,4 +1,4 @@
-# Copyright 2014-2017 The ODL contributors
+﻿# Copyright 2014-2017 The ODL contributors
 #
 # This file is part of ODL.
 #
@@ -449,6 +449,50 @@ def test_pointwise_sum():
     assert all_equal(psum.vecfield, psum.domain.one())
 
 
+def test_pointwise_chunked_parallel(exponent, monkeypatch):
+    """Check chunked, contiguous and parallel evaluation against numpy."""
+    monkeypatch.setattr(odl.operator.tensor_ops, 'CHUNK_SIZE', 7)
+    fspace = odl.uniform_discr([0, 0], [1, 1], (5, 6))
+    weight = np.array([1.0, 2.0, 3.0])
+    arr = np.random.randn(3, 5, 6)
+    vf_arr = np.random.randn(3, 5, 6)
+
+    if exponent in (1.0, float('inf')):
+        true_norm = np.linalg.norm(weight[:, None, None] * arr,
+                                   ord=exponent, axis=0)
+    else:
+        true_norm = np.linalg.norm(
+            weight[:, None, None] ** (1 / exponent) * arr, ord=exponent,
+            axis=0)
+    true_inner = np.sum(weight[:, None, None] * arr * vf_arr, axis=0)
+
+    for contiguous in [False, True]:
+        vfspace = ProductSpace(fspace, 3, contiguous=contiguous)
+        x = vfspace.element(arr)
+        for parallel in [False, 3]:
+            pwnorm = PointwiseNorm(vfspace, exponent, weighting=weight,
+                                   parallel=parallel)
+            assert pwnorm.parallel == parallel
+            assert all_almost_equal(pwnorm(x), true_norm.ravel())
+
+            pwinner = PointwiseInner(vfspace, vf_arr, weighting=weight,
+                                     parallel=parallel)
+            out = fspace.element()
+            pwinner(x, out=out)
+            assert all_almost_equal(out, true_inner.ravel())
+
+    # Complex case
+    vfspace = ProductSpace(odl.cn(10), 2)
+    x = noise_element(vfspace)
+    y = noise_element(vfspace)
+    x_arr, y_arr = x.asarray(), y.asarray()
+    pwnorm = PointwiseNorm(vfspace, exponent, parallel=2)
+    assert all_almost_equal(pwnorm(x),
+                            np.linalg.norm(x_arr, ord=exponent, axis=0))
+    pwinner = PointwiseInner(vfspace, y, parallel=2)
+    assert all_almost_equal(pwinner(x), np.sum(x_arr * y_arr.conj(), axis=0))
+
+
 # ---- MatrixOperator ---- #
 
 
@@ -640,5 +684,110 @@ def test_mat_op_call(fn):
     assert all_almost_equal(y, yarr)
 
 
+def test_mat_op_sparse_formats(fn):
+    """Check the CSR storage and the cached adjoint."""
+    op = MatrixOperator(_sparse_matrix(fn), fn, fn)
+    assert op.matrix.format == 'csr'
+
+    adj = op.adjoint
+    assert adj is op.adjoint
+    assert adj.adjoint is op
+    assert adj.matrix.format == 'csr'
+
+    x = noise_element(fn)
+    assert all_almost_equal(adj(x), op.matrix.conj().T.dot(x.asarray()))
+
+    # CSC matrices are converted, too
+    csc = _sparse_matrix(fn).tocsc()
+    op = MatrixOperator(csc, fn, fn)
+    assert op.matrix.format == 'csr'
+    assert all_almost_equal(op(x), csc.dot(x.asarray()))
+
+    # Dense adjoint of a real matrix is a view, too
+    op = MatrixOperator(_dense_matrix(fn), fn, fn)
+    if not np.issubdtype(fn.dtype, np.complexfloating):
+        assert np.shares_memory(op.adjoint.matrix, op.matrix)
+
+
+def test_mat_op_dense_no_alloc():
+    """Check that the dense in-place product does not allocate."""
+    space = odl.rn(50)
+    op = MatrixOperator(np.random.rand(50, 50), space, space)
+    x = noise_element(space)
+    out = space.element()
+    with odl.util.profile() as prof:
+        op(x, out=out)
+        op.adjoint(x, out=out)
+    assert prof.root.total_allocs == 0
+    assert all_almost_equal(out, op.matrix.T.dot(x.asarray()))
+
+
+def test_mat_op_parallel(monkeypatch):
+    """Check parallel sparse products against the sequential ones."""
+    monkeypatch.setattr(odl.operator.tensor_ops, '_MIN_CHUNK_NNZ', 10)
+    matrix = scipy.sparse.random(40, 30, density=0.3, format='coo',
+                                 random_state=0)
+    x_arr = np.random.rand(30)
+    y_arr = np.random.rand(40)
+    expected = matrix.dot(x_arr)
+    expected_adj = matrix.T.dot(y_arr)
+
+    for parallel in [2, 3]:
+        op = MatrixOperator(matrix, parallel=parallel)
+        chunks = op._row_chunks()
+        assert len(chunks) == parallel
+        assert chunks[0][0][0] == 0
+        assert chunks[-1][-1][1] == 40
+
+        assert all_almost_equal(op(x_arr), expected)
+        out = op.range.element()
+        assert op(x_arr, out=out) is out
+        assert all_almost_equal(out, expected)
+
+        assert op.adjoint.parallel == parallel
+        assert all_almost_equal(op.adjoint(y_arr), expected_adj)
+
+    # Inside a parallel block operator
+    op = MatrixOperator(matrix, parallel=2)
+    block_op = odl.BroadcastOperator(op, op, parallel=2)
+    result = block_op(x_arr)
+    assert all_almost_equal(result[0], expected)
+    assert all_almost_equal(result[1], expected)
+
+    with pytest.raises(TypeError):
+        MatrixOperator(matrix, parallel='yes')
+
+
+def test_mat_op_sparse_aliased(monkeypatch):
+    """Check in-place sparse products with ``out`` equal to ``x``."""
+    monkeypatch.setattr(odl.operator.tensor_ops, '_MIN_CHUNK_NNZ', 10)
+    matrix = scipy.sparse.random(40, 40, density=0.3, format='csr',
+                                 random_state=0)
+    # Several row blocks per chunk
+    monkeypatch.setattr(odl.operator.tensor_ops, 'CHUNK_SIZE', 8)
+    x_arr = np.random.rand(40)
+    expected = matrix.dot(x_arr)
+    expected_adj = matrix.T.dot(x_arr)
+
+    for parallel in [False, 2, 3]:
+        op = MatrixOperator(matrix, parallel=parallel)
+        assert all(stop - start <= 8
+                   for chunk in op._row_chunks()
+                   for start, stop, _ in chunk)
+        x = op.domain.element(x_arr.copy())
+        assert op(x, out=x) is x
+        assert all_almost_equal(x, expected)
+
+        x = op.domain.element(x_arr.copy())
+        op.adjoint(x, out=x)
+        assert all_almost_equal(x, expected_adj)
+
+    # Mixed data types
+    op = MatrixOperator(matrix.astype('float32'), odl.rn(40), odl.rn(40))
+    x = op.domain.element(x_arr.copy())
+    op(x, out=x)
+    assert all_almost_equal(x, expected, places=5)
+
+
 if __name__ == '__main__':
     pytest.main([str(__file__.replace('\\', '/')), '-v'])
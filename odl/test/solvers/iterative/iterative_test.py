@@ -131,5 +131,168 @@ def test_steepst_descent():
 
     assert all_almost_equal(x, [1, 1, 1], places=2)
 
+
+def test_conjugate_gradient_preconditioned():
+    """Test CG and CGNR with Jacobi and circulant preconditioners."""
+    with odl.util.NumpyRandomSeed(0):
+        mat = np.random.rand(6, 6)
+    mat = np.eye(6) + 0.05 * (mat + mat.T)
+    scaling = np.diag(np.logspace(0, 3, 6))
+    op = odl.MatrixOperator(scaling.dot(mat).dot(scaling))
+    rhs = op.range.one()
+
+    # Exact inverse diagonal: much smaller residual after a few iterations
+    inv_diag = odl.MultiplyOperator(op.domain.element(1 / np.diag(op.matrix)))
+    residuals = []
+    for precon in [None, inv_diag]:
+        x = op.domain.zero()
+        odl.solvers.conjugate_gradient(op, x, rhs, niter=4,
+                                       preconditioner=precon)
+        residuals.append((op(x) - rhs).norm())
+    assert residuals[1] < 0.1 * residuals[0]
+
+    # Converges to the solution with the estimated diagonal
+    x = op.domain.zero()
+    with odl.util.NumpyRandomSeed(0):
+        odl.solvers.conjugate_gradient(op, x, rhs, niter=12,
+                                       preconditioner='jacobi')
+    assert all_almost_equal(op(x), rhs)
+
+    # Periodic convolution, inverted exactly by the circulant
+    # preconditioner
+    kernel = np.array([4.0, 1.0, 0.5, 0.0, 0.5, 1.0])
+    circ = odl.MatrixOperator(np.array([np.roll(kernel, i)
+                                        for i in range(6)]))
+    rhs = circ.range.element([1, 2, 3, 4, 5, 6])
+    x = circ.domain.zero()
+    odl.solvers.conjugate_gradient(circ, x, rhs, niter=1,
+                                   preconditioner='circulant')
+    assert all_almost_equal(circ(x), rhs)
+
+    x = circ.domain.zero()
+    odl.solvers.conjugate_gradient_normal(circ, x, rhs, niter=1,
+                                          preconditioner='circulant')
+    assert all_almost_equal(circ(x), rhs)
+
+    with pytest.raises(ValueError):
+        odl.solvers.conjugate_gradient(circ, x, rhs, niter=1,
+                                       preconditioner='ilu')
+    with pytest.raises(ValueError):
+        odl.solvers.conjugate_gradient(
+            circ, x, rhs, niter=1,
+            preconditioner=odl.IdentityOperator(odl.rn(3)))
+
+
+def test_circulant_preconditioner_positive():
+    """Check that the circulant preconditioner is SPD for any response."""
+    # Non-symmetric kernel, and one with negative Fourier coefficients
+    for kernel in ([4.0, 2.0, 0.0, 0.0, 0.0, 1.0],
+                   [-4.0, 1.0, 0.5, 0.0, 0.5, 1.0]):
+        circ = odl.MatrixOperator(np.array([np.roll(kernel, i)
+                                            for i in range(6)]))
+        precon = odl.solvers.circulant_preconditioner(circ)
+        mat = np.array([precon(unit).asarray() for unit in np.eye(6)]).T
+        assert all_almost_equal(mat, mat.T)
+        assert np.all(np.linalg.eigvalsh(mat) > 0)
+        assert all_almost_equal(precon.adjoint(circ.domain.one()),
+                                precon(circ.domain.one()))
+
+
+def test_conjugate_gradient_block():
+    """Test block CG, which is exact after ``n / m`` iterations."""
+    with odl.util.NumpyRandomSeed(1):
+        mat = np.random.rand(6, 6)
+        rhs_arr = np.random.rand(3, 6)
+    op = odl.MatrixOperator(mat.dot(mat.T) + np.eye(6))
+    pspace = odl.ProductSpace(op.domain, 3)
+    rhs = pspace.element(rhs_arr)
+
+    x = pspace.zero()
+    iterates = odl.solvers.CallbackStore()
+    odl.solvers.conjugate_gradient_block(op, x, rhs, niter=2,
+                                         callback=iterates)
+    assert len(iterates) == 2
+    for xi, rhsi in zip(x, rhs):
+        assert all_almost_equal(op(xi), rhsi)
+
+    # More iterations do not spoil the result, also when preconditioned
+    x = [op.domain.zero() for _ in range(3)]
+    odl.solvers.conjugate_gradient_block(op, x, rhs, niter=5,
+                                         preconditioner='jacobi')
+    for xi, rhsi in zip(x, rhs):
+        assert all_almost_equal(op(xi), rhsi)
+
+    with pytest.raises(ValueError):
+        odl.solvers.conjugate_gradient_block(op, x, rhs[:2], niter=1)
+
+
+def test_sirt():
+    """Test SIRT against the explicit iteration and for convergence."""
+    with odl.util.NumpyRandomSeed(1):
+        mat = np.random.rand(6, 4) + 2 * np.eye(6, 4)
+    mat[:, 3] = 0  # column that is never seen
+    op = odl.MatrixOperator(mat)
+    x_true = op.domain.element([1, 2, 3, 0])
+    rhs = op(x_true)
+
+    # One step with the weights computed by hand
+    x = op.domain.zero()
+    odl.solvers.sirt(op, x, rhs, niter=1, omega=1.5)
+    col_sums = mat.sum(axis=0)
+    col_sums[3] = 1
+    expected = 1.5 * mat.T.dot(rhs / mat.sum(axis=1)) / col_sums
+    assert all_almost_equal(x, expected)
+
+    # The weights are computed once per operator
+    weights = odl.solvers.iterative.iterative._sirt_weights(op)
+    assert odl.solvers.iterative.iterative._sirt_weights(op) is weights
+
+    x = op.domain.zero()
+    iterates = odl.solvers.CallbackStore()
+    odl.solvers.sirt(op, x, rhs, niter=100, callback=iterates)
+    assert len(iterates) == 100
+    assert all_almost_equal(x, x_true, places=4)
+
+    # Box constraints
+    x = op.domain.zero()
+    odl.solvers.sirt(op, x, rhs, niter=20, lower=0.5, upper=2)
+    assert np.min(x.asarray()) >= 0.5
+    assert np.max(x.asarray()) <= 2
+
+    with pytest.raises(ValueError):
+        odl.solvers.sirt(op, x, rhs, niter=1, omega=0)
+
+
+def test_sart():
+    """Test ordered-subset SART with a `BroadcastOperator`."""
+    with odl.util.NumpyRandomSeed(1):
+        mat = np.random.rand(6, 4) + 2 * np.eye(6, 4)
+    ops = [odl.MatrixOperator(mat[i::3]) for i in range(3)]
+    op = odl.BroadcastOperator(*ops)
+    x_true = op.domain.element([1, 2, 3, 4])
+    rhs = op(x_true)
+
+    # With a single subset, the method coincides with SIRT
+    x_sirt = op.domain.zero()
+    odl.solvers.sirt(ops[0], x_sirt, rhs[0], niter=3, omega=0.5)
+    x = op.domain.zero()
+    odl.solvers.sart(ops[:1], x, rhs[:1], niter=3, omega=0.5)
+    assert all_almost_equal(x, x_sirt)
+
+    x = op.domain.zero()
+    iterates = odl.solvers.CallbackStore()
+    odl.solvers.sart(op, x, rhs, niter=300, callback=iterates)
+    assert len(iterates) == 900
+    assert all_almost_equal(x, x_true, places=4)
+
+    # Separate relaxation parameters and box constraints
+    x = op.domain.zero()
+    odl.solvers.sart(op, x, rhs, niter=10, omega=[1, 0.5, 1], upper=2.5)
+    assert np.max(x.asarray()) <= 2.5
+
+    with pytest.raises(ValueError):
+        odl.solvers.sart(op, x, rhs[:2], niter=1)
+
+
 if __name__ == '__main__':
     pytest.main([str(__file__.replace('\\', '/')), '-v'])
@@ -0,0 +1,101 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Test Krylov subspace solvers."""
+
+from __future__ import division
+import odl
+from odl.util.testutils import all_almost_equal
+import pytest
+import numpy as np
+
+
+@pytest.fixture(scope="module", params=['lsqr', 'lsmr'])
+def least_squares_solver(request):
+    """Return a least-squares solver given by its name."""
+    return getattr(odl.solvers, request.param)
+
+
+def test_least_squares(least_squares_solver):
+    """Test LSQR and LSMR against the solution of the normal equations."""
+    with odl.util.NumpyRandomSeed(1):
+        mat = np.random.rand(8, 5)
+        rhs_arr = np.random.rand(8)
+    op = odl.MatrixOperator(mat)
+    rhs = op.range.element(rhs_arr)
+
+    # Overdetermined least squares, exact after n iterations
+    expected = np.linalg.lstsq(mat, rhs_arr)[0]
+    x = op.domain.zero()
+    iterates = odl.solvers.CallbackStore()
+    info = least_squares_solver(op, x, rhs, niter=5, callback=iterates)
+    assert info == odl.solvers.ConvergenceInfo(5, 'niter')
+    assert len(iterates) == 5
+    assert all_almost_equal(x, expected)
+
+    # Damped least squares, starting from the solution without damping
+    damp = 0.5
+    expected = np.linalg.solve(mat.T.dot(mat) + damp ** 2 * np.eye(5),
+                               mat.T.dot(rhs_arr))
+    x = op.domain.zero()
+    least_squares_solver(op, x, rhs, niter=10, damp=damp)
+    assert all_almost_equal(x, expected)
+
+    # Early stopping
+    x = op.domain.zero()
+    info = least_squares_solver(op, x, rhs, niter=100, tol=1e-10)
+    assert info.niter < 100
+    assert info.reason == 'normal_residual'
+    expected = np.linalg.lstsq(mat, rhs_arr)[0]
+    assert all_almost_equal(x, expected)
+
+    # Consistent system with nonzero starting point
+    rhs = op(op.domain.one())
+    x = op.domain.element([1, 0, 1, 0, 1])
+    info = least_squares_solver(op, x, rhs, niter=100, tol=1e-10)
+    assert info.reason == 'residual'
+    assert all_almost_equal(x, op.domain.one())
+
+    with pytest.raises(TypeError):
+        least_squares_solver(op, x, rhs, niter=1, omega=1)
+    with pytest.raises(ValueError):
+        least_squares_solver(op, x, rhs, niter=1, tol=-1)
+
+
+def test_minres():
+    """Test MINRES on a symmetric indefinite system."""
+    with odl.util.NumpyRandomSeed(1):
+        mat = np.random.rand(6, 6)
+        rhs_arr = np.random.rand(6)
+    mat = mat + mat.T - 2 * np.eye(6)
+    assert np.min(np.linalg.eigvalsh(mat)) < 0
+    op = odl.MatrixOperator(mat)
+    rhs = op.range.element(rhs_arr)
+
+    x = op.domain.zero()
+    iterates = odl.solvers.CallbackStore()
+    info = odl.solvers.minres(op, x, rhs, niter=6, callback=iterates)
+    assert info.niter <= 6
+    assert len(iterates) == info.niter
+    assert all_almost_equal(x, np.linalg.solve(mat, rhs_arr))
+
+    # Shifted system with nonzero starting point and early stopping
+    shift = 0.5
+    x = op.domain.one()
+    info = odl.solvers.minres(op, x, rhs, niter=100, shift=shift, tol=1e-10)
+    assert info.niter < 100
+    assert all_almost_equal(
+        x, np.linalg.solve(mat - shift * np.eye(6), rhs_arr))
+
+    op = odl.MatrixOperator(np.random.rand(3, 4))
+    with pytest.raises(ValueError):
+        odl.solvers.minres(op, op.domain.zero(), op.range.zero(), niter=1)
+
+
+if __name__ == '__main__':
+    pytest.main([str(__file__.replace('\\', '/')), '-v'])
@@ -141,5 +141,177 @@ def test_chambolle_pock_solver_produce_space():
     assert all_almost_equal(discr_vec, vec_expl, PLACES)
 
 
+def test_diagonal_step_sizes():
+    """Check the preconditioning condition for the diagonal step sizes."""
+    space = odl.uniform_discr([0, 0], [1, 1], (3, 4))
+    flat = odl.FlatteningOperator(space)
+    mat = np.random.rand(5, space.size)
+    mat[:, 0] *= 100
+    op = odl.BroadcastOperator(
+        odl.MatrixOperator(mat) * flat,
+        odl.Gradient(space),
+        odl.MatrixOperator(-2 * mat) * flat)
+    tau, sigma = odl.solvers.diagonal_step_sizes(op)
+    assert tau in op.domain
+    assert sigma in op.range
+
+    # Explicit matrix of sigma^(1/2) * op * tau^(1/2) in orthonormal bases.
+    # The inner products are weighted with the cell volume in ``space`` and
+    # the gradient space, but not in ``rn(5)``.
+    columns = []
+    for j in range(space.size):
+        unit = np.zeros(space.size)
+        unit[j] = np.sqrt(tau.asarray().ravel()[j] / space.cell_volume)
+        columns.append(np.hstack([np.sqrt(s_i.asarray() * w_i).ravel() *
+                                  y_i.asarray().ravel()
+                                  for s_i, w_i, y_i in zip(
+                                      [sigma[0], sigma[1][0], sigma[1][1],
+                                       sigma[2]],
+                                      [1.0, space.cell_volume,
+                                       space.cell_volume, 1.0],
+                                      _flat_parts(op(flat.inverse(unit))))]))
+    assert np.linalg.norm(np.array(columns).T, 2) <= 1 + 1e-10
+
+    # Exact sums of a matrix, zero sums are replaced
+    tau, sigma = odl.solvers.diagonal_step_sizes(
+        odl.MatrixOperator([[1.0, -2.0, 0.0],
+                            [0.0, 4.0, 0.0]]))
+    assert all_almost_equal(tau, [1, 1 / 6, 1 / 6])
+    assert all_almost_equal(sigma, [1 / 3, 1 / 4])
+
+    with pytest.raises(ValueError):
+        odl.solvers.diagonal_step_sizes(
+            odl.Gradient(space, pad_mode='order1'))
+
+
+def test_diagonal_step_sizes_unknown_sums():
+    """Check that ``L(one)`` is only used for nonnegative operators."""
+    space = odl.rn(3)
+    mat = np.array([[1.0, -1.0, 0.0],
+                    [2.0, 1.0, 3.0]])
+    # Not recognized as `MatrixOperator`, and ``L(one)`` has a zero entry
+    # due to cancellation
+    op = odl.MatrixOperator(mat) * odl.IdentityOperator(space)
+    with pytest.raises(NotImplementedError):
+        odl.solvers.diagonal_step_sizes(op)
+
+    # Explicitly nonnegative operators
+    op = odl.MatrixOperator(abs(mat)) * odl.IdentityOperator(space)
+    tau, sigma = odl.solvers.diagonal_step_sizes(op, nonnegative=True)
+    assert all_almost_equal(tau, [1 / 3, 1 / 2, 1 / 3])
+    assert all_almost_equal(sigma, [1 / 2, 1 / 6])
+
+    # Scalar multiples and flattening keep the exact sums, the zero column
+    # gets the smallest step size
+    space = odl.uniform_discr([0, 0], [1, 1], (2, 2))
+    flat = odl.FlatteningOperator(space)
+    mat = np.array([[1.0, -2.0, 0.0, 3.0]])
+    tau, sigma = odl.solvers.diagonal_step_sizes(
+        -2 * (odl.MatrixOperator(mat) * flat))
+    assert all_almost_equal(tau.asarray(),
+                            [[1 / 8, 1 / 16], [1 / 24, 1 / 24]])
+    assert all_almost_equal(sigma, [1 / 12])
+
+    # Reordered rows, the adjoint is scaled with the cell volume
+    tau, sigma = odl.solvers.diagonal_step_sizes(
+        flat.inverse * odl.MatrixOperator(mat.T))
+    assert all_almost_equal(tau, [1 / (6 * space.cell_volume)])
+    assert all_almost_equal(sigma.asarray(), [[1, 1 / 2], [1 / 3, 1 / 3]])
+
+
+def _flat_parts(x):
+    """Return the non-product space parts of ``x``."""
+    if isinstance(x.space, odl.ProductSpace):
+        return [part for x_i in x for part in _flat_parts(x_i)]
+    else:
+        return [x]
+
+
+def test_chambolle_pock_solver_preconditioned():
+    """Test the Chambolle-Pock algorithm with elementwise step sizes."""
+    # Badly scaled nonnegative forward operator
+    mat = np.eye(6) + 0.1 * np.random.rand(6, 6)
+    mat *= np.array([1, 1, 1, 10, 100, 1000])
+    op = odl.MatrixOperator(mat)
+    x_true = op.domain.element(np.random.rand(6))
+    data = op(x_true)
+
+    f = odl.solvers.L2NormSquared(op.range).translated(data)
+    g = odl.solvers.IndicatorNonnegativity(op.domain)
+    tau, sigma = odl.solvers.diagonal_step_sizes(op)
+
+    x = op.domain.zero()
+    chambolle_pock_solver(x, f, g, op, tau=tau, sigma=sigma, niter=1000)
+    assert all_almost_equal(x, x_true, places=3)
+
+    # Scalar and elementwise step sizes can be mixed
+    x = op.domain.zero()
+    chambolle_pock_solver(x, f, g, op, tau=tau, sigma=1.0 / mat.sum(),
+                          niter=1)
+
+    with pytest.raises(ValueError):
+        chambolle_pock_solver(x, f, g, op, tau=tau, sigma=sigma, niter=1,
+                              gamma=1)
+    with pytest.raises(ValueError):
+        chambolle_pock_solver(x, f, g, op, tau=-tau, sigma=sigma, niter=1)
+    with pytest.raises(TypeError):
+        chambolle_pock_solver(x, f, g, op, tau=odl.rn(3).one(), sigma=sigma,
+                              niter=1)
+
+
+def test_chambolle_pock_solver_preconditioned_discr():
+    """Test elementwise step sizes for an operator on a weighted space."""
+    space = odl.uniform_discr([0, 0], [1, 1], (8, 8))
+    mat = np.eye(space.size) + 0.1 * np.random.rand(space.size, space.size)
+    mat *= np.linspace(1, 100, space.size)[:, None]
+    op = odl.MatrixOperator(mat) * odl.FlatteningOperator(space)
+    x_true = space.element(np.random.rand(*space.shape))
+    data = op(x_true)
+
+    f = odl.solvers.L2NormSquared(op.range).translated(data)
+    g = odl.solvers.IndicatorNonnegativity(op.domain)
+    tau, sigma = odl.solvers.diagonal_step_sizes(op)
+
+    x = op.domain.zero()
+    chambolle_pock_solver(x, f, g, op, tau=tau, sigma=sigma, niter=1000)
+    assert all_almost_equal(x, x_true, places=3)
+
+
+def test_chambolle_pock_solver_stopping():
+    """Test early stopping by residual and duality gap."""
+    space = odl.rn(5)
+    op = odl.IdentityOperator(space)
+    data = odl.util.testutils.noise_element(space)
+
+    # min_x ||x - data||^2 + ||x||^2 with solution data / 2
+    f = odl.solvers.L2NormSquared(space).translated(data)
+    g = odl.solvers.L2NormSquared(space)
+
+    x = space.zero()
+    info = chambolle_pock_solver(x, f, g, op, tau=0.5, sigma=0.5, niter=1000)
+    assert info == (1000, 'niter')
+
+    x = space.zero()
+    info = chambolle_pock_solver(x, f, g, op, tau=0.5, sigma=0.5, niter=1000,
+                                 tol=1e-10)
+    assert info.reason == 'residual'
+    assert info.niter < 1000
+    assert all_almost_equal(x, data / 2, places=PLACES)
+
+    x = space.zero()
+    info = chambolle_pock_solver(x, f, g, op, tau=0.5, sigma=0.5, niter=1000,
+                                 tol=1e-10, gap_interval=3)
+    assert info.reason == 'gap'
+    assert info.niter % 3 == 0
+    assert all_almost_equal(x, data / 2, places=4)
+
+    with pytest.raises(ValueError):
+        chambolle_pock_solver(x, f, g, op, tau=0.5, sigma=0.5, niter=1,
+                              gap_interval=3)
+    with pytest.raises(ValueError):
+        chambolle_pock_solver(x, f, g, op, tau=0.5, sigma=0.5, niter=1,
+                              tol=-1)
+
+
 if __name__ == '__main__':
     pytest.main([str(__file__.replace('\\', '/')), '-v'])
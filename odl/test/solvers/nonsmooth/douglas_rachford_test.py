@@ -155,5 +155,34 @@ def test_primal_dual_with_li():
     assert float(x) <= upper_lim + 10 ** -LOW_ACCURACY
 
 
+def test_primal_dual_stopping():
+    """Test early stopping by residual and duality gap."""
+    space = odl.rn(5)
+    L = [odl.IdentityOperator(space)]
+    data = noise_element(space)
+
+    # min_x ||x||^2 + ||x - data||^2 with solution data / 2
+    f = odl.solvers.L2NormSquared(space)
+    g = [odl.solvers.L2NormSquared(space).translated(data)]
+
+    x = space.zero()
+    info = douglas_rachford_pd(x, f, g, L, tau=0.5, sigma=[1.0], niter=500,
+                               tol=1e-10)
+    assert info.reason == 'residual'
+    assert info.niter < 500
+    assert all_almost_equal(x, data / 2, places=HIGH_ACCURACY)
+
+    x = space.zero()
+    info = douglas_rachford_pd(x, f, g, L, tau=0.5, sigma=[1.0], niter=500,
+                               tol=1e-10, gap_interval=4)
+    assert info.reason == 'gap'
+    assert info.niter % 4 == 0
+    assert all_almost_equal(x, data / 2, places=LOW_ACCURACY)
+
+    x = space.zero()
+    assert douglas_rachford_pd(x, f, g, L, tau=0.5, sigma=[1.0],
+                               niter=3) == (3, 'niter')
+
+
 if __name__ == '__main__':
     pytest.main([str(__file__.replace('\\', '/')), '-v'])
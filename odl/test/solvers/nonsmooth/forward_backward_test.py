@@ -193,5 +193,27 @@ def test_forward_backward_with_li_and_h():
     assert almost_equal(x[0], expected_result, places=LOW_ACCURACY)
 
 
+def test_forward_backward_stopping():
+    """Test early stopping of the forward-backward solver."""
+    space = odl.rn(10)
+
+    lin_ops = [odl.ZeroOperator(space)]
+    g = [odl.solvers.ZeroFunctional(space)]
+    f = odl.solvers.ZeroFunctional(space)
+    data = noise_element(space)
+    h = odl.solvers.L2NormSquared(space).translated(data)
+
+    x = space.zero()
+    info = forward_backward_pd(x, f, g, lin_ops, h, tau=0.25,
+                               sigma=[1.0], niter=500, tol=1e-10)
+    assert info.reason == 'residual'
+    assert info.niter < 500
+    assert all_almost_equal(x, data, places=HIGH_ACCURACY)
+
+    with pytest.raises(TypeError):
+        forward_backward_pd(x, f, g, lin_ops, h, tau=0.25, sigma=[1.0],
+                            niter=1, tol=1e-10, gap_interval=1)
+
+
 if __name__ == '__main__':
     pytest.main([str(__file__.replace('\\', '/')), '-v'])
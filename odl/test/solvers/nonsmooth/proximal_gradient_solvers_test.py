@@ -0,0 +1,66 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Test for the proximal gradient solvers."""
+
+from __future__ import division
+import numpy as np
+import pytest
+
+import odl
+from odl.solvers import proximal_gradient, accelerated_proximal_gradient
+from odl.util.testutils import all_almost_equal, noise_element
+
+
+@pytest.mark.parametrize('solver', [proximal_gradient,
+                                    accelerated_proximal_gradient])
+def test_proximal_gradient_stopping(solver):
+    """Test early stopping of the proximal gradient solvers."""
+    space = odl.rn(10)
+    data = noise_element(space)
+
+    # min_x ||x||_1 + ||x - data||^2 solved by soft thresholding
+    f = odl.solvers.L1Norm(space)
+    g = odl.solvers.L2NormSquared(space).translated(data)
+    data_arr = data.asarray()
+    expected = np.sign(data_arr) * np.maximum(np.abs(data_arr) - 0.5, 0)
+
+    x = space.zero()
+    info = solver(x, f, g, gamma=0.25, niter=1000, tol=1e-10)
+    assert info.reason == 'residual'
+    assert info.niter < 1000
+    assert all_almost_equal(x, expected)
+
+    x = space.zero()
+    assert solver(x, f, g, gamma=0.25, niter=2) == (2, 'niter')
+
+
+def test_accelerated_proximal_gradient_change():
+    """Check that the change is measured between consecutive iterates."""
+    space = odl.rn(10)
+    data = noise_element(space)
+    f = odl.solvers.L1Norm(space)
+    g = odl.solvers.L2NormSquared(space).translated(data)
+
+    iterates = []
+    x = space.zero()
+    tol = 1e-6
+    info = accelerated_proximal_gradient(
+        x, f, g, gamma=0.1, niter=1000, tol=tol,
+        callback=lambda x: iterates.append(x.copy()))
+    assert info.reason == 'residual'
+    assert len(iterates) == info.niter
+
+    changes = [x_k.dist(x_prev) / x_k.norm()
+               for x_prev, x_k in zip([space.zero()] + iterates, iterates)]
+    assert changes[-1] <= tol
+    assert all(change > tol for change in changes[:-1])
+
+
+if __name__ == '__main__':
+    pytest.main([str(__file__.replace('\\', '/')), '-v'])
@@ -489,5 +489,51 @@ def test_proximal_convconj_kl_cross_entropy():
     assert all_almost_equal(x_inplace, x_verify, HIGH_ACC)
 
 
+def test_proximal_elementwise_step_size():
+    """Check separable proximals with elementwise step sizes."""
+    space = odl.uniform_discr(0, 1, 6)
+    x = space.element([-3, -1, 0, 0.5, 2, 4])
+    g = space.element([1, 2, 1, 0.5, 3, 1])
+    sigma = space.element([0.1, 0.5, 1, 2, 3, 4])
+
+    funcs = [odl.solvers.L1Norm(space).translated(g),
+             odl.solvers.L2NormSquared(space).translated(g),
+             odl.solvers.KullbackLeibler(space, prior=g),
+             odl.solvers.KullbackLeiblerCrossEntropy(space, prior=g),
+             2 * odl.solvers.L1Norm(space),
+             odl.solvers.IndicatorNonnegativity(space)]
+    for func in funcs:
+        for prox_factory in [func.proximal, func.convex_conj.proximal]:
+            result = prox_factory(sigma)(x)
+
+            # Compare with scalar step sizes, one entry at a time
+            expected = [prox_factory(sigma_i)(x)[i]
+                        for i, sigma_i in enumerate(sigma)]
+            assert all_almost_equal(result, expected, HIGH_ACC)
+
+    # Product spaces
+    pspace = odl.ProductSpace(space, 2)
+    x = pspace.element([x, -x])
+    sigma = pspace.element([sigma, 2 * sigma])
+    prox_factory = combine_proximals(proximal_convex_conj_l1(space, g=g),
+                                     proximal_convex_conj_l1(space, g=g))
+    prox = prox_factory(sigma)
+    for i in range(2):
+        single_prox = proximal_convex_conj_l1(space, g=g)(sigma[i])
+        assert all_almost_equal(prox(x)[i], single_prox(x[i]), HIGH_ACC)
+
+    # Isotropic case with the same step size for all components
+    prox = proximal_convex_conj_l1(pspace, g=pspace.one(), isotropic=True)
+    sigma = pspace.element([sigma[0], sigma[0]])
+    expected = [prox(sigma_j)(x).asarray()[:, j]
+                for j, sigma_j in enumerate(sigma[0])]
+    assert all_almost_equal(prox(sigma)(x).asarray(), np.transpose(expected),
+                            HIGH_ACC)
+
+    # Non-separable proximals need scalar step sizes
+    with pytest.raises(TypeError):
+        proximal_l2(space)(space.one())
+
+
 if __name__ == '__main__':
     pytest.main([str(__file__.replace('\\', '/')), '-v'])
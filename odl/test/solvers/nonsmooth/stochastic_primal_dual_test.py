@@ -0,0 +1,110 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Test for the stochastic primal-dual hybrid gradient algorithm."""
+
+from __future__ import division
+import numpy as np
+import pytest
+
+import odl
+from odl.solvers import spdhg
+from odl.util.testutils import all_almost_equal
+from odl.util.utility import NumpyRandomSeed
+
+
+def _problem():
+    """Return a regularized least squares problem and its solution.
+
+    The problem is ``min_x sum_i 1/2 ||A_i x - b_i||^2 + 1/2 ||x||^2``.
+    """
+    with NumpyRandomSeed(42):
+        mats = [np.random.rand(3, 4) for _ in range(3)]
+        rhs = [np.random.rand(3) for _ in range(3)]
+
+    A = odl.BroadcastOperator(*[odl.MatrixOperator(m) for m in mats])
+    f = odl.solvers.SeparableSum(
+        *[0.5 * odl.solvers.L2NormSquared(op.range).translated(b)
+          for op, b in zip(A.operators, rhs)])
+    g = 0.5 * odl.solvers.L2NormSquared(A.domain)
+
+    mat = sum(m.T.dot(m) for m in mats) + np.eye(4)
+    solution = np.linalg.solve(mat, sum(m.T.dot(b)
+                                        for m, b in zip(mats, rhs)))
+    return f, g, A, solution
+
+
+@pytest.mark.parametrize('prob', [None, 'importance'])
+def test_spdhg(prob):
+    """Test convergence with uniform and importance sampling."""
+    f, g, A, solution = _problem()
+    norms = [op.norm(estimate=True) for op in A.operators]
+    if prob is None:
+        p = [1 / 3] * 3
+    else:
+        p = [n / sum(norms) for n in norms]
+    gamma = 0.99
+    sigma = [gamma / n for n in norms]
+    tau = gamma * min(pi / n for pi, n in zip(p, norms))
+
+    x = A.domain.zero()
+    y = A.range.zero()
+    z = A.domain.zero()
+    with NumpyRandomSeed(1):
+        spdhg(x, f, g, A, tau, sigma, niter=2000, prob=prob, y=y, z=z)
+
+    assert all_almost_equal(x, solution, places=4)
+    # The aggregate is kept up to date
+    assert all_almost_equal(z, A.adjoint(y))
+
+
+def test_spdhg_serial_sampling():
+    """Test a deterministic selection of blocks and the callback."""
+    f, g, A, solution = _problem()
+    iterates = odl.solvers.CallbackStore()
+    selected = []
+
+    def cyclic():
+        selected.append(len(iterates) % 3)
+        return [selected[-1]]
+
+    x = A.domain.zero()
+    spdhg(x, f.functionals, g, A.operators, tau=0.05, sigma=0.5, niter=600,
+          fun_select=cyclic, callback=iterates)
+    assert len(iterates) == 600
+    assert selected[:4] == [0, 1, 2, 0]
+    assert all_almost_equal(x, solution, places=3)
+
+    # Updating all blocks in each iteration, with the corresponding
+    # extrapolation, is a deterministic primal-dual method
+    x = A.domain.zero()
+    spdhg(x, f, g, A, tau=0.25, sigma=0.25, niter=200, theta=1 / 3,
+          fun_select=lambda: [0, 1, 2])
+    assert all_almost_equal(x, solution, places=6)
+
+
+def test_spdhg_invalid():
+    """Test the errors for bad arguments."""
+    f, g, A, _ = _problem()
+    x = A.domain.zero()
+    with pytest.raises(TypeError):
+        spdhg(x, f, g, A.operators[0], 1, 1, niter=1)
+    with pytest.raises(ValueError):
+        spdhg(x, f.functionals[:2], g, A, 1, 1, niter=1)
+    with pytest.raises(ValueError):
+        spdhg(x, f, g, A, 1, [1, 1], niter=1)
+    with pytest.raises(ValueError):
+        spdhg(x, f, g, A, 1, 1, niter=1, prob=[0.5, 0.25, 0.5])
+    with pytest.raises(ValueError):
+        spdhg(x, f, g, A, 1, 1, niter=1, prob='norm')
+    with pytest.raises(TypeError):
+        spdhg(x, f, g, A, 1, 1, niter=1, seed=1)
+
+
+if __name__ == '__main__':
+    pytest.main([str(__file__.replace('\\', '/')), '-v'])
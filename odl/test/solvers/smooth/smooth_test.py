@@ -9,9 +9,12 @@
 """Test for the smooth solvers."""
 
 from __future__ import division
+import numpy as np
 import pytest
 import odl
 from odl.operator import OpNotImplementedError
+from odl.solvers.smooth.newton import _CorrectionPairs
+from odl.util.testutils import all_almost_equal, noise_element
 
 
 nonlinear_cg_beta = odl.util.testutils.simple_fixture('nonlinear_cg_beta',
@@ -101,6 +104,67 @@ def test_lbfgs_solver(functional_and_linesearch):
     assert functional(x) < 1e-3
 
 
+@pytest.mark.parametrize('hessinv_estimate', ['scaled', 'diagonal'])
+def test_lbfgs_solver_hessinv_estimate(functional, hessinv_estimate):
+    """Test L-BFGS with scaled and diagonal initial Hessian estimates."""
+    if hessinv_estimate == 'diagonal':
+        hessinv_estimate = 0.5 * functional.domain.one()
+    line_search = odl.solvers.BacktrackingLineSearch(functional)
+
+    x = functional.domain.one()
+    odl.solvers.bfgs_method(functional, x, tol=1e-6, line_search=line_search,
+                            num_store=3, hessinv_estimate=hessinv_estimate)
+
+    assert functional(x) < 1e-3
+
+
+def test_lbfgs_correction_pairs():
+    """Test the ring buffer and two-loop recursion against matrices."""
+    space = odl.rn(4)
+    pairs = _CorrectionPairs(space, size=2)
+    stored = []
+    for k in range(5):
+        s, y = pairs.pending()
+        s[:] = noise_element(space)
+        # Make <s, y> positive
+        y.lincomb(1, s, 0.1, noise_element(space))
+        pairs.commit(y.inner(s))
+        stored.append((s.asarray().copy(), y.asarray().copy()))
+
+        if k == 2:
+            # Forgets all pairs but keeps the buffers
+            pairs.clear()
+            stored = []
+
+    # Two pairs are kept, and only two buffers have been allocated
+    assert len(pairs.s) == 2
+    ss, ys = pairs.pairs()
+    for (s_arr, y_arr), s, y in zip(stored, ss, ys):
+        assert all_almost_equal(s, s_arr)
+        assert all_almost_equal(y, y_arr)
+
+    # Compare with the recursive definition of the inverse Hessian
+    diag = noise_element(space) ** 2 + 1
+    hessinv = np.diag(diag.asarray())
+    for s_arr, y_arr in stored:
+        rho = 1 / y_arr.dot(s_arr)
+        proj = np.eye(4) - rho * np.outer(s_arr, y_arr)
+        hessinv = proj.dot(hessinv).dot(proj.T) + rho * np.outer(s_arr,
+                                                                 s_arr)
+
+    x = noise_element(space)
+    out = space.element()
+    pairs.direction(x, out, hessinv_estimate=diag)
+    assert all_almost_equal(out, hessinv.dot(x.asarray()))
+
+    op = odl.MultiplyOperator(diag)
+    assert all_almost_equal(pairs.direction(x, out, hessinv_estimate=op),
+                            hessinv.dot(x.asarray()))
+
+    with pytest.raises(ValueError):
+        _CorrectionPairs(space, size=0)
+
+
 def test_broydens_method(broyden_impl, functional_and_linesearch):
     """Test the ``broydens_method`` quasi-Newton solver."""
     functional, line_search = functional_and_linesearch
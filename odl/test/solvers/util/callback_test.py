@@ -0,0 +1,149 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Test for the solver callbacks."""
+
+from __future__ import division
+import json
+import threading
+import numpy as np
+import pytest
+
+import odl
+from odl.solvers import CallbackAsync
+from odl.util.testutils import all_equal, noise_element
+
+
+def test_callback_async_block():
+    """Check that all iterates are processed in order, on copies."""
+    space = odl.rn(3)
+    results = []
+    threads = set()
+
+    def store(x):
+        threads.add(threading.current_thread())
+        results.append(x.copy())
+
+    callback = CallbackAsync(store, max_pending=1)
+    x = space.zero()
+    for i in range(10):
+        x += 1
+        callback(x)
+    x[:] = -1
+    callback.wait()
+
+    assert threading.current_thread() not in threads
+    assert len(results) == 10
+    for i, result in enumerate(results):
+        assert all_equal(result, [i + 1] * 3)
+    assert callback.dropped == 0
+
+    # Works within solvers, also for product space iterates
+    op = odl.BroadcastOperator(odl.IdentityOperator(space), 2)
+    store = odl.solvers.CallbackStore()
+    callback = CallbackAsync(store)
+    y = op.range.zero()
+    odl.solvers.landweber(op.adjoint, y, space.one(), niter=5, omega=0.1,
+                          callback=callback)
+    callback.wait()
+    assert len(store) == 5
+    assert all_equal(store[-1], y)
+
+
+def test_callback_async_drop():
+    """Check that iterates are dropped while the worker is busy."""
+    space = odl.rn(2)
+    event = threading.Event()
+    results = []
+
+    def slow_store(x):
+        event.wait()
+        results.append(x.copy())
+
+    callback = CallbackAsync(slow_store, max_pending=2, policy='drop')
+    x = space.zero()
+    for i in range(10):
+        x += 1
+        callback(x)
+    event.set()
+    callback.wait()
+
+    # The worker may or may not have taken the first iterate off the queue
+    # before the others arrived
+    assert len(results) in (2, 3)
+    assert callback.dropped == 10 - len(results)
+    assert all_equal(results[0], [1, 1])
+
+    callback.reset()
+    assert callback.dropped == 0
+
+
+def test_callback_async_error():
+    """Check that errors in the worker are raised in the caller."""
+    def fail(x):
+        raise ZeroDivisionError
+
+    callback = CallbackAsync(fail)
+    callback(odl.rn(2).one())
+    with pytest.raises(ZeroDivisionError):
+        callback.wait()
+
+    # The callback can be used again afterwards
+    callback.wait()
+
+    with pytest.raises(TypeError):
+        CallbackAsync(None)
+    with pytest.raises(ValueError):
+        CallbackAsync(fail, max_pending=0)
+    with pytest.raises(ValueError):
+        CallbackAsync(fail, policy='skip')
+
+
+def test_save_to_disk_npy_stack(tmpdir):
+    """Check the single file iterate store."""
+    space = odl.uniform_discr([0, 0], [1, 1], (3, 4))
+    path = str(tmpdir.join('iterates.npy'))
+    callback = odl.solvers.CallbackSaveToDisk(path, step=2, impl='npy_stack')
+    iterates = [noise_element(space) for _ in range(5)]
+    for x in iterates:
+        callback(x)
+
+    stack = np.load(path, mmap_mode='r')
+    assert stack.shape == (3, 3, 4)
+    assert stack.dtype == space.dtype
+    for i in range(3):
+        assert np.array_equal(stack[i], iterates[2 * i].asarray())
+
+    with open(str(tmpdir.join('iterates.json'))) as f:
+        meta = json.load(f)
+    assert meta['space'] == repr(space)
+    assert meta['shape'] == [3, 4]
+    assert meta['step'] == 2
+
+    # Restart after reset, with downcasting and without file extension
+    path = str(tmpdir.join('iterates'))
+    callback = odl.solvers.CallbackSaveToDisk(path, impl='npy_stack',
+                                              dtype='float16')
+    callback(iterates[0])
+    callback.reset()
+    for x in iterates[1:3]:
+        callback(x)
+    stack = np.load(path + '.npy')
+    assert stack.dtype == np.float16
+    expected = np.array([x.asarray() for x in iterates[1:3]])
+    assert np.array_equal(stack, expected.astype('float16'))
+
+    with pytest.raises(ValueError):
+        callback(odl.rn(3).zero())
+    with pytest.raises(ValueError):
+        odl.solvers.CallbackSaveToDisk(path, impl='npy_stack',
+                                       allow_pickle=True)
+
+
+if __name__ == '__main__':
+    pytest.main([str(__file__.replace('\\', '/')), '-v'])
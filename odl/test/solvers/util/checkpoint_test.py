@@ -0,0 +1,189 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Test for the solver checkpoints."""
+
+from __future__ import division
+import os
+import numpy as np
+import pytest
+
+import odl
+from odl.solvers import Checkpoint, load_checkpoint
+from odl.solvers.util.checkpoint import _restore
+from odl.util.testutils import all_equal, noise_element
+
+
+def test_checkpoint_round_trip(tmpdir):
+    """Check saving and loading of elements, lists and scalars."""
+    space = odl.uniform_discr(0, 1, 5)
+    pspace = odl.ProductSpace(space, odl.rn(3))
+    x = noise_element(space)
+    y = noise_element(pspace)
+    ys = [noise_element(space) for _ in range(2)]
+
+    # Write `x` through a memory map, but not the others
+    checkpoint = Checkpoint(str(tmpdir), interval=2, mmap_bytes=40)
+    assert not checkpoint.due(1)
+    assert checkpoint.due(2)
+    checkpoint.save(2, {'x': x, 'y': y, 'ys': ys, 'step': np.float64(0.5),
+                        'name': None})
+
+    iteration, state = load_checkpoint(str(tmpdir), mmap_bytes=1)
+    assert iteration == 2
+    assert state['step'] == 0.5
+    assert state['name'] is None
+    assert isinstance(state['x'], np.memmap)
+    assert all_equal(state['x'], x)
+
+    y_new = _restore(pspace.element(), state['y'])
+    assert all_equal(y_new, y)
+    assert len(state['ys']) == 2
+    for saved, orig in zip(state['ys'], ys):
+        assert all_equal(saved, orig)
+
+    with pytest.raises(ValueError):
+        _restore(odl.rn(4).element(), state['x'])
+    with pytest.raises(ValueError):
+        _restore(odl.ProductSpace(space, 3).element(), state['y'])
+
+
+def test_checkpoint_keep(tmpdir):
+    """Check that old checkpoints are removed and the newest is loaded."""
+    space = odl.rn(3)
+    checkpoint = Checkpoint(str(tmpdir), interval=1, keep=2)
+    for i in range(1, 5):
+        checkpoint.save(i, {'x': space.element([i, i, i])})
+
+    assert sorted(os.listdir(str(tmpdir))) == ['iter_000000003',
+                                               'iter_000000004']
+    iteration, state = load_checkpoint(str(tmpdir))
+    assert iteration == 4
+    assert all_equal(state['x'], [4, 4, 4])
+
+    # A single checkpoint directory can be given as well
+    iteration, state = load_checkpoint(
+        os.path.join(str(tmpdir), 'iter_000000003'))
+    assert iteration == 3
+    assert all_equal(state['x'], [3, 3, 3])
+
+    # Time based checkpoints
+    checkpoint = Checkpoint(str(tmpdir), time_interval=1e6)
+    assert not checkpoint.due(1)
+    checkpoint = Checkpoint(str(tmpdir), time_interval=1e-9)
+    assert checkpoint.due(1)
+
+
+def test_checkpoint_invalid(tmpdir):
+    """Check the errors for bad arguments and missing checkpoints."""
+    with pytest.raises(ValueError):
+        Checkpoint(str(tmpdir))
+    with pytest.raises(ValueError):
+        Checkpoint(str(tmpdir), interval=0)
+    with pytest.raises(ValueError):
+        Checkpoint(str(tmpdir), interval=1.5)
+    with pytest.raises(ValueError):
+        Checkpoint(str(tmpdir), time_interval=-1)
+    with pytest.raises(ValueError):
+        Checkpoint(str(tmpdir), interval=1, keep=0)
+    with pytest.raises(IOError):
+        load_checkpoint(str(tmpdir))
+
+
+def test_resume_iterative(tmpdir):
+    """Check that resumed CG and OSMLEM runs equal uninterrupted runs."""
+    op = odl.MatrixOperator(np.eye(5) * 5 + np.ones([5, 5]))
+    rhs = op.range.one()
+
+    x_ref = op.domain.zero()
+    odl.solvers.conjugate_gradient(op, x_ref, rhs, niter=4)
+
+    x = op.domain.zero()
+    checkpoint = Checkpoint(str(tmpdir.join('cg')), interval=2)
+    odl.solvers.conjugate_gradient(op, x, rhs, niter=2,
+                                   checkpoint=checkpoint)
+    x = op.domain.zero()
+    odl.solvers.conjugate_gradient(op, x, rhs, niter=4,
+                                   resume=str(tmpdir.join('cg')))
+    assert all_equal(x, x_ref)
+
+    x_ref = op.domain.one()
+    odl.solvers.osmlem([op, op], x_ref, [rhs, rhs], niter=4)
+
+    x = op.domain.one()
+    checkpoint = Checkpoint(str(tmpdir.join('osmlem')), interval=3)
+    odl.solvers.osmlem([op, op], x, [rhs, rhs], niter=3,
+                       checkpoint=checkpoint)
+    x = op.domain.one()
+    odl.solvers.osmlem([op, op], x, [rhs, rhs], niter=4,
+                       resume=str(tmpdir.join('osmlem')))
+    assert all_equal(x, x_ref)
+
+
+def test_resume_bfgs(tmpdir):
+    """Check that a resumed BFGS run equals an uninterrupted run."""
+    space = odl.rn(4)
+    scaling = odl.MultiplyOperator(space.element([1, 2, 4, 8]))
+    func = odl.solvers.L2NormSquared(space) * scaling
+    line_search = odl.solvers.BacktrackingLineSearch(func)
+
+    x_ref = space.one()
+    odl.solvers.bfgs_method(func, x_ref, line_search=line_search, maxiter=10,
+                            num_store=3)
+
+    x = space.one()
+    checkpoint = Checkpoint(str(tmpdir), interval=5)
+    odl.solvers.bfgs_method(func, x, line_search=line_search, maxiter=5,
+                            num_store=3, checkpoint=checkpoint)
+    x = space.one()
+    odl.solvers.bfgs_method(func, x, line_search=line_search, maxiter=10,
+                            num_store=3, resume=str(tmpdir))
+    assert all_equal(x, x_ref)
+
+
+def test_resume_primal_dual(tmpdir):
+    """Check resumed Chambolle-Pock and Douglas-Rachford runs."""
+    space = odl.rn(5)
+    op = odl.IdentityOperator(space)
+    data = noise_element(space)
+    f = odl.solvers.L1Norm(space).translated(data)
+    g = odl.solvers.L2NormSquared(space)
+
+    for gamma in [None, 0.5]:
+        x_ref = space.zero()
+        odl.solvers.chambolle_pock_solver(x_ref, f.convex_conj, g, op,
+                                          tau=0.5, sigma=0.5, gamma=gamma,
+                                          niter=10)
+
+        path = str(tmpdir.join('cp_{}'.format(gamma)))
+        x = space.zero()
+        odl.solvers.chambolle_pock_solver(x, f.convex_conj, g, op, tau=0.5,
+                                          sigma=0.5, gamma=gamma, niter=4,
+                                          checkpoint=Checkpoint(path, 4))
+        x = space.zero()
+        odl.solvers.chambolle_pock_solver(x, f.convex_conj, g, op, tau=0.5,
+                                          sigma=0.5, gamma=gamma, niter=10,
+                                          resume=path)
+        assert all_equal(x, x_ref)
+
+    x_ref = space.zero()
+    odl.solvers.douglas_rachford_pd(x_ref, g, [f], [op], tau=0.5,
+                                    sigma=[1.0], niter=10)
+
+    path = str(tmpdir.join('dr'))
+    x = space.zero()
+    odl.solvers.douglas_rachford_pd(x, g, [f], [op], tau=0.5, sigma=[1.0],
+                                    niter=5, checkpoint=Checkpoint(path, 5))
+    x = space.zero()
+    odl.solvers.douglas_rachford_pd(x, g, [f], [op], tau=0.5, sigma=[1.0],
+                                    niter=10, resume=path)
+    assert all_equal(x, x_ref)
+
+
+if __name__ == '__main__':
+    pytest.main([str(__file__.replace('\\', '/')), '-v'])
@@ -1231,6 +1231,30 @@ def test_array_dist_using_inner(fn):
     assert almost_equal(w_dist(x, y), true_dist, places=3)
 
 
+def test_array_weighting_chunked(fn, exponent, monkeypatch):
+    # Use a small chunk size to check the reductions over several chunks
+    monkeypatch.setattr(odl.space.npy_ntuples, 'CHUNK_SIZE', 7)
+
+    [xarr, yarr], [x, y] = noise_elements(fn, n=2)
+    weight_arr = _pos_array(fn)
+    weighting = NumpyFnArrayWeighting(weight_arr, exponent=exponent)
+
+    if exponent == float('inf'):
+        true_norm = np.max(weight_arr * np.abs(xarr))
+        true_dist = np.max(weight_arr * np.abs(xarr - yarr))
+    else:
+        true_norm = np.sum(weight_arr * np.abs(xarr) ** exponent) ** (
+            1 / exponent)
+        true_dist = np.sum(weight_arr * np.abs(xarr - yarr) ** exponent) ** (
+            1 / exponent)
+
+    assert almost_equal(weighting.norm(x), true_norm, places=4)
+    assert almost_equal(weighting.dist(x, y), true_dist, places=4)
+    if exponent == 2.0:
+        true_inner = np.vdot(yarr, weight_arr * xarr)
+        assert almost_equal(weighting.inner(x, y), true_inner, places=4)
+
+
 def test_constant_init(exponent):
     constant = 1.5
 
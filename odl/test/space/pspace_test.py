@@ -478,6 +478,82 @@ def test_power_in_place_modify():
     assert all_almost_equal(z, [z1, z2])
 
 
+def test_contiguous_element():
+    spc = odl.uniform_discr([0, 0], [1, 1], (3, 4))
+    pspace = odl.ProductSpace(spc, 2, contiguous=True)
+    assert pspace.is_contiguous
+    assert not odl.ProductSpace(spc, 2).is_contiguous
+    assert pspace == odl.ProductSpace(spc, 2)
+
+    # Parts are views into one array
+    x = pspace.element()
+    assert x.data.shape == (2, spc.size)
+    for i in range(2):
+        assert np.shares_memory(x.data, x[i].asarray())
+
+    # Input elements are copied
+    y = spc.one()
+    x = pspace.element([y, y])
+    assert x.data is not None
+    assert not np.shares_memory(x.data, y.asarray())
+    assert all_equal(x, [y, y])
+
+    assert pspace.zero().data is not None
+    assert all_equal(pspace.zero(), [spc.zero(), spc.zero()])
+    assert all_equal(pspace.one(), [spc.one(), spc.one()])
+
+    # Only power spaces of Numpy-based spaces are supported
+    with pytest.raises(ValueError):
+        odl.ProductSpace(odl.rn(2), odl.rn(3), contiguous=True)
+    with pytest.raises(ValueError):
+        odl.ProductSpace(odl.ProductSpace(spc, 2), 2, contiguous=True)
+
+
+def test_contiguous_asarray():
+    for order in ('C', 'F'):
+        spc = odl.uniform_discr([0, 0], [1, 1], (3, 4), order=order)
+        arr = np.random.rand(2, 3, 4)
+        x_cont = odl.ProductSpace(spc, 2, contiguous=True).element(arr)
+        x = odl.ProductSpace(spc, 2).element(arr)
+
+        assert all_equal(x.asarray(), arr)
+        assert all_equal(x_cont.asarray(), arr)
+
+        # Writing to the view changes the element
+        x_cont.asarray()[1] = 0
+        assert all_equal(x_cont[1], spc.zero())
+
+        out = np.empty((2, 3, 4))
+        assert x.asarray(out=out) is out
+        assert all_equal(out, arr)
+
+
+def test_contiguous_space_functions(exponent):
+    spc = odl.uniform_discr(0, 1, 5, exponent=exponent)
+    pspace_cont = odl.ProductSpace(spc, 3, exponent=exponent,
+                                   contiguous=True)
+    pspace = odl.ProductSpace(spc, 3, exponent=exponent)
+
+    [x_arr, y_arr], [x_cont, y_cont] = noise_elements(pspace_cont, n=2)
+    x = pspace.element(x_arr)
+    y = pspace.element(y_arr)
+
+    assert almost_equal(x_cont.norm(), x.norm())
+    if exponent == 2.0:
+        assert almost_equal(x_cont.inner(y_cont), x.inner(y))
+
+    z = pspace_cont.element()
+    pspace_cont.lincomb(2, x_cont, -1, y_cont, out=z)
+    assert all_almost_equal(z, 2 * x - y)
+    pspace_cont.lincomb(2, z, 3, z, out=z)
+    assert all_almost_equal(z, 5 * (2 * x - y))
+
+    assert all_almost_equal(x_cont * y_cont, x * y)
+
+    # Mixing with non-contiguous elements falls back to parts
+    assert all_almost_equal(pspace_cont.lincomb(1, x_cont, 1, y), x + y)
+
+
 def test_getitem_single():
     r1 = odl.rn(1)
     r2 = odl.rn(2)
@@ -0,0 +1,109 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import division
+import json
+import pytest
+
+import odl
+from odl.util.profiling import profile
+
+
+def test_profile_call_tree():
+    """Check the call tree of a composite operator."""
+    space = odl.uniform_discr(0, 1, 10)
+    scal = odl.ScalingOperator(space, 2)
+    ident = odl.IdentityOperator(space)
+    op = scal * ident + odl.ZeroOperator(space)
+    x = space.one()
+
+    with profile() as prof:
+        for _ in range(3):
+            op(x)
+        x.norm()
+
+    op_sum = prof.root.children[id(op)]
+    assert op_sum.name == 'OperatorSum'
+    assert op_sum.calls == 3
+
+    op_comp = op_sum.children[id(op.left)]
+    assert op_comp.name == 'OperatorComp'
+    assert op_comp.children[id(scal)].calls == 3
+    assert op_comp.children[id(ident)].calls == 3
+    assert op_sum.time >= op_comp.time
+
+    norm_node = prof.root.children[('norm', id(space))]
+    assert norm_node.name == 'DiscreteLp.norm'
+    assert norm_node.calls == 1
+
+    # Allocations are attributed to the innermost operator
+    assert op_sum.total_allocs == sum(node.allocs
+                                      for _, node in op_sum.walk())
+    assert op_sum.total_allocs >= 9
+    assert (op_sum.total_nbytes ==
+            op_sum.total_allocs * x.size * space.dtype.itemsize)
+
+
+def test_profile_restores_methods():
+    """Check that the instrumentation is removed after profiling."""
+    call = odl.Operator.__call__
+    lincomb = odl.LinearSpace.lincomb
+    element = odl.space.npy_ntuples.NumpyFn.element
+
+    with profile():
+        assert odl.Operator.__call__ is not call
+
+    assert odl.Operator.__call__ is call
+    assert odl.LinearSpace.lincomb is lincomb
+    assert odl.space.npy_ntuples.NumpyFn.element is element
+
+    with pytest.raises(RuntimeError):
+        with profile():
+            with profile():
+                pass
+    assert odl.Operator.__call__ is call
+
+
+def test_profile_inherited_allocations():
+    """Check that allocation methods inherited by the spaces are counted."""
+    space = odl.rn(5)
+    op = odl.ScalingOperator(space, 2)
+    x = space.one()
+
+    with profile() as prof:
+        space.element()
+        space.zero()
+        op(x)
+
+    assert prof.root.allocs == 2
+    assert prof.root.nbytes == 2 * 5 * space.dtype.itemsize
+    assert prof.root.children[id(op)].allocs == 1
+    assert prof.root.total_allocs == 3
+
+
+def test_profile_export():
+    """Check the exported profiling results."""
+    space = odl.rn(3)
+    op = odl.ScalingOperator(space, 2)
+
+    with profile() as prof:
+        op(space.one())
+
+    result = json.loads(json.dumps(prof.as_dict()))
+    assert result['name'] == 'total'
+    assert [child['name'] for child in result['children']] == [
+        'ScalingOperator']
+    assert result['allocs'] == 1
+
+    report = prof.report().splitlines()
+    assert len(report) == 4
+    assert report[2].strip().startswith('ScalingOperator')
+
+
+if __name__ == '__main__':
+    pytest.main([str(__file__.replace('\\', '/')), '-v'])
@@ -0,0 +1,119 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import division
+import threading
+import numpy as np
+import pytest
+
+import odl
+from odl.util.scratch import ScratchPool, SCRATCH_POOL
+from odl.util.testutils import all_almost_equal, noise_element
+
+
+def test_acquire_release():
+    """Check reuse of released elements and distinct nested temporaries."""
+    pool = ScratchPool()
+    space = odl.rn(10)
+
+    tmp1 = pool.acquire(space)
+    tmp2 = pool.acquire(space)
+    assert tmp1 is not tmp2
+    assert pool.nbytes == 0
+
+    pool.release(tmp1)
+    assert pool.nbytes == 80
+    assert pool.acquire(space) is tmp1
+
+    # Equal spaces share the cache
+    pool.release(tmp2)
+    assert pool.acquire(odl.rn(10)) is tmp2
+
+    given = space.element()
+    with pool.borrow(space, given) as tmp:
+        assert tmp is given
+    assert pool.nbytes == 0
+
+
+def test_eviction_and_clear():
+    """Check size-bounded eviction and clearing of the pool."""
+    pool = ScratchPool(max_bytes=200)
+    space1 = odl.rn(10)
+    space2 = odl.rn(5)
+
+    tmps1 = [pool.acquire(space1) for _ in range(2)]
+    tmp2 = pool.acquire(space2)
+    for tmp in tmps1:
+        pool.release(tmp)
+    pool.release(tmp2)
+    assert pool.nbytes == 200
+
+    # Releasing one more element drops the least recently used one
+    pool.release(space2.element())
+    assert pool.nbytes == 160
+    assert pool.acquire(space1) is tmps1[1]
+
+    pool.clear()
+    assert pool.nbytes == 0
+    assert pool.acquire(space2) is not tmp2
+
+    # Too large elements are not cached at all
+    pool.release(odl.rn(100).element())
+    assert pool.nbytes == 0
+
+    # Sizes are taken from the space, independently of the storage
+    pspace = odl.ProductSpace(odl.uniform_discr(0, 1, 4), 2)
+    pool.release(pspace.element())
+    assert pool.nbytes == 2 * 4 * 8
+
+    with pytest.raises(ValueError):
+        ScratchPool(max_bytes=-1)
+
+
+def test_threads_separate():
+    """Check that each thread has its own cache."""
+    pool = ScratchPool()
+    space = odl.rn(3)
+    tmp = pool.acquire(space)
+    pool.release(tmp)
+
+    result = []
+    thread = threading.Thread(
+        target=lambda: result.append(pool.acquire(space)))
+    thread.start()
+    thread.join()
+    assert result[0] is not tmp
+    assert pool.acquire(space) is tmp
+
+
+def test_composite_ops_reuse_temporaries():
+    """Check that composite operators do not allocate after warm-up."""
+    space = odl.rn(4)
+    A = odl.MatrixOperator(np.random.rand(4, 4))
+    B = odl.MatrixOperator(np.random.rand(4, 4))
+    op = (A * B + B * A) * 2 + A * B * A
+    prod = odl.OperatorPointwiseProduct(A, B * A)
+
+    x = noise_element(space)
+    out = space.element()
+    for operator in [op, prod]:
+        expected = operator(x)
+        operator(x, out=out)  # warm-up
+        with odl.util.profile() as prof:
+            operator(x, out=out)
+        assert all_almost_equal(out, expected)
+        assert prof.root.total_allocs == 0
+
+    SCRATCH_POOL.clear()
+    with odl.util.profile() as prof:
+        op(x, out=out)
+    assert prof.root.total_allocs > 0
+
+
+if __name__ == '__main__':
+    pytest.main([str(__file__.replace('\\', '/')), '-v'])
@@ -10,9 +10,10 @@ from __future__ import division
 import pytest
 import numpy as np
 
+import odl
 from odl.util.utility import (
     is_scalar_dtype, is_real_dtype, is_real_floating_dtype,
-    is_complex_floating_dtype)
+    is_complex_floating_dtype, IdentityMemo)
 
 
 real_float_dtypes = np.sctypes['float']
@@ -49,5 +50,35 @@ def test_is_complex_floating_dtype():
         assert is_complex_floating_dtype(dtype)
 
 
+# ---- Memo ---- #
+
+
+def test_identity_memo():
+    memo = IdentityMemo()
+    op1 = odl.IdentityOperator(odl.rn(2))
+    op2 = odl.IdentityOperator(odl.rn(2))
+
+    # Entries are per object
+    memo[op1] = 1
+    assert op1 in memo
+    assert op2 not in memo
+    with pytest.raises(KeyError):
+        memo[op2]
+    assert memo.setdefault(op2, []) == []
+    memo.setdefault(op2, []).append(2)
+    assert memo[op1] == 1
+    assert memo[op2] == [2]
+
+    memo[op1] = 3
+    assert memo[op1] == 3
+    assert len(memo) == 2
+
+    # Entries are dropped with their objects
+    del op1
+    assert len(memo) == 1
+    del op2
+    assert len(memo) == 0
+
+
 if __name__ == '__main__':
     pytest.main([str(__file__.replace('\\', '/')), '-v'])
@@ -0,0 +1,125 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Shared thread pools for the parallel evaluation of operators."""
+
+# Imports for common Python 2/3 codebase
+from __future__ import print_function, division, absolute_import
+from concurrent.futures import ThreadPoolExecutor
+from numbers import Integral
+import threading
+
+
+__all__ = ('thread_pool', 'in_worker_thread', 'call_in_worker')
+
+
+# Thread pools for ``parallel=True`` or a number of workers, created on
+# first use and shared between operators,
+# `max_workers -> (executor, num_workers)`
+_THREAD_POOLS = {}
+_THREAD_POOLS_LOCK = threading.Lock()
+
+
+class _WorkerState(threading.local):
+
+    """Thread-local flag marking evaluations in worker threads."""
+
+    in_worker = False
+
+
+_LOCAL = _WorkerState()
+
+
+def thread_pool(parallel):
+    """Return the executor and its number of workers for ``parallel``.
+
+    Parameters
+    ----------
+    parallel : bool, int or `ThreadPoolExecutor`
+        ``False`` or ``None`` for sequential evaluation, ``True`` for a
+        shared thread pool with one worker per CPU, a positive integer for
+        a shared thread pool with that many workers, or a
+        `concurrent.futures.ThreadPoolExecutor`, which is used as it is.
+        Other executors, in particular process pools, are not supported
+        since the tasks write their results into arrays shared with the
+        calling thread.
+
+    Returns
+    -------
+    executor : executor or None
+        ``None`` for sequential evaluation.
+    num_workers : int
+        Number of worker threads, 1 for sequential evaluation. For a given
+        executor, the number of CPUs is assumed.
+
+    Examples
+    --------
+    >>> thread_pool(False)
+    (None, 1)
+    >>> executor, num_workers = thread_pool(2)
+    >>> num_workers
+    2
+    >>> thread_pool(2)[0] is executor
+    True
+    """
+    if parallel is None or parallel is False:
+        return None, 1
+    elif isinstance(parallel, ThreadPoolExecutor):
+        return parallel, _cpu_count()
+    elif parallel is True or isinstance(parallel, Integral):
+        max_workers = None if parallel is True else int(parallel)
+        if max_workers is not None and max_workers < 1:
+            raise ValueError('number of workers must be positive, got {}'
+                             ''.format(max_workers))
+        with _THREAD_POOLS_LOCK:
+            try:
+                return _THREAD_POOLS[max_workers]
+            except KeyError:
+                num_workers = (_cpu_count() if max_workers is None
+                               else max_workers)
+                pool = (ThreadPoolExecutor(max_workers=num_workers),
+                        num_workers)
+                _THREAD_POOLS[max_workers] = pool
+                return pool
+    else:
+        raise TypeError('`parallel` must be a boolean, an integer or a '
+                        '`ThreadPoolExecutor`, got {!r}'.format(parallel))
+
+
+def in_worker_thread():
+    """Return ``True`` if called from within `call_in_worker`.
+
+    Parallel evaluations check this to run sequentially inside worker
+    threads, which avoids waiting for tasks in the same thread pool.
+    """
+    return _LOCAL.in_worker
+
+
+def call_in_worker(func, *args, **kwargs):
+    """Return ``func(*args, **kwargs)``, marked as run in a worker thread.
+
+    This is meant to be submitted to the executor of `thread_pool`.
+    """
+    in_worker = _LOCAL.in_worker
+    _LOCAL.in_worker = True
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _LOCAL.in_worker = in_worker
+
+
+def _cpu_count():
+    """Return the number of CPUs."""
+    from multiprocessing import cpu_count
+    return cpu_count()
+
+
+if __name__ == '__main__':
+    # pylint: disable=wrong-import-position
+    from odl.util.testutils import run_doctests
+    run_doctests()
@@ -0,0 +1,359 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Lightweight profiling of operator evaluations and space arithmetic."""
+
+# Imports for common Python 2/3 codebase
+from __future__ import print_function, division, absolute_import
+from builtins import object
+from collections import OrderedDict
+import threading
+from timeit import default_timer
+
+from odl.util.utility import element_nbytes
+
+
+__all__ = ('profile', 'OperatorProfile', 'ProfileNode')
+
+
+# Space methods that are recorded as nodes of the call tree
+_SPACE_METHODS = ('lincomb', 'inner', 'norm')
+
+# Space methods that are recorded as allocations
+_ALLOC_METHODS = ('element', 'zero', 'one')
+
+# The currently active profile, at most one at a time
+_ACTIVE_PROFILE = None
+
+
+class ProfileNode(object):
+
+    """Aggregated statistics of one node in a profiling call tree.
+
+    A node corresponds to one operator instance (or one space method of
+    one space instance) at a given position in the call tree. Repeated
+    calls at the same position are accumulated into the same node.
+
+    Attributes
+    ----------
+    name : str
+        Human-readable label of the node.
+    obj : object
+        The profiled operator or space, ``None`` for the root node.
+    calls : int
+        Number of calls.
+    time : float
+        Accumulated wall time in seconds, including the time spent
+        in child nodes.
+    allocs : int
+        Number of space elements created while this node was the
+        innermost active one.
+    nbytes : int
+        Number of bytes of the elements counted in ``allocs``.
+    children : `OrderedDict`
+        Child nodes in order of their first call.
+    """
+
+    def __init__(self, name, obj=None):
+        """Initialize a new instance."""
+        self.name = str(name)
+        self.obj = obj
+        self.calls = 0
+        self.time = 0.0
+        self.allocs = 0
+        self.nbytes = 0
+        self.children = OrderedDict()
+
+    @property
+    def total_allocs(self):
+        """Number of allocations in this node and all its children."""
+        return self.allocs + sum(child.total_allocs
+                                 for child in self.children.values())
+
+    @property
+    def total_nbytes(self):
+        """Allocated bytes in this node and all its children."""
+        return self.nbytes + sum(child.total_nbytes
+                                 for child in self.children.values())
+
+    def walk(self, depth=0):
+        """Iterate over ``(depth, node)`` pairs in depth-first order."""
+        yield depth, self
+        for child in self.children.values():
+            for item in child.walk(depth + 1):
+                yield item
+
+    def as_dict(self):
+        """Return the subtree rooted at this node as nested dictionaries.
+
+        The result only contains builtin types and can be passed on to,
+        e.g., `json.dump`.
+        """
+        return {'name': self.name,
+                'calls': self.calls,
+                'time': self.time,
+                'allocs': self.allocs,
+                'nbytes': self.nbytes,
+                'children': [child.as_dict()
+                             for child in self.children.values()]}
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        return '{}({!r}, calls={}, time={:.3g})'.format(
+            self.__class__.__name__, self.name, self.calls, self.time)
+
+
+class OperatorProfile(object):
+
+    """Result of a profiling run, see `profile`.
+
+    The statistics are collected in a tree of `ProfileNode`'s rooted at
+    `root`. Evaluating a composite operator, e.g., an `OperatorSum`,
+    creates one node for the composite operator with the nodes of its
+    sub-operators as children.
+    """
+
+    def __init__(self):
+        """Initialize a new instance."""
+        self.root = ProfileNode('total')
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__patched = []
+        self.__start = None
+
+    def _local(self):
+        """Return the thread-local call stack state."""
+        local = self.__local
+        if not hasattr(local, 'stack'):
+            local.stack = [self.root]
+            local.alloc_depth = 0
+        return local
+
+    def _timed(self, key, name, obj, func, args, kwargs):
+        """Run ``func(*args, **kwargs)`` as child node of the current node."""
+        stack = self._local().stack
+        parent = stack[-1]
+        with self.__lock:
+            node = parent.children.get(key)
+            if node is None:
+                node = parent.children[key] = ProfileNode(name, obj)
+
+        stack.append(node)
+        start = default_timer()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = default_timer() - start
+            stack.pop()
+            with self.__lock:
+                node.calls += 1
+                node.time += elapsed
+
+    def _allocated(self, func, args, kwargs):
+        """Run the element creation ``func(*args, **kwargs)`` and record it.
+
+        Nested element creations, e.g., of the data container of a
+        discretized space, are not counted separately.
+        """
+        local = self._local()
+        if local.alloc_depth > 0:
+            return func(*args, **kwargs)
+
+        local.alloc_depth += 1
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            local.alloc_depth -= 1
+
+        node = local.stack[-1]
+        nbytes = element_nbytes(result)
+        with self.__lock:
+            node.allocs += 1
+            node.nbytes += nbytes
+        return result
+
+    def _patch(self, cls, name, wrapper):
+        """Replace ``cls.<name>`` by ``wrapper(original)``."""
+        original = cls.__dict__[name]
+        self.__patched.append((cls, name, original))
+        setattr(cls, name, wrapper(original))
+
+    def _start(self):
+        """Install the instrumentation."""
+        # Imported here since `odl.util` is imported before these modules
+        from odl.operator.operator import Operator
+        from odl.set.space import LinearSpace
+
+        profile = self
+
+        def wrap_call(call):
+            def __call__(op, x, out=None, **kwargs):
+                return profile._timed(
+                    id(op), op.__class__.__name__, op,
+                    call, (op, x, out), kwargs)
+            return __call__
+
+        def wrap_space_method(name):
+            def wrapper(method):
+                def wrapped(space, *args, **kwargs):
+                    return profile._timed(
+                        (name, id(space)),
+                        '{}.{}'.format(space.__class__.__name__, name),
+                        space, method, (space,) + args, kwargs)
+                return wrapped
+            return wrapper
+
+        def wrap_element(element):
+            def wrapped(space, *args, **kwargs):
+                return profile._allocated(element, (space,) + args, kwargs)
+            return wrapped
+
+        self._patch(Operator, '__call__', wrap_call)
+        for name in _SPACE_METHODS:
+            self._patch(LinearSpace, name, wrap_space_method(name))
+        # Allocation methods may be inherited from classes outside of the
+        # `LinearSpace` hierarchy, e.g., `NumpyNtuples.element`
+        patched = set()
+        for cls in _all_subclasses(LinearSpace):
+            for name in _ALLOC_METHODS:
+                for base in cls.__mro__:
+                    if name in base.__dict__:
+                        if (base, name) not in patched:
+                            patched.add((base, name))
+                            self._patch(base, name, wrap_element)
+                        break
+
+        self.__start = default_timer()
+
+    def _stop(self):
+        """Remove the instrumentation."""
+        self.root.time += default_timer() - self.__start
+        self.root.calls += 1
+        while self.__patched:
+            cls, name, original = self.__patched.pop()
+            setattr(cls, name, original)
+
+    def as_dict(self):
+        """Return the call tree as nested dictionaries.
+
+        See Also
+        --------
+        ProfileNode.as_dict
+        """
+        return self.root.as_dict()
+
+    def report(self, min_time=0.0):
+        """Return a table of the call tree as a string.
+
+        Parameters
+        ----------
+        min_time : float, optional
+            Only include nodes (and their children) whose accumulated
+            time is at least this value in seconds.
+
+        Returns
+        -------
+        report : str
+            One row per node, with the name indented according to the
+            depth in the call tree. Times and allocations include those
+            of the children.
+        """
+        rows = [('name', 'calls', 'time [s]', 'allocs', 'alloc [bytes]')]
+        skip_below = None
+        for depth, node in self.root.walk():
+            if skip_below is not None and depth > skip_below:
+                continue
+            skip_below = None
+            if node.time < min_time and node is not self.root:
+                skip_below = depth
+                continue
+            rows.append(('  ' * depth + node.name, str(node.calls),
+                         '{:.6f}'.format(node.time),
+                         str(node.total_allocs), str(node.total_nbytes)))
+
+        name_width = max(len(row[0]) for row in rows)
+        lines = []
+        for row in rows:
+            lines.append('{:<{}}  {:>8}  {:>12}  {:>8}  {:>14}'.format(
+                row[0], name_width, *row[1:]))
+        return '\n'.join(lines)
+
+    def print_report(self, min_time=0.0):
+        """Print the result of `report`."""
+        print(self.report(min_time=min_time))
+
+    def __str__(self):
+        """Return ``str(self)``."""
+        return self.report()
+
+
+class profile(object):
+
+    """Context manager for profiling operator evaluations.
+
+    Within the context, calls of `Operator.__call__`, of
+    `LinearSpace.lincomb`, `LinearSpace.inner` and `LinearSpace.norm`
+    are timed, and calls to `LinearSpace.element`, `LinearSpace.zero` and
+    `LinearSpace.one` are counted together with the number of bytes of
+    the created elements. The results are
+    aggregated per operator and space instance in a call tree, which
+    makes it possible to see which parts of a composite operator
+    dominate the run time.
+
+    Only one profile can be active at a time.
+
+    Examples
+    --------
+    >>> space = odl.rn(3)
+    >>> op = odl.ScalingOperator(space, 2) + odl.IdentityOperator(space)
+    >>> with odl.util.profile() as prof:
+    ...     result = op(space.one())
+    >>> op_sum = prof.root.children[id(op)]
+    >>> op_sum.name, op_sum.calls
+    ('OperatorSum', 1)
+    >>> [child.name for child in op_sum.children.values()]
+    ['ScalingOperator', 'IdentityOperator', 'NumpyFn.lincomb']
+
+    The results can be printed with ``print(prof)`` or exported with
+    ``prof.as_dict()``.
+    """
+
+    def __init__(self):
+        """Initialize a new instance."""
+        self.profile = OperatorProfile()
+
+    def __enter__(self):
+        """Start profiling and return the `OperatorProfile`."""
+        global _ACTIVE_PROFILE
+        if _ACTIVE_PROFILE is not None:
+            raise RuntimeError('another profile is already active')
+        self.profile._start()
+        _ACTIVE_PROFILE = self.profile
+        return self.profile
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop profiling."""
+        global _ACTIVE_PROFILE
+        self.profile._stop()
+        _ACTIVE_PROFILE = None
+
+
+def _all_subclasses(cls):
+    """Return all subclasses of ``cls``, including itself."""
+    result = [cls]
+    for subcls in cls.__subclasses__():
+        for c in _all_subclasses(subcls):
+            if c not in result:
+                result.append(c)
+    return result
+
+
+if __name__ == '__main__':
+    # pylint: disable=wrong-import-position
+    from odl.util.testutils import run_doctests
+    run_doctests()
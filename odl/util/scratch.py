@@ -0,0 +1,172 @@
+# Copyright 2014-2017 The ODL contributors
+#
+# This file is part of ODL.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public License,
+# v. 2.0. If a copy of the MPL was not distributed with this file, You can
+# obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Reusable scratch buffers for temporaries in operator evaluations."""
+
+# Imports for common Python 2/3 codebase
+from __future__ import print_function, division, absolute_import
+from builtins import object
+from collections import OrderedDict
+import threading
+
+from odl.util.utility import element_nbytes
+
+
+__all__ = ('ScratchPool', 'SCRATCH_POOL')
+
+
+class ScratchPool(object):
+
+    """Per-thread cache of space elements used as temporaries.
+
+    Elements are handed out with `acquire` and given back with `release`.
+    An element is never handed out twice before it has been released, so
+    nested evaluations of operators on the same space each get their own
+    temporary. Each thread has its own cache, hence no locking is needed.
+
+    Released elements stay in the cache until its total size exceeds
+    `max_bytes`, after which the least recently used ones are dropped.
+    """
+
+    def __init__(self, max_bytes=2 ** 28):
+        """Initialize a new instance.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Maximum number of bytes of cached (released) elements per
+            thread. With ``0``, nothing is cached.
+
+        Examples
+        --------
+        >>> pool = ScratchPool()
+        >>> space = odl.rn(3)
+        >>> with pool.borrow(space) as tmp:
+        ...     tmp in space
+        True
+        >>> with pool.borrow(space) as tmp2:
+        ...     tmp2 is tmp
+        True
+        """
+        self.max_bytes = max_bytes
+        self.__local = threading.local()
+        self.__generation = 0
+
+    @property
+    def max_bytes(self):
+        """Maximum number of cached bytes per thread."""
+        return self.__max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        max_bytes = int(max_bytes)
+        if max_bytes < 0:
+            raise ValueError('`max_bytes` must be nonnegative, got {}'
+                             ''.format(max_bytes))
+        self.__max_bytes = max_bytes
+
+    def _state(self):
+        """Return the cache of the current thread, dropping stale caches."""
+        local = self.__local
+        if getattr(local, 'generation', None) != self.__generation:
+            local.free = OrderedDict()
+            local.nbytes = 0
+            local.generation = self.__generation
+        return local
+
+    def acquire(self, space):
+        """Return an element of ``space`` for use as temporary.
+
+        The content of the returned element is undefined.
+        """
+        state = self._state()
+        free = state.free.get(space)
+        if free:
+            elem = free.pop()
+            state.nbytes -= element_nbytes(elem)
+            return elem
+        else:
+            return space.element()
+
+    def release(self, elem):
+        """Give back an element obtained from `acquire`."""
+        nbytes = element_nbytes(elem)
+        if nbytes > self.max_bytes:
+            return
+
+        state = self._state()
+        space = elem.space
+        free = state.free.pop(space, [])
+        free.append(elem)
+        state.free[space] = free  # Mark as most recently used
+        state.nbytes += nbytes
+
+        # Evict least recently used elements
+        while state.nbytes > self.max_bytes:
+            old_space, old_free = next(iter(state.free.items()))
+            state.nbytes -= element_nbytes(old_free.pop(0))
+            if not old_free:
+                del state.free[old_space]
+
+    def borrow(self, space, tmp=None):
+        """Return a context manager for a temporary element of ``space``.
+
+        Parameters
+        ----------
+        space : `LinearSpace`
+            Space of the temporary.
+        tmp : ``space`` element, optional
+            If given, this element is used instead of one from the pool.
+        """
+        return _Borrowed(self, space, tmp)
+
+    def clear(self):
+        """Drop all cached elements, in all threads."""
+        self.__generation += 1
+
+    @property
+    def nbytes(self):
+        """Number of bytes cached in the current thread."""
+        return self._state().nbytes
+
+    def __repr__(self):
+        """Return ``repr(self)``."""
+        return '{}(max_bytes={})'.format(self.__class__.__name__,
+                                         self.max_bytes)
+
+
+class _Borrowed(object):
+
+    """Context manager returned by `ScratchPool.borrow`."""
+
+    def __init__(self, pool, space, tmp):
+        self.pool = pool
+        self.space = space
+        self.tmp = tmp
+        self.elem = None
+
+    def __enter__(self):
+        if self.tmp is not None:
+            return self.tmp
+        self.elem = self.pool.acquire(self.space)
+        return self.elem
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.elem is not None:
+            self.pool.release(self.elem)
+            self.elem = None
+
+
+# Default pool used by the composite operators
+SCRATCH_POOL = ScratchPool()
+
+
+if __name__ == '__main__':
+    # pylint: disable=wrong-import-position
+    from odl.util.testutils import run_doctests
+    run_doctests()
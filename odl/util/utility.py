@@ -15,6 +15,7 @@ standard_library.install_aliases()
 
 from functools import wraps
 from collections import OrderedDict
+import weakref
 import numpy as np
 from pkg_resources import parse_requirements
 
@@ -24,8 +25,10 @@ __all__ = ('array1d_repr', 'array1d_str', 'arraynd_repr', 'arraynd_str',
            'is_scalar_dtype', 'is_int_dtype', 'is_floating_dtype',
            'is_real_dtype', 'is_real_floating_dtype',
            'is_complex_floating_dtype', 'real_dtype', 'complex_dtype',
-           'conj_exponent', 'as_flat_array', 'writable_array',
-           'run_from_ipython', 'NumpyRandomSeed', 'cache_arguments', 'unique')
+           'conj_exponent', 'as_flat_array', 'element_nbytes',
+           'element_arrays', 'writable_array',
+           'run_from_ipython', 'NumpyRandomSeed', 'IdentityMemo',
+           'cache_arguments', 'unique')
 
 TYPE_MAP_R2C = {np.dtype(dtype): np.result_type(dtype, 1j)
                 for dtype in np.sctypes['float']}
@@ -468,6 +471,74 @@ def as_flat_array(vec):
         return vec.asarray().ravel()
 
 
+def element_nbytes(x):
+    """Return the number of bytes of the data of the space element ``x``.
+
+    The size is computed from the space of ``x``, hence it does not depend
+    on how the data is stored. Elements of product spaces are counted
+    part by part, and other objects like scalars are counted as arrays.
+
+    Examples
+    --------
+    >>> element_nbytes(odl.rn(3).one())
+    24
+    >>> element_nbytes(odl.ProductSpace(odl.rn(3), odl.rn(2)).one())
+    40
+    """
+    parts = getattr(x, 'parts', None)
+    if parts is not None:
+        return sum(element_nbytes(part) for part in parts)
+    space = getattr(x, 'space', None)
+    if space is None:
+        return np.asarray(x).nbytes
+    return int(space.size) * np.dtype(space.dtype).itemsize
+
+
+def element_arrays(x, views_only=False):
+    """Yield the arrays holding the data of the space element ``x``.
+
+    Parameters
+    ----------
+    x : `LinearSpaceElement` or `array-like`
+        Object whose data arrays should be returned. Elements of product
+        spaces yield the arrays of their parts in order.
+    views_only : bool, optional
+        If ``True``, only arrays that share memory with ``x`` are
+        returned. Otherwise, a copy is made for data containers that are
+        not numpy arrays.
+
+    Examples
+    --------
+    >>> x = odl.rn(3).one()
+    >>> [arr is x.data for arr in element_arrays(x)]
+    [True]
+    >>> x = odl.ProductSpace(odl.uniform_discr(0, 1, 2), 2).one()
+    >>> [arr.shape for arr in element_arrays(x)]
+    [(2,), (2,)]
+    """
+    parts = getattr(x, 'parts', None)
+    if parts is not None:
+        for part in parts:
+            for arr in element_arrays(part, views_only):
+                yield arr
+        return
+
+    ntuple = getattr(x, 'ntuple', None)
+    if ntuple is not None:
+        for arr in element_arrays(ntuple, views_only):
+            yield arr
+        return
+
+    data = getattr(x, 'data', None)
+    if isinstance(data, np.ndarray):
+        yield data
+    elif not views_only:
+        if hasattr(x, 'asarray'):
+            yield np.asarray(x.asarray())
+        else:
+            yield np.asarray(x)
+
+
 class writable_array(object):
     """Context manager that casts obj to a `numpy.array` and saves changes."""
 
@@ -867,6 +938,75 @@ class NumpyRandomSeed(object):
             np.random.set_state(self.startstate)
 
 
+class IdentityMemo(object):
+
+    """Memo of values for objects, compared by identity.
+
+    The objects need not be hashable, e.g., operators. An entry is only
+    kept as long as its object is alive, which avoids that a new object
+    with the same ``id`` gets the value of a deleted one.
+    """
+
+    def __init__(self):
+        """Initialize a new instance.
+
+        Examples
+        --------
+        >>> memo = IdentityMemo()
+        >>> op = odl.IdentityOperator(odl.rn(2))
+        >>> memo[op] = 1.0
+        >>> memo[op]
+        1.0
+        >>> memo.setdefault(op, 2.0)
+        1.0
+        >>> del op
+        >>> len(memo)
+        0
+        """
+        # `id(obj) -> (weakref(obj), value)`
+        self.__entries = {}
+
+    def __getitem__(self, obj):
+        """Return ``self[obj]``, raising ``KeyError`` if not present."""
+        ref, value = self.__entries[id(obj)]
+        if ref() is not obj:
+            raise KeyError(obj)
+        return value
+
+    def __setitem__(self, obj, value):
+        """Implement ``self[obj] = value``."""
+        obj_id = id(obj)
+        entries = self.__entries
+        try:
+            ref = entries[obj_id][0]
+        except KeyError:
+            ref = None
+        if ref is None or ref() is not obj:
+            ref = weakref.ref(obj, lambda _: entries.pop(obj_id, None))
+        entries[obj_id] = (ref, value)
+
+    def __contains__(self, obj):
+        """Return ``obj in self``."""
+        try:
+            self[obj]
+        except KeyError:
+            return False
+        else:
+            return True
+
+    def __len__(self):
+        """Return ``len(self)``."""
+        return len(self.__entries)
+
+    def setdefault(self, obj, default):
+        """Return ``self[obj]``, storing ``default`` if not present."""
+        try:
+            return self[obj]
+        except KeyError:
+            self[obj] = default
+            return default
+
+
 def unique(seq):
     """Return the unique values in a sequence.
 